@@ -0,0 +1,272 @@
+"""
+Measures the throughput and dispatch latency of the ThreadManager, with concurrent.futures as the baseline.
+
+Every workload runs on every runner and worker count; the results can be saved as JSON and compared against an
+earlier run to spot regressions in dispatch overhead or scaling.
+
+Run from the repository root: ``python -m benchmarks.concurrency --output results.json [--compare baseline.json]``.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+from py_common.logging import HoornLogger, LogType
+from py_common.logging.output.default_hoorn_log_output import DefaultHoornLogOutput
+from py_common.multithreading.execution_mode import ExecutionMode
+from py_common.multithreading.latency_histogram import LatencyHistogram
+from py_common.multithreading.scheduling_strategy import SchedulingStrategy
+from py_common.multithreading.thread_manager import ThreadManager, ThreadManagerConfig
+
+
+# Workloads. Module-level, so worker processes can unpickle them.
+# Each takes the batch and an (unused) context, the signature of a ThreadManager worker template.
+
+def tiny(batch: int, context: Any = None) -> int:
+    """Measures nothing but the dispatch overhead."""
+    return batch
+
+
+def medium(batch: int, context: Any = None) -> int:
+    """One millisecond of blocking I/O."""
+    time.sleep(0.001)
+    return batch
+
+
+def cpu_heavy(batch: int, context: Any = None) -> int:
+    """A few milliseconds of pure Python computation, holding the GIL."""
+    total = 0
+    for i in range(50_000):
+        total += i * i
+    return total
+
+
+def skewed(batch: float, context: Any = None) -> float:
+    """Blocking I/O of the duration in the batch; see :func:`_skewed_batches`."""
+    time.sleep(batch)
+    return batch
+
+
+def _plain_batches(num_tasks: int) -> List[Any]:
+    return list(range(num_tasks))
+
+
+def _skewed_batches(num_tasks: int) -> List[Any]:
+    """Mostly 0.2 ms tasks, with one in ten costing 100 times as much."""
+    rng = random.Random(0)
+    return [0.02 if rng.random() < 0.1 else 0.0002 for _ in range(num_tasks)]
+
+
+@dataclass(frozen=True)
+class _Workload:
+    name: str
+    func: Callable[[Any, Any], Any]
+    num_tasks: int
+    make_batches: Callable[[int], List[Any]]
+
+
+@dataclass(frozen=True)
+class ThroughputResult:
+    workload: str
+    runner: str
+    workers: int
+    tasks: int
+    seconds: float
+    tasks_per_second: float
+
+
+@dataclass(frozen=True)
+class LatencyResult:
+    """The round trip of a single no-op task on an idle runner: from submitting it until its result is available."""
+    runner: str
+    workers: int
+    samples: int
+    mean_us: float
+    p50_us: float
+    p99_us: float
+
+
+class _Runner:
+    """Runs a workload on either a ThreadManager or a concurrent.futures executor, behind one interface."""
+
+    def __init__(self, name: str, is_process: bool, start: Callable[[Callable, int], Any]):
+        self.name = name
+        self.is_process = is_process
+        self._start = start
+
+    def open(self, func: Callable, num_workers: int) -> "_OpenRunner":
+        return _OpenRunner(self._start(func, num_workers), func)
+
+
+class _OpenRunner:
+    def __init__(self, target: Any, func: Callable):
+        self._target = target
+        self._func = func
+
+    def map(self, batches: List[Any]) -> List[Any]:
+        if isinstance(self._target, ThreadManager):
+            return self._target.map(batches, None)
+        return list(self._target.map(self._func, batches))
+
+    def submit(self, batch: Any) -> Any:
+        if isinstance(self._target, ThreadManager):
+            return self._target.submit(batch, None).result()
+        return self._target.submit(self._func, batch).result()
+
+    def close(self) -> None:
+        self._target.shutdown()
+
+
+def _thread_manager(mode: ExecutionMode, strategy: SchedulingStrategy) -> Callable[[Callable, int], ThreadManager]:
+    def start(func: Callable, num_workers: int) -> ThreadManager:
+        logger = HoornLogger([DefaultHoornLogOutput()], min_level=LogType.WARNING)
+        return ThreadManager(logger, ThreadManagerConfig(
+            num_threads=num_workers,
+            worker_template=func,
+            worker_name="Benchmark",
+            execution_mode=mode,
+            scheduling_strategy=strategy,
+        ))
+    return start
+
+
+def _executor(executor_type: type) -> Callable[[Callable, int], Executor]:
+    return lambda func, num_workers: executor_type(max_workers=num_workers)
+
+
+RUNNERS: List[_Runner] = [
+    _Runner("ThreadManager[shared_queue]", False, _thread_manager(ExecutionMode.THREAD, SchedulingStrategy.SHARED_QUEUE)),
+    _Runner("ThreadManager[work_stealing]", False, _thread_manager(ExecutionMode.THREAD, SchedulingStrategy.WORK_STEALING)),
+    _Runner("ThreadPoolExecutor", False, _executor(ThreadPoolExecutor)),
+    _Runner("ThreadManager[process]", True, _thread_manager(ExecutionMode.PROCESS, SchedulingStrategy.SHARED_QUEUE)),
+    _Runner("ProcessPoolExecutor", True, _executor(ProcessPoolExecutor)),
+]
+
+
+def _measure_throughput(runner: _Runner, workload: _Workload, num_workers: int, repeats: int) -> ThroughputResult:
+    batches = workload.make_batches(workload.num_tasks)
+    target = runner.open(workload.func, num_workers)
+    try:
+        # Start the threads or processes before measuring.
+        target.map(workload.make_batches(num_workers))
+
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            target.map(batches)
+            best = min(best, time.perf_counter() - start)
+    finally:
+        target.close()
+
+    return ThroughputResult(workload.name, runner.name, num_workers, len(batches), best, len(batches) / best)
+
+
+def _measure_latency(runner: _Runner, num_workers: int, samples: int) -> LatencyResult:
+    histogram = LatencyHistogram()
+    target = runner.open(tiny, num_workers)
+    try:
+        target.submit(0)
+        for i in range(samples):
+            start = time.perf_counter_ns()
+            target.submit(i)
+            histogram.record(time.perf_counter_ns() - start)
+    finally:
+        target.close()
+
+    summary = histogram.summarize()
+    return LatencyResult(runner.name, num_workers, samples, summary.mean_seconds * 1e6, summary.p50_seconds * 1e6, summary.p99_seconds * 1e6)
+
+
+def _result_key(result: Dict[str, Any]) -> Tuple:
+    return result.get("workload", "latency"), result["runner"], result["workers"]
+
+
+def _compare(current: Dict[str, Any], baseline_path: str) -> None:
+    with open(baseline_path, "r") as f:
+        baseline: Dict[str, Any] = json.load(f)
+
+    print(f"\nCompared to {baseline_path} (ratio > 1 is better now):")
+    previous_throughput = {_result_key(result): result for result in baseline.get("throughput", [])}
+    for result in current["throughput"]:
+        previous = previous_throughput.get(_result_key(result))
+        if previous is not None:
+            ratio = result["tasks_per_second"] / previous["tasks_per_second"]
+            print(f"  {result['workload']:<10}{result['runner']:<30}{result['workers']:>4}  throughput x{ratio:.2f}")
+
+    previous_latency = {_result_key(result): result for result in baseline.get("latency", [])}
+    for result in current["latency"]:
+        previous = previous_latency.get(_result_key(result))
+        if previous is not None:
+            ratio = previous["p50_us"] / result["p50_us"]
+            print(f"  {'latency':<10}{result['runner']:<30}{result['workers']:>4}  p50 x{ratio:.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16], help="Worker counts for the thread runners.")
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2], help="Worker counts for the process runners.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplies the number of tasks of every workload.")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per measurement; the best is kept.")
+    parser.add_argument("--latency-samples", type=int, default=500)
+    parser.add_argument("--workloads", nargs="+", help="Only run these workloads.")
+    parser.add_argument("--runners", nargs="+", help="Only run these runners.")
+    parser.add_argument("--output", help="Writes the results to this JSON file.")
+    parser.add_argument("--compare", help="A JSON file of an earlier run to compare against.")
+    args = parser.parse_args()
+
+    workloads: List[_Workload] = [
+        _Workload("tiny", tiny, int(20_000 * args.scale), _plain_batches),
+        _Workload("medium", medium, int(2_000 * args.scale), _plain_batches),
+        _Workload("cpu_heavy", cpu_heavy, int(200 * args.scale), _plain_batches),
+        _Workload("skewed", skewed, int(2_000 * args.scale), _skewed_batches),
+    ]
+    if args.workloads:
+        workloads = [workload for workload in workloads if workload.name in args.workloads]
+    runners: List[_Runner] = [runner for runner in RUNNERS if not args.runners or runner.name in args.runners]
+
+    throughput: List[ThroughputResult] = []
+    latency: List[LatencyResult] = []
+
+    print(f"{'workload':<10}{'runner':<30}{'workers':>8}{'tasks':>8}{'seconds':>10}{'tasks/s':>12}")
+    for runner in runners:
+        worker_counts: List[int] = args.processes if runner.is_process else args.threads
+        for num_workers in worker_counts:
+            for workload in workloads:
+                result = _measure_throughput(runner, workload, num_workers, args.repeats)
+                throughput.append(result)
+                print(f"{result.workload:<10}{result.runner:<30}{result.workers:>8}{result.tasks:>8}{result.seconds:>10.3f}{result.tasks_per_second:>12.0f}")
+
+            result = _measure_latency(runner, num_workers, args.latency_samples)
+            latency.append(result)
+            print(f"{'latency':<10}{result.runner:<30}{result.workers:>8}  p50 {result.p50_us:.1f} us, p99 {result.p99_us:.1f} us")
+
+    report: Dict[str, Any] = {
+        "metadata": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "arguments": vars(args),
+        },
+        "throughput": [asdict(result) for result in throughput],
+        "latency": [asdict(result) for result in latency],
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved the results to {args.output}")
+
+    if args.compare:
+        _compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Compares the shared-queue and work-stealing scheduling strategies of the ThreadManager on workloads of uneven cost.
+
+Run from the repository root: ``python -m benchmarks.scheduling_strategies``.
+"""
+import argparse
+import random
+import time
+from typing import Callable, Dict, List
+
+from py_common.logging import HoornLogger, LogType
+from py_common.logging.output.default_hoorn_log_output import DefaultHoornLogOutput
+from py_common.multithreading.scheduling_strategy import SchedulingStrategy
+from py_common.multithreading.thread_manager import ThreadManager, ThreadManagerConfig
+
+
+def _sleep_for(batch: float, context: None) -> float:
+    time.sleep(batch)
+    return batch
+
+
+def _skewed_costs(num_batches: int, seed: int) -> List[float]:
+    """Mostly 0.2 ms batches, with one in ten costing 100 times as much."""
+    rng = random.Random(seed)
+    return [0.02 if rng.random() < 0.1 else 0.0002 for _ in range(num_batches)]
+
+
+def _sorted_costs(num_batches: int, seed: int) -> List[float]:
+    """The same costs, with all the expensive batches at the end, where they become stragglers."""
+    return sorted(_skewed_costs(num_batches, seed))
+
+
+def _run(strategy: SchedulingStrategy, num_threads: int, costs: List[float]) -> float:
+    logger = HoornLogger([DefaultHoornLogOutput()], min_level=LogType.WARNING)
+    manager = ThreadManager(logger, ThreadManagerConfig(
+        num_threads=num_threads,
+        worker_template=_sleep_for,
+        worker_name="Benchmark",
+        scheduling_strategy=strategy,
+    ))
+
+    try:
+        # Warm up the threads and workers, so only the scheduling is measured.
+        manager.map([0.0] * num_threads, None)
+
+        start = time.perf_counter()
+        manager.map(costs, None)
+        return time.perf_counter() - start
+    finally:
+        manager.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batches", type=int, default=2_000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[2, 8, 32])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    workloads: Dict[str, Callable[[int, int], List[float]]] = {"skewed": _skewed_costs, "skewed-sorted": _sorted_costs}
+
+    print(f"{'workload':<15}{'threads':>8}{'strategy':>16}{'best (s)':>12}{'batches/s':>12}")
+    for workload_name, make_costs in workloads.items():
+        costs = make_costs(args.batches, args.seed)
+        ideal = sum(costs)
+        for num_threads in args.threads:
+            for strategy in SchedulingStrategy:
+                best = min(_run(strategy, num_threads, costs) for _ in range(args.repeats))
+                print(f"{workload_name:<15}{num_threads:>8}{strategy.value:>16}{best:>12.3f}{len(costs) / best:>12.0f}")
+            print(f"{'':<15}{num_threads:>8}{'ideal':>16}{ideal / num_threads:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,15 @@
+import functools
 import json
 from pathlib import Path
-from typing import TextIO
+from typing import List, Optional, TextIO, Tuple
+from uuid import uuid4
 
 from .logging import HoornLogger
+from .networking.connection_manager import ConnectionManager
+from .networking.connection_statistics import ConnectionStatistics
 from .networking.connector import Connector
+from .networking.framing_mode import FramingMode
+from .networking.message_codec import MessageCodec
 from .networking.message_model import MessageModel
 from .networking.message_processor import MessageProcessor
 
@@ -19,42 +25,63 @@ class ComponentRegistration:
 				 logger: HoornLogger,
 				 host: str = "127.0.0.1",
 				 port: int = 3333,
-				 component_port: int = 50001,
+				 component_port: Optional[int] = None,
 				 module_separator = "Common",
 				 end_of_message_marker = "<eom>",
-				 component_id: str = "ea1973db-31e7-4fe4-bd57-e217f246f6a1"):
+				 component_id: str = "ea1973db-31e7-4fe4-bd57-e217f246f6a1",
+				 framing_mode: FramingMode = FramingMode.END_OF_MESSAGE_TOKEN,
+				 codec: Optional[MessageCodec] = None,
+				 pool_size: int = 1,
+				 statistics_log_interval_seconds: Optional[float] = None,
+				 measure_heartbeat_rtt: bool = False):
+		"""
+		Args:
+			component_port: The local port to connect from. Defaults to any free port.
+			pool_size: The number of connections to the middleman. Lost connections are made again and registered anew.
+			statistics_log_interval_seconds: Logs the statistics of every connection this often. None disables it.
+			measure_heartbeat_rtt: Whether to measure the round-trip time of heartbeats; only for middlemen that answer them.
+		"""
 		self._host = host
 		self._port = port
 		self._component_port = component_port
 		self._component_id = component_id
 
 		self._logger: HoornLogger = logger
-		self._connector: Connector = Connector(logger, end_of_message_token=end_of_message_marker, message_received_listener=self._handle_message, component_id=component_id)
-		self._message_processor: MessageProcessor = MessageProcessor(logger, self._connector)
+		connector_factory = functools.partial(Connector, end_of_message_token=end_of_message_marker, component_id=component_id, framing_mode=framing_mode, codec=codec, measure_heartbeat_rtt=measure_heartbeat_rtt)
+		self._connections: ConnectionManager = ConnectionManager(logger, self._handle_message, host, port, pool_size, connector_factory=connector_factory, connected_listener=self._register_connection, component_port=component_port, statistics_log_interval_seconds=statistics_log_interval_seconds)
+		self._message_processor: MessageProcessor = MessageProcessor(logger, self._connections)
 
 		self._module_separator = module_separator
 		self._end_of_message_marker = end_of_message_marker
+		self._registration_paths: Optional[Tuple[Path, Path]] = None
 
 	def _shutdown(self) -> None:
-		self._connector.shutdown()
+		self._connections.shutdown()
+		self._message_processor.shutdown()
 
 	def _handle_message(self, message: MessageModel) -> None:
 		self._message_processor.process_message(message)
 
 	def register_component(self, registration_json_path: Path, component_signature_json_path: Path):
-		def __print_test(message: MessageModel):
-			self._logger.debug(f"Received Message: {message.payload}", separator=self._module_separator)
+		self._registration_paths = (registration_json_path, component_signature_json_path)
 
-		sock = self._connector.connect_to_remote(self._host, self._port, self._component_port)
+		# Every connection registers itself once it is made, including after a reconnect.
+		if not self._connections.start():
+			self._logger.error("Cannot register component yet because the middleman is unreachable; retrying in the background.", separator=self._module_separator)
 
-		if sock is None:
-			self._logger.error("Cannot register component because there is no socket available.", separator=self._module_separator)
-			return
+	def _register_connection(self, connector: Connector) -> None:
+		def __print_test(message: MessageModel):
+			self._logger.debug(f"Received Message: {message.payload}", separator=self._module_separator)
 
+		registration_json_path, component_signature_json_path = self._registration_paths
 		with open(registration_json_path, 'r') as registration_file:
 			message: MessageModel = self._encode_message(registration_file, component_signature_json_path)
 			self._logger.debug("Registering Component to Middleman", separator=self._module_separator)
-			self._message_processor.send_request(message, __print_test)
+			self._message_processor.send_request(message, __print_test, connector=connector)
+
+	def get_connection_statistics(self) -> List[ConnectionStatistics]:
+		"""The traffic and health of every connection to the middleman."""
+		return self._connections.get_statistics()
 
 	def shutdown_component(self) -> None:
 		"""Shuts the component down and closes the connection."""
@@ -74,4 +101,6 @@ class ComponentRegistration:
 
 		model = MessageModel(**message)
 		model.sender_id = self._component_id
+		# A new id for every registration, so the response of each connection is matched to its own request.
+		model.unique_id = str(uuid4())
 		return model
@@ -71,6 +71,13 @@ class HoornLogger:
         for output in self._outputs:
             output.save()
 
+    def is_enabled_for(self, log_type: LogType) -> bool:
+        """
+        Whether messages of the given level are output.
+        Use this to skip building expensive log messages that would be discarded anyway.
+        """
+        return log_type >= self._min_level
+
     def set_min_level(self, min_level: LogType) -> None:
         """
         Sets the minimum log level to output.
@@ -0,0 +1,79 @@
+import math
+from typing import Optional
+
+
+class AdaptiveChunker:
+    """
+    Decides how many items go into the next batch, based on the per-item cost measured so far.
+
+    Chunks are sized to take roughly ``target_batch_seconds``: cheap items are grouped into large chunks to amortize
+    the dispatch overhead, expensive ones into small chunks. When the number of remaining items is known, chunks
+    shrink towards the end of the input (guided self-scheduling), so no worker is left with a long straggler.
+    """
+
+    def __init__(self,
+                 target_batch_seconds: float,
+                 initial_chunk_size: int = 1,
+                 min_chunk_size: int = 1,
+                 max_chunk_size: int = 10_000,
+                 smoothing: float = 0.3,
+                 max_growth_factor: float = 4.0):
+        """
+        :param target_batch_seconds: The desired duration of a single batch.
+        :param initial_chunk_size: The chunk size used before any batch has been measured.
+        :param min_chunk_size: The smallest chunk ever handed out.
+        :param max_chunk_size: The largest chunk ever handed out.
+        :param smoothing: Weight of the newest measurement in the moving average of the per-item cost.
+        :param max_growth_factor: How much larger a chunk may be than the previous one, to limit the damage of a noisy measurement.
+        """
+        if target_batch_seconds <= 0:
+            raise ValueError("The target batch duration must be positive.")
+        if not 1 <= min_chunk_size <= max_chunk_size:
+            raise ValueError("Chunk size bounds must satisfy 1 <= min_chunk_size <= max_chunk_size.")
+
+        self._target_batch_seconds: float = target_batch_seconds
+        self._min_chunk_size: int = min_chunk_size
+        self._max_chunk_size: int = max_chunk_size
+        self._smoothing: float = smoothing
+        self._max_growth_factor: float = max_growth_factor
+
+        self._seconds_per_item: Optional[float] = None
+        self._last_chunk_size: int = self._clamp(initial_chunk_size)
+
+    def _clamp(self, size: int) -> int:
+        return max(self._min_chunk_size, min(self._max_chunk_size, size))
+
+    @property
+    def seconds_per_item(self) -> Optional[float]:
+        """The smoothed per-item cost, or None if nothing has been measured yet."""
+        return self._seconds_per_item
+
+    def record(self, num_items: int, elapsed_seconds: float) -> None:
+        """Feeds the measured duration of a finished batch back into the estimate."""
+        if num_items <= 0:
+            return
+
+        cost: float = elapsed_seconds / num_items
+        if self._seconds_per_item is None:
+            self._seconds_per_item = cost
+        else:
+            self._seconds_per_item = self._smoothing * cost + (1 - self._smoothing) * self._seconds_per_item
+
+    def next_chunk_size(self, remaining_items: Optional[int], num_workers: int) -> int:
+        """
+        :param remaining_items: The number of items not yet dispatched, or None if unknown.
+        :param num_workers: The number of workers sharing the remaining items.
+        :return: The size of the next chunk.
+        """
+        size: int = self._last_chunk_size
+        if self._seconds_per_item is not None:
+            ideal: float = self._target_batch_seconds / self._seconds_per_item if self._seconds_per_item > 0 else self._max_chunk_size
+            size = int(min(ideal, self._last_chunk_size * self._max_growth_factor))
+
+        if remaining_items is not None:
+            # Leave every worker at least two more chunks' worth of the tail.
+            size = min(size, math.ceil(remaining_items / (2 * max(num_workers, 1))))
+
+        size = self._clamp(size)
+        self._last_chunk_size = size
+        return size
@@ -0,0 +1,264 @@
+import asyncio
+import time
+from collections.abc import Sized
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Coroutine, Dict, Iterable, List, Optional, Set, Union
+
+import pydantic
+
+from .batch_failure import BatchFailure
+from .batch_run import BatchOutcome
+from .batch_run_summary import BatchRunSummary
+from .cancellation_token import CancellationToken
+from .progress_tracker import ProgressSnapshot, ProgressTracker
+from .retry_policy import RetryPolicy
+from .worker import T, U
+from ..logging import HoornLogger
+
+_EXHAUSTED = object()
+
+
+class _RunState:
+    __slots__ = ("cancelled", "num_not_started")
+
+    def __init__(self):
+        self.cancelled: bool = False
+        self.num_not_started: int = 0
+
+
+class AsyncBatchManagerConfig(pydantic.BaseModel):
+    max_concurrency: int
+    """The maximum number of batches awaited at once, across all calls on the manager."""
+    worker_template: Callable[[T, U], Awaitable[Any]]
+    worker_name: str
+
+    retry_policy: Optional[RetryPolicy] = None
+    batch_timeout_seconds: Optional[float] = None
+    """Cancels batches running longer than this, failing them with a `TimeoutError` (retryable through the policy)."""
+
+    progress_interval_seconds: float = 1.0
+    progress_interval_percent: Optional[float] = None
+    progress_callback: Optional[Callable[[ProgressSnapshot], None]] = None
+
+
+def run_sync(coroutine: Coroutine[Any, Any, Any]) -> Any:
+    """
+    Runs a coroutine to completion from synchronous code and returns its result.
+    If the calling thread already runs an event loop, the coroutine runs on a fresh loop in a helper thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+class AsyncBatchManager:
+    """
+    The asyncio counterpart of the :class:`ThreadManager`, for I/O-bound work.
+    Batches are worked on by coroutines on a single event loop, so thousands can be in progress without a thread each.
+
+    From synchronous code, use :func:`run_sync`::
+
+        results = run_sync(manager.map(batches, context))
+    """
+    def __init__(self, logger: HoornLogger, config: AsyncBatchManagerConfig):
+        self._separator = "Common.AsyncBatchManager"
+
+        self._config: AsyncBatchManagerConfig = config
+        self._logger: HoornLogger = logger
+
+        # Asyncio primitives belong to one event loop; recreated when the manager is used from another one.
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._logger.trace("Successfully initialized.", separator=self._separator)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self._config.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _attempt(self, batch: T, worker_context: U) -> Any:
+        if self._config.batch_timeout_seconds is None:
+            return await self._config.worker_template(batch, worker_context)
+
+        try:
+            return await asyncio.wait_for(self._config.worker_template(batch, worker_context), self._config.batch_timeout_seconds)
+        except asyncio.TimeoutError as e:
+            raise TimeoutError(f"Batch did not finish within {self._config.batch_timeout_seconds} seconds.") from e
+
+    async def _work_batch(self, index: int, batch: T, worker_context: U, cancellation_token: Optional[CancellationToken]) -> Optional[BatchOutcome]:
+        """Returns None if the run was cancelled before the batch (or its retry) got to start."""
+        attempts: int = 0
+        semaphore: asyncio.Semaphore = self._get_semaphore()
+
+        while True:
+            attempts += 1
+            async with semaphore:
+                if cancellation_token is not None and cancellation_token.is_cancelled:
+                    return None
+
+                start: float = time.perf_counter()
+                try:
+                    result = await self._attempt(batch, worker_context)
+                    return BatchOutcome(index, batch, result, time.perf_counter() - start)
+                except Exception as e:
+                    exception: Exception = e
+
+            policy: Optional[RetryPolicy] = self._config.retry_policy
+            if policy is None or not policy.should_retry(exception, attempts):
+                return BatchOutcome(index, batch, failure=BatchFailure(index, batch, exception, attempts))
+
+            backoff: float = policy.backoff_seconds(attempts)
+            self._logger.warning(
+                f"Batch {index} failed (attempt {attempts}/{policy.max_attempts}), retrying in {backoff} seconds: {exception!r}",
+                separator=self._separator
+            )
+            await asyncio.sleep(backoff)
+
+    async def _run(self,
+                   batches: Union[Iterable[T], AsyncIterable[T]],
+                   worker_context: U,
+                   cancellation_token: Optional[CancellationToken],
+                   raise_on_failure: bool,
+                   state: Optional[_RunState] = None) -> AsyncIterator[BatchOutcome]:
+        """
+        Schedules the batches lazily, at most twice `max_concurrency` at once, and yields their outcomes as they finish.
+        """
+        if isinstance(batches, AsyncIterable):
+            batch_iterator = batches.__aiter__()
+            next_batch: Callable[[], Awaitable[Any]] = lambda: anext(batch_iterator, _EXHAUSTED)
+        else:
+            sync_iterator = iter(batches)
+
+            async def next_batch() -> Any:
+                return next(sync_iterator, _EXHAUSTED)
+
+        total: Optional[int] = len(batches) if isinstance(batches, Sized) else None
+        tracker: ProgressTracker = ProgressTracker(
+            self._logger,
+            self._separator,
+            total,
+            interval_seconds=self._config.progress_interval_seconds,
+            interval_percent=self._config.progress_interval_percent,
+            callback=self._config.progress_callback,
+        )
+
+        max_scheduled: int = 2 * self._config.max_concurrency
+        pending: Set[asyncio.Task] = set()
+        num_read: int = 0
+        exhausted: bool = False
+
+        try:
+            while True:
+                while not exhausted and len(pending) < max_scheduled:
+                    if cancellation_token is not None and cancellation_token.is_cancelled:
+                        self._logger.info("Cancellation requested, no new batches will be started.", separator=self._separator)
+                        if state is not None:
+                            state.cancelled = True
+                        exhausted = True
+                        break
+
+                    batch = await next_batch()
+                    if batch is _EXHAUSTED:
+                        exhausted = True
+                        break
+
+                    pending.add(asyncio.create_task(self._work_batch(num_read, batch, worker_context, cancellation_token)))
+                    num_read += 1
+
+                if not pending:
+                    break
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    outcome: Optional[BatchOutcome] = task.result()
+                    if outcome is None:
+                        # Also when the token was cancelled after the last batch was read.
+                        if state is not None:
+                            state.cancelled = True
+                            state.num_not_started += 1
+                        continue
+                    tracker.advance()
+
+                    if outcome.failure is not None:
+                        if raise_on_failure:
+                            self._logger.error(f"A batch failed, cancelling the remaining batches: {outcome.failure.exception!r}", separator=self._separator)
+                            raise outcome.failure.exception
+                        self._logger.error(f"Batch {outcome.index} failed after {outcome.failure.attempts} attempt(s): {outcome.failure.exception!r}", separator=self._separator)
+
+                    yield outcome
+        finally:
+            for task in pending:
+                task.cancel()
+            if state is not None:
+                state.num_not_started += len(pending)
+
+        tracker.finish()
+
+    async def as_completed(self,
+                           batches: Union[Iterable[T], AsyncIterable[T]],
+                           worker_context: U,
+                           cancellation_token: Optional[CancellationToken] = None) -> AsyncIterator[Any]:
+        """
+        Works on a set of batches, yielding the results as soon as the batches finish.
+
+        :param batches: The batches to work on. Consumed lazily; may be a (async) generator.
+        :param worker_context: The context for the batches. Shared by all coroutines on the loop.
+        :param cancellation_token: Stops the scheduling of new batches once cancelled.
+        :return: An async iterator over the results of the worker template, in completion order.
+        :raises: The first exception raised by the worker template after its retries; the other batches are cancelled.
+        """
+        async for outcome in self._run(batches, worker_context, cancellation_token, raise_on_failure=True):
+            yield outcome.result
+
+    async def map(self,
+                  batches: Union[Iterable[T], AsyncIterable[T]],
+                  worker_context: U,
+                  cancellation_token: Optional[CancellationToken] = None) -> List[Any]:
+        """
+        Works on a set of batches and collects their results.
+
+        :return: The results of the worker template, in the order of the batches.
+        :raises: The first exception raised by the worker template after its retries; the other batches are cancelled.
+        :raises CancelledError: If the token was cancelled before all batches were worked on.
+        """
+        state: _RunState = _RunState()
+        results: Dict[int, Any] = {}
+        async for outcome in self._run(batches, worker_context, cancellation_token, raise_on_failure=True, state=state):
+            results[outcome.index] = outcome.result
+
+        if state.cancelled:
+            raise CancelledError(f"Cancelled after {len(results)} batches.")
+        return [results[index] for index in range(len(results))]
+
+    async def work_batches(self,
+                           batches: Union[Iterable[T], AsyncIterable[T]],
+                           worker_context: U,
+                           cancellation_token: Optional[CancellationToken] = None) -> BatchRunSummary:
+        """
+        Works on a set of batches. A failing batch does not stop the others; it is listed in the returned summary.
+
+        :return: A summary of the run, including the batches that failed.
+        """
+        state: _RunState = _RunState()
+        num_succeeded: int = 0
+        failures: List[BatchFailure] = []
+
+        async for outcome in self._run(batches, worker_context, cancellation_token, raise_on_failure=False, state=state):
+            if outcome.failure is None:
+                num_succeeded += 1
+            else:
+                failures.append(outcome.failure)
+
+        return BatchRunSummary(
+            num_succeeded=num_succeeded,
+            failures=failures,
+            cancelled=state.cancelled,
+            num_not_started=state.num_not_started,
+        )
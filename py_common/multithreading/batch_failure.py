@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class BatchFailure:
+    """A batch that could not be worked on, after all of its attempts."""
+    index: int
+    """The position of the batch in the input."""
+    batch: Any
+    exception: BaseException
+    attempts: int
@@ -0,0 +1,255 @@
+import heapq
+import itertools
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .batch_failure import BatchFailure
+from .batch_run_summary import BatchRunSummary
+from .cancellation_token import CancellationToken
+from .retry_policy import RetryPolicy
+from ..logging import HoornLogger
+
+_EXHAUSTED = object()
+_CANCELLATION_POLL_SECONDS: float = 0.1
+
+
+@dataclass(frozen=True)
+class BatchOutcome:
+    """A batch that finished, either with a result or, after all of its attempts, with a failure."""
+    index: int
+    batch: Any
+    result: Any = None
+    elapsed_seconds: float = 0.0
+    failure: Optional[BatchFailure] = None
+
+
+class _ScheduledBatch:
+    __slots__ = ("index", "batch", "attempts", "deadline")
+
+    def __init__(self, index: int, batch: Any):
+        self.index: int = index
+        self.batch: Any = batch
+        self.attempts: int = 0
+        self.deadline: Optional[float] = None
+
+
+class BatchRun:
+    """
+    Drives a single set of batches through an executor.
+
+    Batches are read from the input lazily and at most `max_in_flight` are scheduled at once.
+    Failed batches are retried according to the retry policy, batches running longer than the timeout are
+    abandoned (the underlying thread or process cannot be interrupted and finishes in the background),
+    and a cancelled token stops the scheduling of new batches.
+
+    An abandoned batch keeps counting against `max_in_flight` until it finishes, because it still holds its thread
+    or process: the batches after it are not scheduled, and their timeouts do not start, before there is one to run them.
+    """
+
+    def __init__(self,
+                 logger: HoornLogger,
+                 separator: str,
+                 submit: Callable[[Any], Future],
+                 batches: Iterable[Any],
+                 max_in_flight: int,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 batch_timeout_seconds: Optional[float] = None,
+                 cancellation_token: Optional[CancellationToken] = None,
+                 raise_on_failure: bool = True):
+        """
+        :param submit: Schedules a batch and returns a future resolving to ``(result, elapsed_seconds)``.
+        :param raise_on_failure: Whether to raise the exception of the first batch that fails for good,
+        instead of reporting it as an outcome and carrying on.
+        """
+        self._logger = logger
+        self._separator = separator
+
+        self._submit = submit
+        self._batch_iterator: Iterator[Any] = iter(batches)
+        self._max_in_flight: int = max_in_flight
+
+        self._retry_policy: Optional[RetryPolicy] = retry_policy
+        self._batch_timeout_seconds: Optional[float] = batch_timeout_seconds
+        self._cancellation_token: Optional[CancellationToken] = cancellation_token
+        self._raise_on_failure: bool = raise_on_failure
+
+        self._in_flight: Dict[Future, _ScheduledBatch] = {}
+        # Timed out, but still running.
+        self._abandoned: Set[Future] = set()
+        # Batches waiting for their backoff to pass: (due time, tiebreaker, batch).
+        self._retries: List[Tuple[float, int, _ScheduledBatch]] = []
+        self._retry_sequence = itertools.count()
+
+        self._num_read: int = 0
+        # A batch read ahead to find out whether the input is exhausted.
+        self._lookahead: Any = _EXHAUSTED
+        self._input_exhausted: bool = False
+        self._scheduling_stopped: bool = False
+
+        self._num_succeeded: int = 0
+        self._failures: List[BatchFailure] = []
+        self._num_not_started: int = 0
+
+    def __iter__(self) -> Iterator[BatchOutcome]:
+        try:
+            while True:
+                if self._cancellation_token is not None and self._cancellation_token.is_cancelled and not self._scheduling_stopped:
+                    self._stop_scheduling()
+
+                self._dispatch()
+
+                if not self._in_flight and not self._waiting_for_room():
+                    if not self._retries:
+                        return
+                    self._sleep_until_next_retry()
+                    continue
+
+                done, _ = wait(self._in_flight.keys() | self._abandoned, timeout=self._seconds_until_next_event(), return_when=FIRST_COMPLETED)
+                self._abandoned -= done
+
+                for future in done:
+                    scheduled: Optional[_ScheduledBatch] = self._in_flight.pop(future, None)
+                    if scheduled is None:
+                        continue
+                    if future.cancelled():
+                        self._num_not_started += 1
+                        continue
+
+                    exception: Optional[BaseException] = future.exception()
+                    if exception is None:
+                        result, elapsed = future.result()
+                        self._num_succeeded += 1
+                        yield BatchOutcome(scheduled.index, scheduled.batch, result, elapsed)
+                        continue
+
+                    outcome: Optional[BatchOutcome] = self._handle_failure(scheduled, exception)
+                    if outcome is not None:
+                        yield outcome
+
+                for outcome in self._expire_timed_out():
+                    yield outcome
+        finally:
+            for future in self._in_flight:
+                future.cancel()
+
+    def summary(self) -> BatchRunSummary:
+        """The outcome of the run so far. Complete once iteration has finished."""
+        return BatchRunSummary(
+            num_succeeded=self._num_succeeded,
+            failures=list(self._failures),
+            cancelled=self._scheduling_stopped,
+            num_not_started=self._num_not_started,
+        )
+
+    def _stop_scheduling(self) -> None:
+        self._logger.info("Cancellation requested, no new batches will be started.", separator=self._separator)
+        self._scheduling_stopped = True
+
+        # Futures that did not start yet are cancelled here and counted once `wait` hands them back.
+        for future in self._in_flight:
+            future.cancel()
+
+        self._num_not_started += len(self._retries)
+        self._retries.clear()
+        if self._lookahead is not _EXHAUSTED:
+            self._num_not_started += 1
+            self._lookahead = _EXHAUSTED
+
+    def _next_batch(self) -> Optional[_ScheduledBatch]:
+        if self._retries and self._retries[0][0] <= time.perf_counter():
+            return heapq.heappop(self._retries)[2]
+
+        if not self._has_input_left():
+            return None
+
+        batch, self._lookahead = self._lookahead, _EXHAUSTED
+
+        self._num_read += 1
+        return _ScheduledBatch(self._num_read - 1, batch)
+
+    def _has_input_left(self) -> bool:
+        if self._lookahead is not _EXHAUSTED:
+            return True
+        if self._input_exhausted:
+            return False
+
+        self._lookahead = next(self._batch_iterator, _EXHAUSTED)
+        self._input_exhausted = self._lookahead is _EXHAUSTED
+        return not self._input_exhausted
+
+    def _has_room(self) -> bool:
+        return len(self._in_flight) + len(self._abandoned) < self._max_in_flight
+
+    def _waiting_for_room(self) -> bool:
+        """Whether batches are left to schedule once an abandoned batch finishes."""
+        return bool(self._abandoned) and not self._scheduling_stopped and (bool(self._retries) or self._has_input_left())
+
+    def _dispatch(self) -> None:
+        while not self._scheduling_stopped and self._has_room():
+            scheduled: Optional[_ScheduledBatch] = self._next_batch()
+            if scheduled is None:
+                return
+
+            scheduled.attempts += 1
+            if self._batch_timeout_seconds is not None:
+                scheduled.deadline = time.perf_counter() + self._batch_timeout_seconds
+            self._in_flight[self._submit(scheduled.batch)] = scheduled
+
+    def _seconds_until_next_event(self) -> Optional[float]:
+        next_event: Optional[float] = None
+
+        if self._batch_timeout_seconds is not None and self._in_flight:
+            next_event = min(scheduled.deadline for scheduled in self._in_flight.values())
+        # Without room, a due retry waits for a batch to finish rather than for its time.
+        if self._retries and self._has_room():
+            next_event = self._retries[0][0] if next_event is None else min(next_event, self._retries[0][0])
+
+        timeout: Optional[float] = None if next_event is None else max(next_event - time.perf_counter(), 0.0)
+        if self._cancellation_token is not None and not self._scheduling_stopped:
+            timeout = _CANCELLATION_POLL_SECONDS if timeout is None else min(timeout, _CANCELLATION_POLL_SECONDS)
+        return timeout
+
+    def _sleep_until_next_retry(self) -> None:
+        delay: float = max(self._retries[0][0] - time.perf_counter(), 0.0)
+        if self._cancellation_token is not None:
+            self._cancellation_token.wait(delay)
+        else:
+            time.sleep(delay)
+
+    def _expire_timed_out(self) -> Iterator[BatchOutcome]:
+        if self._batch_timeout_seconds is None:
+            return
+
+        now: float = time.perf_counter()
+        expired: List[Future] = [future for future, scheduled in self._in_flight.items() if scheduled.deadline <= now]
+        for future in expired:
+            scheduled: _ScheduledBatch = self._in_flight.pop(future)
+            if not future.cancel():
+                self._abandoned.add(future)
+
+            outcome: Optional[BatchOutcome] = self._handle_failure(
+                scheduled, TimeoutError(f"Batch {scheduled.index} did not finish within {self._batch_timeout_seconds} seconds.")
+            )
+            if outcome is not None:
+                yield outcome
+
+    def _handle_failure(self, scheduled: _ScheduledBatch, exception: BaseException) -> Optional[BatchOutcome]:
+        if self._retry_policy is not None and not self._scheduling_stopped and self._retry_policy.should_retry(exception, scheduled.attempts):
+            backoff: float = self._retry_policy.backoff_seconds(scheduled.attempts)
+            self._logger.warning(
+                f"Batch {scheduled.index} failed (attempt {scheduled.attempts}/{self._retry_policy.max_attempts}), retrying in {backoff} seconds: {exception!r}",
+                separator=self._separator
+            )
+            heapq.heappush(self._retries, (time.perf_counter() + backoff, next(self._retry_sequence), scheduled))
+            return None
+
+        if self._raise_on_failure:
+            self._logger.error(f"A batch failed, cancelling the remaining batches: {exception!r}", separator=self._separator)
+            raise exception
+
+        self._logger.error(f"Batch {scheduled.index} failed after {scheduled.attempts} attempt(s): {exception!r}", separator=self._separator)
+        failure: BatchFailure = BatchFailure(scheduled.index, scheduled.batch, exception, scheduled.attempts)
+        self._failures.append(failure)
+        return BatchOutcome(scheduled.index, scheduled.batch, failure=failure)
@@ -0,0 +1,24 @@
+from dataclasses import dataclass, field
+from typing import List
+
+from .batch_failure import BatchFailure
+
+
+@dataclass(frozen=True)
+class BatchRunSummary:
+    """The outcome of a set of batches worked on by the :class:`ThreadManager`."""
+    num_succeeded: int
+    failures: List[BatchFailure] = field(default_factory=list)
+    cancelled: bool = False
+    """Whether the run was stopped through its cancellation token."""
+    num_not_started: int = 0
+    """The number of scheduled batches dropped because of the cancellation. Batches never read from the input are not counted."""
+
+    @property
+    def num_failed(self) -> int:
+        return len(self.failures)
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether every batch was worked on successfully."""
+        return not self.failures and not self.cancelled
@@ -0,0 +1,24 @@
+import threading
+from typing import Optional
+
+
+class CancellationToken:
+    """
+    Lets a caller stop a running set of batches.
+    Once cancelled, no new batches are started; batches that are already running are allowed to finish.
+    The token may also be handed to the worker template through the worker context, so long batches can stop early.
+    """
+
+    def __init__(self):
+        self._cancelled: threading.Event = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until the token is cancelled or the timeout expires. Returns whether it was cancelled."""
+        return self._cancelled.wait(timeout)
@@ -0,0 +1,357 @@
+import itertools
+import pickle
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, wait
+from typing import Any, Callable, Deque, Dict, List, Optional, Protocol, Set, Tuple
+
+from . import distributed_protocol as protocol
+from ..logging import HoornLogger
+from ..networking.message_model import MessageModel
+
+
+class MessageConnection(Protocol):
+    """Anything messages can be sent through: a :class:`Connector`, or a :class:`LocalConnection` for testing."""
+    def send_request(self, message: MessageModel) -> None: ...
+
+
+class WorkerLostError(ConnectionError):
+    """A task was leased to worker components that disappeared too often to keep reassigning it."""
+
+
+class _Job:
+    __slots__ = ("job_id", "setup", "futures", "closed")
+
+    def __init__(self, job_id: str, setup: bytes):
+        self.job_id: str = job_id
+        # The pickled (initializer, initargs), sent to every worker before its first task of the job.
+        self.setup: bytes = setup
+        self.futures: Set[Future] = set()
+        self.closed: bool = False
+
+
+class _Task:
+    __slots__ = ("sequence", "task_id", "job", "future", "payload", "worker_id", "attempts")
+
+    def __init__(self, sequence: int, job: _Job, future: Future, payload: bytes):
+        self.sequence: int = sequence
+        self.task_id: str = f"{job.job_id}-{sequence}"
+        self.job: _Job = job
+        self.future: Future = future
+        self.payload: bytes = payload
+        self.worker_id: Optional[str] = None
+        self.attempts: int = 0
+
+
+class _RemoteWorker:
+    __slots__ = ("worker_id", "capacity", "last_heartbeat", "leased", "jobs")
+
+    def __init__(self, worker_id: str, capacity: int, now: float):
+        self.worker_id: str = worker_id
+        self.capacity: int = capacity
+        self.last_heartbeat: float = now
+        self.leased: Dict[str, _Task] = {}
+        self.jobs: Set[str] = set()
+
+    @property
+    def free_slots(self) -> int:
+        return self.capacity - len(self.leased)
+
+
+class DistributedExecutor(Executor):
+    """
+    Runs tasks on the worker components of a :class:`DistributedCoordinator`. Obtained through
+    :meth:`DistributedCoordinator.create_executor`; behaves like a :class:`ProcessPoolExecutor` spread over machines.
+    """
+
+    def __init__(self, coordinator: "DistributedCoordinator", job: _Job):
+        self._coordinator: DistributedCoordinator = coordinator
+        self._job: _Job = job
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        return self._coordinator._submit(self._job, fn, args, kwargs)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self._coordinator._close_job(self._job, wait, cancel_futures)
+
+
+class DistributedCoordinator:
+    """
+    Hands tasks to :class:`DistributedWorker` components connected through the middleman, so one job can use the cores
+    of several machines.
+
+    Workers announce themselves, and prove they are alive, with heartbeats stating how many tasks they can run at once.
+    A task is leased to one worker at a time. When a worker stops heartbeating for `heartbeat_timeout_seconds`
+    (or says it is stopping), its leased tasks go back to the front of the queue and are leased to another worker;
+    a task whose workers were lost `max_attempts` times fails with a :class:`WorkerLostError`.
+    If a lost worker still delivers a result, the first result of a task wins.
+
+    Connect it by passing :meth:`handle_message` as the message listener of the connection, then :meth:`attach` that connection.
+    """
+
+    def __init__(self,
+                 logger: HoornLogger,
+                 coordinator_id: str,
+                 heartbeat_timeout_seconds: float = 10.0,
+                 max_attempts: int = 3,
+                 separator: str = "Common.DistributedCoordinator"):
+        """
+        :param coordinator_id: The component id of this coordinator; workers address their messages to it.
+        :param heartbeat_timeout_seconds: After how long without a heartbeat a worker counts as lost.
+        :param max_attempts: How many times a task may be leased before losing its worker fails it.
+        """
+        self._logger = logger
+        self._separator = separator
+
+        self._coordinator_id: str = coordinator_id
+        self._heartbeat_timeout_seconds: float = heartbeat_timeout_seconds
+        self._max_attempts: int = max_attempts
+        self._connection: Optional[MessageConnection] = None
+
+        self._lock: threading.Lock = threading.Lock()
+        self._workers: Dict[str, _RemoteWorker] = {}
+        # Tasks waiting for a free slot, oldest first; reassigned tasks jump the queue.
+        self._pending: Deque[_Task] = deque()
+        # Tasks leased to a worker, by id.
+        self._leased: Dict[str, _Task] = {}
+        self._task_ids = itertools.count()
+        self._job_ids = itertools.count()
+        self._num_reassigned: int = 0
+
+        self._shutdown_signal: threading.Event = threading.Event()
+        self._monitor_thread: Optional[threading.Thread] = None
+
+    @property
+    def coordinator_id(self) -> str:
+        return self._coordinator_id
+
+    @property
+    def num_workers(self) -> int:
+        with self._lock:
+            return len(self._workers)
+
+    @property
+    def num_reassigned(self) -> int:
+        """The number of times a task was taken from a lost worker and queued again."""
+        return self._num_reassigned
+
+    def attach(self, connection: MessageConnection) -> None:
+        """Starts coordinating over the connection."""
+        self._connection = connection
+        self._shutdown_signal.clear()
+        self._monitor_thread = threading.Thread(target=self._monitor_loop, name=f"{self._coordinator_id}-monitor", daemon=True)
+        self._monitor_thread.start()
+
+    def wait_for_workers(self, num_workers: int, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until at least `num_workers` workers have announced themselves.
+
+        :return: Whether they did within the timeout.
+        """
+        deadline: Optional[float] = None if timeout is None else time.monotonic() + timeout
+        while self.num_workers < num_workers:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def create_executor(self, initializer: Optional[Callable[..., None]] = None, initargs: Tuple = ()) -> DistributedExecutor:
+        """
+        Starts a job: a set of tasks sharing the same set-up on the workers.
+
+        :param initializer: Called with `initargs` in every worker process before it runs a task of the job,
+        like the initializer of a :class:`ProcessPoolExecutor`. Both must be picklable.
+        :return: The executor to submit the tasks of the job to. Shut it down when the job is done.
+        """
+        job = _Job(f"{self._coordinator_id}-job-{next(self._job_ids)}", pickle.dumps((initializer, initargs)))
+        self._logger.debug(f"Started job '{job.job_id}'.", separator=self._separator)
+        return DistributedExecutor(self, job)
+
+    def _send(self, messages: List[MessageModel]) -> None:
+        for message in messages:
+            try:
+                self._connection.send_request(message)
+            except OSError as e:
+                # The worker is treated as lost once its heartbeats stop.
+                self._logger.error(f"Failed to send '{message.payload.action}' to '{message.target_uuid}': {e}", separator=self._separator)
+
+    def _submit(self, job: _Job, fn: Callable[..., Any], args: Tuple, kwargs: Dict[str, Any]) -> Future:
+        if job.closed:
+            raise RuntimeError("Cannot schedule new tasks after shutdown.")
+
+        future: Future = Future()
+        try:
+            payload: bytes = pickle.dumps((fn, args, kwargs))
+        except Exception as e:
+            future.set_exception(e)
+            return future
+
+        with self._lock:
+            job.futures.add(future)
+            self._pending.append(_Task(next(self._task_ids), job, future, payload))
+            messages: List[MessageModel] = self._dispatch_locked()
+
+        future.add_done_callback(lambda done: self.__forget(job, done))
+        self._send(messages)
+        return future
+
+    def __forget(self, job: _Job, future: Future) -> None:
+        with self._lock:
+            job.futures.discard(future)
+
+    def _dispatch_locked(self) -> List[MessageModel]:
+        """Leases pending tasks to workers with free slots. Returns the messages to send once the lock is released."""
+        messages: List[MessageModel] = []
+
+        while self._pending:
+            worker: Optional[_RemoteWorker] = max(self._workers.values(), key=lambda w: w.free_slots, default=None)
+            if worker is None or worker.free_slots <= 0:
+                break
+
+            task: _Task = self._pending.popleft()
+            if task.attempts == 0 and not task.future.set_running_or_notify_cancel():
+                continue
+
+            if task.job.job_id not in worker.jobs:
+                worker.jobs.add(task.job.job_id)
+                messages.append(protocol.make_message(self._coordinator_id, worker.worker_id, protocol.JOB, [
+                    protocol.text(task.job.job_id), protocol.binary(task.job.setup),
+                ]))
+
+            task.worker_id = worker.worker_id
+            task.attempts += 1
+            worker.leased[task.task_id] = task
+            self._leased[task.task_id] = task
+            messages.append(protocol.make_message(self._coordinator_id, worker.worker_id, protocol.LEASE, [
+                protocol.text(task.job.job_id), protocol.text(task.task_id), protocol.binary(task.payload),
+            ]))
+
+        return messages
+
+    def handle_message(self, message: MessageModel) -> None:
+        """The message listener for the connection. Ignores messages that are not part of the distributed protocol."""
+        action: str = message.payload.action
+        args = message.payload.args
+
+        if action == protocol.HEARTBEAT:
+            self._on_heartbeat(args[0].value, int(args[1].value))
+        elif action == protocol.RESULT:
+            self._on_result(args[0].value, args[1].value, args[2].value, protocol.read_binary(args[3]))
+        elif action == protocol.WORKER_STOPPING:
+            self._lose_worker(args[0].value, "it is stopping")
+
+    def _on_heartbeat(self, worker_id: str, capacity: int) -> None:
+        with self._lock:
+            worker: Optional[_RemoteWorker] = self._workers.get(worker_id)
+            if worker is None:
+                self._workers[worker_id] = _RemoteWorker(worker_id, capacity, time.monotonic())
+                self._logger.info(f"Worker '{worker_id}' joined with {capacity} slot(s).", separator=self._separator)
+            else:
+                worker.last_heartbeat = time.monotonic()
+                worker.capacity = capacity
+            messages: List[MessageModel] = self._dispatch_locked()
+
+        self._send(messages)
+
+    def _on_result(self, worker_id: str, task_id: str, status: str, payload: bytes) -> None:
+        with self._lock:
+            task: Optional[_Task] = self._leased.pop(task_id, None)
+            if task is not None:
+                owner: Optional[_RemoteWorker] = self._workers.get(task.worker_id)
+                if owner is not None:
+                    owner.leased.pop(task_id, None)
+            messages: List[MessageModel] = self._dispatch_locked()
+
+        self._send(messages)
+
+        if task is None:
+            self._logger.debug(f"Ignoring the late result of task '{task_id}' from '{worker_id}'.", separator=self._separator)
+            return
+
+        try:
+            value: Any = pickle.loads(payload)
+        except Exception as e:
+            task.future.set_exception(e)
+            return
+
+        if status == protocol.STATUS_OK:
+            task.future.set_result(value)
+        else:
+            task.future.set_exception(value)
+
+    def _lose_worker(self, worker_id: str, reason: str) -> None:
+        failed: List[_Task] = []
+
+        with self._lock:
+            worker: Optional[_RemoteWorker] = self._workers.pop(worker_id, None)
+            if worker is None:
+                return
+
+            # Back to the front of the queue, in their original order.
+            for task in sorted(worker.leased.values(), key=lambda t: t.sequence, reverse=True):
+                del self._leased[task.task_id]
+                if task.attempts >= self._max_attempts:
+                    failed.append(task)
+                    continue
+                task.worker_id = None
+                self._pending.appendleft(task)
+                self._num_reassigned += 1
+            messages: List[MessageModel] = self._dispatch_locked()
+
+        self._logger.warning(
+            f"Lost worker '{worker_id}' because {reason}; reassigning {len(worker.leased) - len(failed)} task(s).",
+            separator=self._separator
+        )
+        for task in failed:
+            task.future.set_exception(WorkerLostError(f"Task '{task.task_id}' lost its worker {task.attempts} times."))
+
+        self._send(messages)
+
+    def _monitor_loop(self) -> None:
+        while not self._shutdown_signal.wait(self._heartbeat_timeout_seconds / 4):
+            cutoff: float = time.monotonic() - self._heartbeat_timeout_seconds
+            with self._lock:
+                lost: List[str] = [worker.worker_id for worker in self._workers.values() if worker.last_heartbeat < cutoff]
+
+            for worker_id in lost:
+                self._lose_worker(worker_id, f"it sent no heartbeat for {self._heartbeat_timeout_seconds} seconds")
+
+    def _close_job(self, job: _Job, wait_for_tasks: bool, cancel_futures: bool) -> None:
+        cancelled: List[_Task] = []
+        with self._lock:
+            if job.closed:
+                return
+            job.closed = True
+
+            if cancel_futures:
+                cancelled = [task for task in self._pending if task.job is job and task.attempts == 0]
+                self._pending = deque(task for task in self._pending if task.job is not job or task.attempts != 0)
+            futures: List[Future] = list(job.futures)
+
+        # Outside the lock: cancelling runs the done callbacks of the futures, which take the lock to forget them.
+        for task in cancelled:
+            if task.future.cancel():
+                # Wakes wait() on the future; the dispatcher would have done so, but the task never reaches it now.
+                task.future.set_running_or_notify_cancel()
+
+        if wait_for_tasks:
+            wait(futures)
+
+        with self._lock:
+            messages: List[MessageModel] = [
+                protocol.make_message(self._coordinator_id, worker.worker_id, protocol.JOB_FINISHED, [protocol.text(job.job_id)])
+                for worker in self._workers.values() if job.job_id in worker.jobs
+            ]
+            for worker in self._workers.values():
+                worker.jobs.discard(job.job_id)
+
+        self._send(messages)
+        self._logger.debug(f"Finished job '{job.job_id}'.", separator=self._separator)
+
+    def shutdown(self) -> None:
+        """Stops monitoring the workers. Running jobs should be shut down first."""
+        self._shutdown_signal.set()
+        if self._monitor_thread is not None:
+            self._monitor_thread.join()
+            self._monitor_thread = None
@@ -0,0 +1,51 @@
+"""
+The messages exchanged between a :class:`DistributedCoordinator` and its :class:`DistributedWorker` components.
+
+Every message is addressed to a component through its `target_uuid` and carries everything else in its arguments,
+so it survives any middleman that only forwards the payload. Binary data (pickles) travels base64-encoded.
+Pickles are executed on arrival: only connect workers and coordinators that trust each other.
+"""
+import base64
+from typing import List
+from uuid import uuid4
+
+from ..networking.argument_model import ArgumentModel
+from ..networking.message_model import MessageModel
+from ..networking.message_payload import MessagePayload
+
+HEARTBEAT: str = "distributed.heartbeat"
+"""Worker to coordinator: ``[worker_id, capacity]``. Also announces a new worker."""
+WORKER_STOPPING: str = "distributed.worker_stopping"
+"""Worker to coordinator: ``[worker_id]``. Its leased tasks are reassigned right away."""
+JOB: str = "distributed.job"
+"""Coordinator to worker: ``[job_id, pickled (initializer, initargs)]``. Sent before the first task of the job."""
+JOB_FINISHED: str = "distributed.job_finished"
+"""Coordinator to worker: ``[job_id]``. The worker may release everything it set up for the job."""
+LEASE: str = "distributed.lease"
+"""Coordinator to worker: ``[job_id, task_id, pickled (func, args, kwargs)]``."""
+RESULT: str = "distributed.result"
+"""Worker to coordinator: ``[worker_id, task_id, "ok" or "error", pickled return value or exception]``."""
+
+STATUS_OK: str = "ok"
+STATUS_ERROR: str = "error"
+
+
+def text(value: str) -> ArgumentModel:
+    return ArgumentModel(type="string", value=value)
+
+
+def binary(value: bytes) -> ArgumentModel:
+    return ArgumentModel(type="bytes", value=base64.b64encode(value).decode("ascii"))
+
+
+def read_binary(argument: ArgumentModel) -> bytes:
+    return base64.b64decode(argument.value)
+
+
+def make_message(sender_id: str, target_id: str, action: str, args: List[ArgumentModel]) -> MessageModel:
+    return MessageModel(
+        payload=MessagePayload(action=action, args=args),
+        sender_id=sender_id,
+        target_uuid=target_id,
+        unique_id=str(uuid4()),
+    )
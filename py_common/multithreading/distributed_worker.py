@@ -0,0 +1,178 @@
+import os
+import pickle
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from . import distributed_protocol as protocol
+from .distributed_coordinator import MessageConnection
+from ..logging import HoornLogger
+from ..networking.argument_model import ArgumentModel
+from ..networking.message_model import MessageModel
+
+
+def _execute_payload(payload: bytes) -> Tuple[str, bytes]:
+    """Runs a leased task inside a worker process. Unpickling and pickling happen there, not in the component."""
+    try:
+        func, args, kwargs = pickle.loads(payload)
+        return protocol.STATUS_OK, pickle.dumps(func(*args, **kwargs))
+    except Exception as e:
+        try:
+            return protocol.STATUS_ERROR, pickle.dumps(e)
+        except Exception:
+            return protocol.STATUS_ERROR, pickle.dumps(RuntimeError(repr(e)))
+
+
+class DistributedWorker:
+    """
+    A component that runs the tasks a :class:`DistributedCoordinator` leases to it.
+
+    Every job gets its own pool of `capacity` processes (or threads), set up with the job's initializer,
+    and released when the coordinator finishes the job. Heartbeats tell the coordinator the worker is alive and how many
+    tasks it can run at once.
+
+    Connect it by passing :meth:`handle_message` as the message listener of the connection, then :meth:`start` it.
+    """
+
+    def __init__(self,
+                 logger: HoornLogger,
+                 coordinator_id: str,
+                 worker_id: Optional[str] = None,
+                 capacity: Optional[int] = None,
+                 heartbeat_interval_seconds: float = 2.0,
+                 use_processes: bool = True,
+                 separator: str = "Common.DistributedWorker"):
+        """
+        :param coordinator_id: The component id of the coordinator to work for.
+        :param worker_id: The component id of this worker. Defaults to a new, unique id.
+        :param capacity: The number of tasks run at once. Defaults to the number of CPU cores.
+        :param heartbeat_interval_seconds: The time between two heartbeats;
+        keep it well below the heartbeat timeout of the coordinator.
+        :param use_processes: Whether to run the tasks in worker processes, bypassing the GIL, or on threads.
+        Threads share the module state set up by the job initializer, so they can only run one job at a time.
+        """
+        self._logger = logger
+        self._separator = separator
+
+        self._coordinator_id: str = coordinator_id
+        self._worker_id: str = worker_id or f"worker-{uuid4()}"
+        self._capacity: int = capacity or os.cpu_count() or 1
+        self._heartbeat_interval_seconds: float = heartbeat_interval_seconds
+        self._use_processes: bool = use_processes
+        self._connection: Optional[MessageConnection] = None
+
+        self._lock: threading.Lock = threading.Lock()
+        self._jobs: Dict[str, Executor] = {}
+
+        self._shutdown_signal: threading.Event = threading.Event()
+        self._heartbeat_thread: Optional[threading.Thread] = None
+
+    @property
+    def worker_id(self) -> str:
+        return self._worker_id
+
+    def start(self, connection: MessageConnection) -> None:
+        """Announces the worker to the coordinator and keeps sending heartbeats until :meth:`stop`."""
+        self._connection = connection
+        self._shutdown_signal.clear()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name=f"{self._worker_id}-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+        self._logger.info(f"Working for '{self._coordinator_id}' with {self._capacity} slot(s).", separator=self._separator)
+
+    def _send(self, action: str, args: List[ArgumentModel]) -> None:
+        try:
+            self._connection.send_request(protocol.make_message(self._worker_id, self._coordinator_id, action, args))
+        except OSError as e:
+            self._logger.error(f"Failed to send '{action}' to the coordinator: {e}", separator=self._separator)
+
+    def _heartbeat_loop(self) -> None:
+        while True:
+            self._send(protocol.HEARTBEAT, [protocol.text(self._worker_id), protocol.text(str(self._capacity))])
+            if self._shutdown_signal.wait(self._heartbeat_interval_seconds):
+                return
+
+    def handle_message(self, message: MessageModel) -> None:
+        """The message listener for the connection. Ignores messages that are not part of the distributed protocol."""
+        action: str = message.payload.action
+        args = message.payload.args
+
+        if action == protocol.LEASE:
+            self._on_lease(args[0].value, args[1].value, protocol.read_binary(args[2]))
+        elif action == protocol.JOB:
+            self._on_job(args[0].value, protocol.read_binary(args[1]))
+        elif action == protocol.JOB_FINISHED:
+            self._on_job_finished(args[0].value)
+
+    def _on_job(self, job_id: str, setup: bytes) -> None:
+        initializer: Optional[Callable[..., None]]
+        initializer, initargs = pickle.loads(setup)
+
+        executor: Executor
+        if self._use_processes:
+            executor = ProcessPoolExecutor(max_workers=self._capacity, initializer=initializer, initargs=initargs)
+        else:
+            executor = ThreadPoolExecutor(max_workers=self._capacity, initializer=initializer, initargs=initargs)
+
+        with self._lock:
+            self._jobs[job_id] = executor
+        self._logger.debug(f"Set up job '{job_id}'.", separator=self._separator)
+
+    def _on_lease(self, job_id: str, task_id: str, payload: bytes) -> None:
+        with self._lock:
+            executor: Optional[Executor] = self._jobs.get(job_id)
+
+        if executor is None:
+            self._send_result(task_id, protocol.STATUS_ERROR, pickle.dumps(LookupError(f"Job '{job_id}' is not set up on '{self._worker_id}'.")))
+            return
+
+        try:
+            future: Future = executor.submit(_execute_payload, payload)
+        except RuntimeError as e:
+            # The job was finished, or its pool broke.
+            self._send_result(task_id, protocol.STATUS_ERROR, pickle.dumps(e))
+            return
+
+        future.add_done_callback(lambda done: self._on_task_done(task_id, done))
+
+    def _on_task_done(self, task_id: str, future: Future) -> None:
+        if future.cancelled():
+            # The worker is stopping; the coordinator reassigns the task.
+            return
+
+        exception: Optional[BaseException] = future.exception()
+        if exception is None:
+            status, payload = future.result()
+        else:
+            # The worker process itself failed, for example because it crashed.
+            status, payload = protocol.STATUS_ERROR, pickle.dumps(RuntimeError(repr(exception)))
+        self._send_result(task_id, status, payload)
+
+    def _send_result(self, task_id: str, status: str, payload: bytes) -> None:
+        self._send(protocol.RESULT, [protocol.text(self._worker_id), protocol.text(task_id), protocol.text(status), protocol.binary(payload)])
+
+    def _on_job_finished(self, job_id: str) -> None:
+        with self._lock:
+            executor: Optional[Executor] = self._jobs.pop(job_id, None)
+
+        if executor is not None:
+            # Not waiting: the coordinator only finishes a job once it has every result.
+            executor.shutdown(wait=False)
+            self._logger.debug(f"Released job '{job_id}'.", separator=self._separator)
+
+    def stop(self) -> None:
+        """Tells the coordinator to reassign the tasks leased to this worker, and releases every job."""
+        self._shutdown_signal.set()
+        if self._heartbeat_thread is not None:
+            self._heartbeat_thread.join()
+            self._heartbeat_thread = None
+
+        self._send(protocol.WORKER_STOPPING, [protocol.text(self._worker_id)])
+
+        with self._lock:
+            executors: List[Executor] = list(self._jobs.values())
+            self._jobs.clear()
+
+        for executor in executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._logger.info("Stopped.", separator=self._separator)
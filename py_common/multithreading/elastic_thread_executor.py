@@ -0,0 +1,150 @@
+import itertools
+import queue
+import threading
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Optional, Set, Tuple
+
+from ..logging import HoornLogger
+
+_Task = Tuple[Future, Callable[..., Any], Tuple, dict]
+
+
+class ElasticThreadExecutor(Executor):
+    """
+    A thread pool that grows and shrinks with the load, like the elastic :class:`WorkerPool` it runs the workers of.
+
+    Threads are only started when a task finds no idle thread, up to `max_threads`, and a thread idle for
+    `idle_timeout_seconds` exits again while more than `min_threads` are left. A burst therefore does not keep
+    `max_threads` threads alive for the lifetime of the executor.
+    """
+
+    def __init__(self,
+                 logger: HoornLogger,
+                 separator: str,
+                 min_threads: int,
+                 max_threads: int,
+                 idle_timeout_seconds: Optional[float] = None,
+                 thread_name_prefix: str = "ElasticThreadExecutor",
+                 thread_exit_callback: Optional[Callable[[], None]] = None):
+        """
+        :param min_threads: The number of threads kept alive once started, however long they are idle.
+        :param max_threads: The maximum number of threads.
+        :param idle_timeout_seconds: How long a thread waits for a task before exiting. None keeps every thread alive.
+        :param thread_exit_callback: Called on every thread of the executor just before it exits,
+        for example to release the resources bound to it.
+        """
+        self._logger = logger
+        self._separator = separator
+        self._min_threads: int = min_threads
+        self._max_threads: int = max_threads
+        self._idle_timeout_seconds: Optional[float] = idle_timeout_seconds
+        self._thread_name_prefix: str = thread_name_prefix
+        self._thread_exit_callback: Optional[Callable[[], None]] = thread_exit_callback
+
+        # None tells a thread to exit.
+        self._queue: "queue.SimpleQueue[Optional[_Task]]" = queue.SimpleQueue()
+        # Guards the thread counts; submitting and deciding to exit both hold it, so no task is left without a thread.
+        self._lock: threading.Lock = threading.Lock()
+        self._threads: Set[threading.Thread] = set()
+        # The threads waiting for a task, or about to, minus the queued tasks. Taking a task changes neither side,
+        # so a thread that has just taken one is never mistaken for an idle thread. Below zero, tasks lack a thread.
+        self._num_spare: int = 0
+        self._thread_ids = itertools.count()
+        self._shutdown: bool = False
+
+    @property
+    def num_threads(self) -> int:
+        with self._lock:
+            return len(self._threads)
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("Cannot schedule new tasks after shutdown.")
+
+            future: Future = Future()
+            self._queue.put((future, fn, args, kwargs))
+            self._num_spare -= 1
+            if self._num_spare < 0 and len(self._threads) < self._max_threads:
+                self.__start_thread()
+            return future
+
+    def __start_thread(self) -> None:
+        thread = threading.Thread(target=self._run, name=f"{self._thread_name_prefix}_{next(self._thread_ids)}", daemon=True)
+        self._threads.add(thread)
+        self._num_spare += 1
+        thread.start()
+
+    def __should_exit(self) -> bool:
+        """Called under the lock after waiting for a task in vain."""
+        # Without a spare thread, a task was queued for this one in the meantime.
+        if len(self._threads) <= self._min_threads or self._num_spare < 1:
+            return False
+        self._num_spare -= 1
+        self._threads.discard(threading.current_thread())
+        return True
+
+    def _run(self) -> None:
+        try:
+            while True:
+                try:
+                    task: Optional[_Task] = self._queue.get(timeout=self._idle_timeout_seconds)
+                except queue.Empty:
+                    with self._lock:
+                        if self.__should_exit():
+                            self._logger.trace(f"Thread idle for {self._idle_timeout_seconds} seconds, exiting.", separator=self._separator)
+                            return
+                    continue
+
+                if task is None:
+                    with self._lock:
+                        self._threads.discard(threading.current_thread())
+                    return
+
+                future, fn, args, kwargs = task
+                if future.set_running_or_notify_cancel():
+                    try:
+                        result = fn(*args, **kwargs)
+                    except BaseException as e:
+                        future.set_exception(e)
+                    else:
+                        future.set_result(result)
+                # Not kept alive while waiting for the next task.
+                del task, future, fn, args, kwargs
+
+                with self._lock:
+                    self._num_spare += 1
+        finally:
+            if self._thread_exit_callback is not None:
+                self._thread_exit_callback()
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        """
+        Stops accepting tasks. The threads finish the queued tasks and then stop.
+
+        :param wait: Whether to wait for the threads to stop.
+        :param cancel_futures: Whether to cancel the queued tasks instead of running them.
+        """
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            threads: Set[threading.Thread] = set(self._threads)
+
+        if cancel_futures:
+            while True:
+                try:
+                    task: Optional[_Task] = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if task is not None and task[0].cancel():
+                    task[0].set_running_or_notify_cancel()
+
+        # Queued after the remaining tasks, so each thread stops once the work is done.
+        for _ in threads:
+            self._queue.put(None)
+
+        if wait:
+            for thread in threads:
+                if thread is not threading.current_thread():
+                    thread.join()
@@ -0,0 +1,12 @@
+from enum import Enum
+
+
+class ExecutionMode(Enum):
+    """Determines how the :class:`ThreadManager` executes its batches."""
+    THREAD = "thread"
+    """Batches run on threads within the current process. Best for I/O-bound work."""
+    PROCESS = "process"
+    """Batches run in a pool of worker processes, bypassing the GIL. Best for CPU-bound work."""
+    DISTRIBUTED = "distributed"
+    """Batches are sent to worker components, possibly on other machines, through a :class:`DistributedCoordinator`.
+    Best for CPU-bound work that needs more cores than one machine has."""
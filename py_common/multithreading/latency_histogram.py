@@ -0,0 +1,122 @@
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+# Every power of two is split into this many equal sub-buckets, bounding the relative error of a percentile at 1/16.
+_SUB_BUCKET_BITS: int = 4
+_SUB_BUCKETS: int = 1 << _SUB_BUCKET_BITS
+# Values up to 2^63 ns (about 292 years), so any measured duration fits.
+_NUM_BUCKETS: int = _SUB_BUCKETS * (64 - _SUB_BUCKET_BITS + 1)
+
+
+def _bucket_index(value_ns: int) -> int:
+    if value_ns < _SUB_BUCKETS:
+        return value_ns
+    shift: int = value_ns.bit_length() - _SUB_BUCKET_BITS - 1
+    return _SUB_BUCKETS * (shift + 1) + ((value_ns >> shift) - _SUB_BUCKETS)
+
+
+def _bucket_upper_bound(index: int) -> int:
+    if index < _SUB_BUCKETS:
+        return index
+    shift: int = index // _SUB_BUCKETS - 1
+    return (((index % _SUB_BUCKETS) + _SUB_BUCKETS + 1) << shift) - 1
+
+
+@dataclass(frozen=True)
+class LatencySummary:
+    """Percentiles of the durations recorded in a :class:`LatencyHistogram`, in seconds."""
+    count: int
+    total_seconds: float
+    min_seconds: float
+    max_seconds: float
+    p50_seconds: float
+    p90_seconds: float
+    p99_seconds: float
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.count if self.count > 0 else 0.0
+
+
+class LatencyHistogram:
+    """
+    Records durations in nanoseconds into logarithmic buckets, so percentiles can be read at any time
+    without keeping the individual samples.
+
+    :meth:`record` is a few integer operations and a list increment; it is meant to be called by a single thread.
+    Reading from another thread while recording is safe, the summary may just be off by the samples recorded meanwhile.
+    """
+
+    __slots__ = ("_counts", "_count", "_total_ns", "_min_ns", "_max_ns")
+
+    def __init__(self):
+        self._counts: List[int] = [0] * _NUM_BUCKETS
+        self._count: int = 0
+        self._total_ns: int = 0
+        self._min_ns: Optional[int] = None
+        self._max_ns: int = 0
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def record(self, value_ns: int) -> None:
+        """Records a duration, as measured with :func:`time.perf_counter_ns`. Negative values count as 0."""
+        if value_ns < 0:
+            value_ns = 0
+
+        self._counts[_bucket_index(value_ns)] += 1
+        self._count += 1
+        self._total_ns += value_ns
+        if self._min_ns is None or value_ns < self._min_ns:
+            self._min_ns = value_ns
+        if value_ns > self._max_ns:
+            self._max_ns = value_ns
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Adds the samples of another histogram to this one."""
+        counts = other._counts
+        for index in range(_NUM_BUCKETS):
+            if counts[index]:
+                self._counts[index] += counts[index]
+
+        self._count += other._count
+        self._total_ns += other._total_ns
+        if other._min_ns is not None and (self._min_ns is None or other._min_ns < self._min_ns):
+            self._min_ns = other._min_ns
+        self._max_ns = max(self._max_ns, other._max_ns)
+
+    def percentile_ns(self, percentile: float) -> int:
+        """
+        :param percentile: Between 0 and 100.
+        :return: An upper bound of the duration below which `percentile` percent of the samples fall, or 0 without samples.
+        """
+        if self._count == 0:
+            return 0
+
+        rank: float = self._count * percentile / 100
+        seen: int = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if count and seen >= rank:
+                return min(_bucket_upper_bound(index), self._max_ns)
+        return self._max_ns
+
+    def summarize(self) -> LatencySummary:
+        return LatencySummary(
+            count=self._count,
+            total_seconds=self._total_ns / 1e9,
+            min_seconds=(self._min_ns or 0) / 1e9,
+            max_seconds=self._max_ns / 1e9,
+            p50_seconds=self.percentile_ns(50) / 1e9,
+            p90_seconds=self.percentile_ns(90) / 1e9,
+            p99_seconds=self.percentile_ns(99) / 1e9,
+        )
+
+    @staticmethod
+    def combined(histograms: Iterable["LatencyHistogram"]) -> "LatencyHistogram":
+        """Returns a new histogram holding the samples of all the given ones."""
+        result = LatencyHistogram()
+        for histogram in histograms:
+            result.merge(histogram)
+        return result
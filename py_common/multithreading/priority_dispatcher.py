@@ -0,0 +1,150 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .task_priority import TaskPriority
+from ..logging import HoornLogger
+
+_NO_DEADLINE: float = float("inf")
+
+
+class _PendingTask:
+    __slots__ = ("future", "func", "args", "enqueued_at", "deadline")
+
+    def __init__(self, future: Future, func: Callable[..., Any], args: Tuple, enqueued_at: float, deadline: float):
+        self.future: Future = future
+        self.func: Callable[..., Any] = func
+        self.args: Tuple = args
+        self.enqueued_at: float = enqueued_at
+        self.deadline: float = deadline
+
+
+class PriorityDispatcher:
+    """
+    Sits in front of an executor and decides which pending work starts next.
+
+    Work is handed to the executor only when one of its `capacity` slots frees up, so the order is decided here
+    instead of in the executor's FIFO queue: by priority class first, then earliest deadline, then submission order.
+    To keep low-priority work from starving, a task is promoted by one class for every `aging_seconds` it has waited.
+    """
+
+    def __init__(self, logger: HoornLogger, separator: str, executor: Executor, capacity: int, aging_seconds: float = 5.0):
+        self._logger = logger
+        self._separator = separator
+
+        self._executor: Executor = executor
+        self._capacity: int = capacity
+        self._aging_seconds: float = aging_seconds
+
+        self._lock: threading.Lock = threading.Lock()
+        # One heap per class, ordered by (deadline, sequence number).
+        self._queues: Dict[TaskPriority, List[Tuple[float, int, _PendingTask]]] = {priority: [] for priority in TaskPriority}
+        self._sequence = itertools.count()
+        self._num_running: int = 0
+        self._num_missed_deadlines: int = 0
+
+    def submit(self, func: Callable[..., Any], *args: Any, priority: TaskPriority = TaskPriority.NORMAL, deadline_seconds: Optional[float] = None) -> Future:
+        """
+        :param priority: The priority class of the work.
+        :param deadline_seconds: Within how many seconds from now the work should start. Only affects the ordering.
+        :return: A future for the result of ``func(*args)``.
+        """
+        now: float = time.monotonic()
+        future: Future = Future()
+        deadline: float = now + deadline_seconds if deadline_seconds is not None else _NO_DEADLINE
+
+        with self._lock:
+            heapq.heappush(self._queues[priority], (deadline, next(self._sequence), _PendingTask(future, func, args, now, deadline)))
+
+        self._dispatch()
+        return future
+
+    @property
+    def num_pending(self) -> int:
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+    @property
+    def num_missed_deadlines(self) -> int:
+        """The number of tasks that started after their deadline."""
+        return self._num_missed_deadlines
+
+    def _effective_priority(self, priority: TaskPriority, task: _PendingTask, now: float) -> float:
+        return priority - (now - task.enqueued_at) / self._aging_seconds
+
+    def _pop_next(self, now: float) -> Optional[_PendingTask]:
+        best: Optional[Tuple[float, float, int, TaskPriority]] = None
+
+        for priority, queue in self._queues.items():
+            if not queue:
+                continue
+            deadline, sequence, task = queue[0]
+            candidate = (self._effective_priority(priority, task, now), deadline, sequence, priority)
+            if best is None or candidate < best:
+                best = candidate
+
+        if best is None:
+            return None
+        return heapq.heappop(self._queues[best[3]])[2]
+
+    def _dispatch(self) -> None:
+        to_start: List[_PendingTask] = []
+
+        with self._lock:
+            now: float = time.monotonic()
+            while self._num_running < self._capacity:
+                task: Optional[_PendingTask] = self._pop_next(now)
+                if task is None:
+                    break
+                if not task.future.set_running_or_notify_cancel():
+                    # Cancelled while pending.
+                    continue
+
+                if task.deadline < now:
+                    self._num_missed_deadlines += 1
+                self._num_running += 1
+                to_start.append(task)
+
+        for task in to_start:
+            self._start(task)
+
+    def _start(self, task: _PendingTask) -> None:
+        try:
+            inner: Future = self._executor.submit(task.func, *task.args)
+        except BaseException as e:
+            self._on_finished()
+            task.future.set_exception(e)
+            return
+
+        inner.add_done_callback(lambda finished: self._complete(task.future, finished))
+
+    def _complete(self, future: Future, finished: Future) -> None:
+        self._on_finished()
+
+        if finished.cancelled():
+            future.set_exception(RuntimeError("The executor cancelled the task."))
+            return
+
+        exception: Optional[BaseException] = finished.exception()
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(finished.result())
+
+    def _on_finished(self) -> None:
+        with self._lock:
+            self._num_running -= 1
+        self._dispatch()
+
+    def cancel_pending(self) -> None:
+        """Cancels every task that has not started yet."""
+        with self._lock:
+            pending: List[_PendingTask] = [task for queue in self._queues.values() for _, _, task in queue]
+            for queue in self._queues.values():
+                queue.clear()
+
+        for task in pending:
+            task.future.cancel()
@@ -0,0 +1,64 @@
+"""
+Entry points executed inside the worker processes of :class:`ExecutionMode.PROCESS`.
+
+The worker template and the worker context are shipped to every process exactly once (through the process
+initializer) instead of being pickled along with every batch.
+"""
+import time
+from multiprocessing.util import Finalize
+from typing import Any, Callable, Optional, Tuple
+
+from .shared_context import SharedContextHandle
+
+_worker_template: Optional[Callable[[Any, Any], Any]] = None
+_worker_context: Any = None
+_worker_initializer: Optional[Callable[[], Any]] = None
+_worker_resource: Any = None
+
+
+def initialize_worker_process(worker_template: Callable[[Any, Any], Any],
+                              worker_context: Any,
+                              process_initializer: Optional[Callable[..., None]],
+                              initializer_args: Tuple,
+                              worker_initializer: Optional[Callable[[], Any]] = None,
+                              worker_finalizer: Optional[Callable[[Any], None]] = None) -> None:
+    """
+    Prepares a freshly started worker process.
+
+    :param worker_template: The function every batch is handed to.
+    :param worker_context: The context shared by every batch worked on by this process.
+    A :class:`SharedContextHandle` is attached to, so the batches receive zero-copy views of the shared data.
+    :param process_initializer: Optional user hook, called once per process before any batch is worked on.
+    :param initializer_args: The arguments for the process initializer.
+    :param worker_initializer: Creates the per-worker resource; every process is one worker.
+    It is passed to the worker template as a third argument.
+    :param worker_finalizer: Releases the resource when the process exits.
+    """
+    global _worker_template, _worker_context, _worker_initializer, _worker_resource
+
+    _worker_template = worker_template
+    _worker_context = worker_context.attach() if isinstance(worker_context, SharedContextHandle) else worker_context
+
+    if process_initializer is not None:
+        process_initializer(*initializer_args)
+
+    _worker_initializer = worker_initializer
+    if worker_initializer is not None:
+        _worker_resource = worker_initializer()
+        if worker_finalizer is not None:
+            # Run by multiprocessing when the worker process shuts down.
+            Finalize(None, worker_finalizer, args=(_worker_resource,), exitpriority=10)
+
+
+def run_batch(batch: Any) -> Any:
+    """Works on a single batch using the state set up by :func:`initialize_worker_process`."""
+    if _worker_initializer is not None:
+        return _worker_template(batch, _worker_context, _worker_resource)
+    return _worker_template(batch, _worker_context)
+
+
+def run_timed_batch(batch: Any) -> Tuple[Any, float]:
+    """Like :func:`run_batch`, but also returns the number of seconds the batch took."""
+    start = time.perf_counter()
+    result = run_batch(batch)
+    return result, time.perf_counter() - start
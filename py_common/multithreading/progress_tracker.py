@@ -0,0 +1,117 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from ..logging import HoornLogger
+from ..time_handling import TimeFormat, TimeUtils
+
+
+@dataclass(frozen=True)
+class ProgressSnapshot:
+    """The progress of a run at a point in time."""
+    processed: int
+    total: Optional[int]
+    """The total amount of work, or None when it is not known in advance (streaming)."""
+    unit_name: str
+    elapsed_seconds: float
+    throughput: float
+    """Processed units per second since the start of the run."""
+    eta_seconds: Optional[float]
+    """The estimated time left, or None when the total is not known."""
+    finished: bool = False
+
+    @property
+    def percentage(self) -> Optional[float]:
+        return self.processed / self.total * 100 if self.total else None
+
+
+class ProgressTracker:
+    """
+    Counts finished work and reports it at a limited rate, rather than once per batch.
+
+    A report is made when `interval_seconds` have passed since the previous one, or, if given, when another
+    `interval_percent` of the total has been processed; and always at the end. Between reports, :meth:`advance`
+    costs an addition and a clock read.
+    """
+
+    def __init__(self,
+                 logger: HoornLogger,
+                 separator: str,
+                 total: Optional[int],
+                 unit_name: str = "batches",
+                 interval_seconds: float = 1.0,
+                 interval_percent: Optional[float] = None,
+                 callback: Optional[Callable[[ProgressSnapshot], None]] = None):
+        """
+        :param total: The total amount of work, or None if unknown.
+        :param unit_name: What is being counted, used in the log messages.
+        :param interval_seconds: The minimum time between two reports.
+        :param interval_percent: Also report whenever this much more of the total was processed.
+        :param callback: Receives every report, for example to update a progress bar.
+        """
+        self._logger = logger
+        self._separator = separator
+        self._time_utils = TimeUtils()
+
+        self._total: Optional[int] = total
+        self._unit_name: str = unit_name
+        self._interval_seconds: float = interval_seconds
+        self._callback: Optional[Callable[[ProgressSnapshot], None]] = callback
+
+        self._units_per_percent_report: Optional[float] = total * interval_percent / 100 if total and interval_percent else None
+
+        self._processed: int = 0
+        self._start: float = time.perf_counter()
+        self._next_report_time: float = self._start + interval_seconds
+        self._next_report_units: float = self._units_per_percent_report or float("inf")
+
+    @property
+    def processed(self) -> int:
+        return self._processed
+
+    def advance(self, units: int = 1) -> None:
+        """Records finished work. Must be called from a single thread."""
+        self._processed += units
+
+        now: float = time.perf_counter()
+        if now >= self._next_report_time or self._processed >= self._next_report_units:
+            self._report(now, finished=False)
+
+    def finish(self) -> ProgressSnapshot:
+        """Makes the final report."""
+        return self._report(time.perf_counter(), finished=True)
+
+    def snapshot(self, now: Optional[float] = None, finished: bool = False) -> ProgressSnapshot:
+        now = time.perf_counter() if now is None else now
+        elapsed: float = now - self._start
+        throughput: float = self._processed / elapsed if elapsed > 0 else 0.0
+
+        eta: Optional[float] = None
+        if self._total is not None:
+            eta = max(self._total - self._processed, 0) / throughput if throughput > 0 else None
+
+        return ProgressSnapshot(self._processed, self._total, self._unit_name, elapsed, throughput, eta, finished)
+
+    def _report(self, now: float, finished: bool) -> ProgressSnapshot:
+        self._next_report_time = now + self._interval_seconds
+        if self._units_per_percent_report is not None:
+            while self._next_report_units <= self._processed:
+                self._next_report_units += self._units_per_percent_report
+
+        snapshot: ProgressSnapshot = self.snapshot(now, finished)
+        self._logger.info(self._format(snapshot), separator=self._separator)
+
+        if self._callback is not None:
+            self._callback(snapshot)
+        return snapshot
+
+    def _format(self, snapshot: ProgressSnapshot) -> str:
+        throughput: str = f"{round(snapshot.throughput, 2)} {self._unit_name}/s"
+
+        if snapshot.finished:
+            return f"Finished processing {snapshot.processed} {self._unit_name} in {self._time_utils.format_time(snapshot.elapsed_seconds, TimeFormat.Dynamic)} ({throughput})."
+
+        if snapshot.total:
+            eta: str = self._time_utils.format_time(snapshot.eta_seconds, TimeFormat.Dynamic) if snapshot.eta_seconds is not None else "unknown"
+            return f"Processed {snapshot.processed}/{snapshot.total} ({round(snapshot.percentage, 4)}%) {self._unit_name}, {throughput}, ETA {eta}."
+        return f"Processed {snapshot.processed} {self._unit_name}, {throughput}."
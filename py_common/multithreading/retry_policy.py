@@ -0,0 +1,22 @@
+from typing import Tuple, Type
+
+import pydantic
+
+
+class RetryPolicy(pydantic.BaseModel):
+    """Describes which failed batches are worked on again, how often and after how long."""
+    max_attempts: int = 3
+    """The total number of attempts per batch, including the first one."""
+    retry_on: Tuple[Type[BaseException], ...] = (TimeoutError, ConnectionError)
+    """The exception types considered transient. A batch failing with anything else is not retried."""
+    initial_backoff_seconds: float = 0.5
+    backoff_multiplier: float = 2.0
+    max_backoff_seconds: float = 30.0
+
+    def should_retry(self, exception: BaseException, attempts: int) -> bool:
+        """Whether a batch that failed with `exception` after `attempts` attempts gets another one."""
+        return attempts < self.max_attempts and isinstance(exception, self.retry_on)
+
+    def backoff_seconds(self, attempts: int) -> float:
+        """How long to wait before the next attempt, after `attempts` failed ones."""
+        return min(self.initial_backoff_seconds * self.backoff_multiplier ** (attempts - 1), self.max_backoff_seconds)
@@ -0,0 +1,10 @@
+from enum import Enum
+
+
+class SchedulingStrategy(Enum):
+    """Determines how the :class:`ThreadManager` distributes batches over its threads in thread mode."""
+    SHARED_QUEUE = "shared_queue"
+    """All threads take from one queue, in priority order. Best when batches cost about the same."""
+    WORK_STEALING = "work_stealing"
+    """Every thread has its own queue and idle threads steal from the others. Best for batches of very uneven cost,
+    and for worker templates that submit more work themselves. Priorities and deadlines are not applied."""
@@ -0,0 +1,195 @@
+import weakref
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, Iterator, List, Mapping, Tuple, Union
+
+from ..logging import HoornLogger
+
+SharedBuffer = Union[bytes, bytearray, memoryview]
+
+
+@dataclass(frozen=True)
+class SharedSegmentSpec:
+    """Describes a single shared memory segment, enough to map it again in another process."""
+    segment_name: str
+    nbytes: int
+    shape: Union[Tuple[int, ...], None] = None
+    """The shape of the stored numpy array, or None if the segment holds a raw byte buffer."""
+    dtype: Union[str, None] = None
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("numpy is required to share or map numpy arrays.") from e
+    return numpy
+
+
+def _is_numpy_array(value: Any) -> bool:
+    return type(value).__module__ == "numpy" and type(value).__name__ == "ndarray"
+
+
+def _open_segment(segment_name: str) -> SharedMemory:
+    try:
+        # Python 3.13+: keep the resource tracker from unlinking a segment this process does not own.
+        return SharedMemory(name=segment_name, track=False)
+    except TypeError:
+        return SharedMemory(name=segment_name)
+
+
+def _make_view(segment: SharedMemory, spec: SharedSegmentSpec, writable: bool) -> Any:
+    if spec.shape is None:
+        view = segment.buf[:spec.nbytes]
+        return view if writable else view.toreadonly()
+
+    numpy = _import_numpy()
+    array = numpy.ndarray(spec.shape, dtype=numpy.dtype(spec.dtype), buffer=segment.buf)
+    array.flags.writeable = writable
+    return array
+
+
+def _release_segments(segments: List[SharedMemory], unlink: bool) -> None:
+    for segment in segments:
+        try:
+            segment.close()
+        except BufferError:
+            # Views are still alive; the mapping goes away together with them.
+            pass
+
+        if unlink:
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class AttachedSharedContext(Mapping[str, Any]):
+    """Read access to a :class:`SharedContext` from within a worker. Items are zero-copy views of the shared segments."""
+
+    def __init__(self, specs: Mapping[str, SharedSegmentSpec], writable: bool):
+        self._segments: List[SharedMemory] = []
+        self._views: Dict[str, Any] = {}
+
+        for key, spec in specs.items():
+            segment = _open_segment(spec.segment_name)
+            self._segments.append(segment)
+            self._views[key] = _make_view(segment, spec, writable)
+
+        self._finalizer = weakref.finalize(self, _release_segments, self._segments, False)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._views[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._views)
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+    def close(self) -> None:
+        """Unmaps the segments from this process. The segments themselves stay alive until the owner closes them."""
+        self._views.clear()
+        self._finalizer()
+
+
+@dataclass(frozen=True)
+class SharedContextHandle:
+    """A small, picklable reference to a :class:`SharedContext`. Send this to workers instead of the data itself."""
+    specs: Mapping[str, SharedSegmentSpec]
+    writable: bool = False
+
+    def attach(self) -> AttachedSharedContext:
+        """Maps every segment into the current process."""
+        return AttachedSharedContext(self.specs, self.writable)
+
+
+class SharedContext(Mapping[str, Any]):
+    """
+    Places numpy arrays and byte buffers in shared memory exactly once, so process-based workers can map them
+    instead of receiving a pickled copy.
+
+    Pass it as the ``worker_context`` of a :class:`ThreadManager`; workers receive a mapping of zero-copy views in
+    both thread and process mode. The segments are unlinked by :meth:`close`, when leaving the ``with`` block, or
+    at the latest when the object is garbage collected.
+
+    Example::
+
+        with SharedContext(logger, {"features": matrix, "vocabulary": vocab_bytes}) as context:
+            manager.work_batches(batches, context)
+    """
+
+    def __init__(self, logger: HoornLogger, items: Mapping[str, Any], writable: bool = False):
+        """
+        :param logger: The logger to use.
+        :param items: The numpy arrays and bytes-like objects to share, by key.
+        :param writable: Whether workers may write into the shared data. Defaults to read-only views.
+        """
+        self._separator = "Common.SharedContext"
+        self._logger = logger
+
+        self._segments: List[SharedMemory] = []
+        self._finalizer = weakref.finalize(self, _release_segments, self._segments, True)
+
+        specs: Dict[str, SharedSegmentSpec] = {}
+        self._views: Dict[str, Any] = {}
+
+        try:
+            for key, value in items.items():
+                segment, spec = self._share(value)
+                specs[key] = spec
+                self._views[key] = _make_view(segment, spec, writable)
+        except BaseException:
+            self.close()
+            raise
+
+        self._handle = SharedContextHandle(specs, writable)
+        self._logger.debug(f"Shared {len(specs)} item(s) totalling {sum(spec.nbytes for spec in specs.values())} bytes.", separator=self._separator)
+
+    def _share(self, value: Any) -> Tuple[SharedMemory, SharedSegmentSpec]:
+        if _is_numpy_array(value):
+            numpy = _import_numpy()
+            source = numpy.ascontiguousarray(value)
+            spec_shape, spec_dtype = source.shape, source.dtype.str
+            source_bytes = memoryview(source.reshape(-1).view(numpy.uint8))
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            source_bytes = memoryview(value).cast("B")
+            spec_shape, spec_dtype = None, None
+        else:
+            message: str = f"Cannot share object of type '{type(value).__name__}'; only numpy arrays and bytes-like objects are supported."
+            self._logger.error(message, separator=self._separator)
+            raise TypeError(message)
+
+        nbytes: int = source_bytes.nbytes
+        # Zero-sized segments are not allowed.
+        segment = SharedMemory(create=True, size=max(nbytes, 1))
+        self._segments.append(segment)
+        segment.buf[:nbytes] = source_bytes
+
+        return segment, SharedSegmentSpec(segment.name, nbytes, spec_shape, spec_dtype)
+
+    @property
+    def handle(self) -> SharedContextHandle:
+        """The picklable handle used to attach to this context from another process."""
+        return self._handle
+
+    def __getitem__(self, key: str) -> Any:
+        return self._views[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._views)
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+    def close(self) -> None:
+        """Releases and unlinks every segment. Workers must be done with the context."""
+        self._views.clear()
+        self._finalizer()
+        self._logger.trace("Released shared memory segments.", separator=self._separator)
+
+    def __enter__(self) -> "SharedContext":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
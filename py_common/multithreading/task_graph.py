@@ -0,0 +1,171 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass
+from graphlib import CycleError, TopologicalSorter
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .task_graph_report import TaskGraphReport, TaskOutcome, TaskStatus
+from .thread_manager import ThreadManager, ThreadManagerConfig
+from ..logging import HoornLogger
+
+
+@dataclass(frozen=True)
+class _Task:
+    name: str
+    func: Callable[[Mapping[str, Any]], Any]
+    depends_on: Tuple[str, ...]
+
+
+def _run_task(func: Callable[[Mapping[str, Any]], Any], inputs: Mapping[str, Any]) -> Tuple[float, Any, float]:
+    start = time.perf_counter()
+    result = func(inputs)
+    return start, result, time.perf_counter()
+
+
+class TaskGraph:
+    """
+    Runs tasks with dependencies on a :class:`ThreadManager`, starting every task as soon as the tasks it depends on
+    have finished, rather than stage by stage.
+
+    A task is a callable receiving the results of its dependencies, by task name. When a task fails, the tasks
+    depending on it (directly or not) are skipped; independent branches carry on.
+
+    Example::
+
+        graph = TaskGraph(logger, num_threads=4)
+        graph.add_task("load", lambda inputs: load_rows())
+        graph.add_task("clean", lambda inputs: clean(inputs["load"]), depends_on=["load"])
+        graph.add_task("stats", lambda inputs: describe(inputs["load"]), depends_on=["load"])
+        report = graph.run()
+    """
+    def __init__(self, logger: HoornLogger, num_threads: int, graph_name: str = "TaskGraph"):
+        self._separator = "Common.TaskGraph"
+        self._logger: HoornLogger = logger
+        self._num_threads: int = num_threads
+        self._graph_name: str = graph_name
+
+        self._tasks: Dict[str, _Task] = {}
+
+    def add_task(self, name: str, func: Callable[[Mapping[str, Any]], Any], depends_on: Iterable[str] = ()) -> None:
+        """
+        :param name: The unique name of the task.
+        :param func: Called with a mapping of the results of the dependencies, by task name.
+        :param depends_on: The names of the tasks whose results this task needs.
+        """
+        if name in self._tasks:
+            raise ValueError(f"A task named '{name}' already exists.")
+        self._tasks[name] = _Task(name, func, tuple(depends_on))
+
+    def _validate(self) -> None:
+        for task in self._tasks.values():
+            unknown: List[str] = [dependency for dependency in task.depends_on if dependency not in self._tasks]
+            if unknown:
+                message: str = f"Task '{task.name}' depends on unknown task(s): {', '.join(unknown)}."
+                self._logger.error(message, separator=self._separator)
+                raise ValueError(message)
+
+    def run(self) -> TaskGraphReport:
+        """
+        Runs every task once.
+
+        :return: The outcome of every task and the timing of the run, including its critical path.
+        :raises CycleError: If the dependencies contain a cycle.
+        """
+        self._validate()
+
+        sorter: TopologicalSorter = TopologicalSorter({name: task.depends_on for name, task in self._tasks.items()})
+        try:
+            sorter.prepare()
+        except CycleError as e:
+            self._logger.error(f"Task dependency cycle: {e.args[1]}", separator=self._separator)
+            raise
+
+        manager: ThreadManager = ThreadManager(self._logger, ThreadManagerConfig(
+            num_threads=self._num_threads,
+            worker_template=_run_task,
+            worker_name=self._graph_name,
+        ))
+
+        outcomes: Dict[str, TaskOutcome] = {}
+        running: Dict[Future, str] = {}
+        run_start: float = time.perf_counter()
+
+        try:
+            while sorter.is_active():
+                for name in sorter.get_ready():
+                    task: _Task = self._tasks[name]
+                    blocked_by: List[str] = [d for d in task.depends_on if outcomes[d].status != TaskStatus.SUCCEEDED]
+                    if blocked_by:
+                        self._logger.warning(f"Skipping task '{name}' because of failed dependencies: {', '.join(blocked_by)}.", separator=self._separator)
+                        outcomes[name] = TaskOutcome(name, TaskStatus.SKIPPED)
+                        sorter.done(name)
+                        continue
+
+                    inputs: Dict[str, Any] = {d: outcomes[d].result for d in task.depends_on}
+                    self._logger.debug(f"Starting task '{name}'.", separator=self._separator)
+                    running[manager.submit(task.func, inputs)] = name
+
+                if not running:
+                    # Only skipped tasks became ready; ask the sorter for the next ones.
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    outcomes[name] = self._to_outcome(name, future, run_start)
+                    sorter.done(name)
+        finally:
+            for future in running:
+                future.cancel()
+            manager.shutdown()
+
+        report: TaskGraphReport = self._build_report(outcomes, time.perf_counter() - run_start)
+        self._log_report(report)
+        return report
+
+    def _to_outcome(self, name: str, future: Future, run_start: float) -> TaskOutcome:
+        exception: Optional[BaseException] = future.exception()
+        if exception is not None:
+            self._logger.error(f"Task '{name}' failed: {exception!r}", separator=self._separator)
+            return TaskOutcome(name, TaskStatus.FAILED, exception=exception)
+
+        start, result, end = future.result()
+        self._logger.debug(f"Finished task '{name}'.", separator=self._separator)
+        return TaskOutcome(name, TaskStatus.SUCCEEDED, result, started_at=start - run_start, finished_at=end - run_start)
+
+    def _build_report(self, outcomes: Dict[str, TaskOutcome], wall_seconds: float) -> TaskGraphReport:
+        # Longest chain by summed duration, computed in dependency order.
+        chain_seconds: Dict[str, float] = {}
+        chain_previous: Dict[str, Optional[str]] = {}
+
+        for name in TopologicalSorter({n: t.depends_on for n, t in self._tasks.items()}).static_order():
+            previous: Optional[str] = max(self._tasks[name].depends_on, key=lambda d: chain_seconds[d], default=None)
+            chain_previous[name] = previous
+            chain_seconds[name] = outcomes[name].duration_seconds + (chain_seconds[previous] if previous is not None else 0.0)
+
+        if not chain_seconds:
+            return TaskGraphReport(outcomes, wall_seconds)
+
+        last: Optional[str] = max(chain_seconds, key=lambda n: chain_seconds[n])
+        critical_path_seconds: float = chain_seconds[last]
+        critical_path: List[str] = []
+        while last is not None:
+            critical_path.append(last)
+            last = chain_previous[last]
+        critical_path.reverse()
+
+        return TaskGraphReport(outcomes, wall_seconds, critical_path, critical_path_seconds)
+
+    def _log_report(self, report: TaskGraphReport) -> None:
+        counts: Dict[TaskStatus, int] = {status: 0 for status in TaskStatus}
+        for outcome in report.outcomes.values():
+            counts[outcome.status] += 1
+
+        parallelism: float = report.busy_seconds / report.wall_seconds if report.wall_seconds > 0 else 0.0
+        self._logger.info(
+            f"Ran {len(report.outcomes)} tasks in {round(report.wall_seconds, 4)}s "
+            f"({counts[TaskStatus.SUCCEEDED]} succeeded, {counts[TaskStatus.FAILED]} failed, {counts[TaskStatus.SKIPPED]} skipped), "
+            f"parallelism {round(parallelism, 2)}. "
+            f"Critical path ({round(report.critical_path_seconds, 4)}s): {' -> '.join(report.critical_path)}.",
+            separator=self._separator
+        )
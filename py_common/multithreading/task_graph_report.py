@@ -0,0 +1,51 @@
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+
+class TaskStatus(Enum):
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+    """Not run, because a task it depends on failed or was skipped."""
+
+
+@dataclass(frozen=True)
+class TaskOutcome:
+    """What happened to a single task of a :class:`TaskGraph`. Times are seconds since the start of the run."""
+    name: str
+    status: TaskStatus
+    result: Any = None
+    exception: Optional[BaseException] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def duration_seconds(self) -> float:
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+
+@dataclass(frozen=True)
+class TaskGraphReport:
+    """The outcome and timing of a :class:`TaskGraph` run."""
+    outcomes: Dict[str, TaskOutcome]
+    wall_seconds: float
+    critical_path: List[str] = field(default_factory=list)
+    """The chain of dependent tasks with the largest summed duration; the run cannot be faster than this chain."""
+    critical_path_seconds: float = 0.0
+
+    @property
+    def succeeded(self) -> bool:
+        return all(outcome.status == TaskStatus.SUCCEEDED for outcome in self.outcomes.values())
+
+    @property
+    def results(self) -> Dict[str, Any]:
+        """The results of the tasks that succeeded, by name."""
+        return {name: outcome.result for name, outcome in self.outcomes.items() if outcome.status == TaskStatus.SUCCEEDED}
+
+    @property
+    def busy_seconds(self) -> float:
+        """The summed duration of every task; divided by the wall time, this is the achieved parallelism."""
+        return sum(outcome.duration_seconds for outcome in self.outcomes.values())
@@ -0,0 +1,10 @@
+from enum import IntEnum
+
+
+class TaskPriority(IntEnum):
+    """The priority class of submitted work. Lower values are dispatched first."""
+    INTERACTIVE = 0
+    """Someone is waiting for the result."""
+    NORMAL = 1
+    BULK = 2
+    """Background (re)processing that may wait."""
@@ -1,99 +1,491 @@
+import pickle
 import threading
 import time
-from threading import Semaphore, Thread
-from typing import Callable, List, Union
+from collections.abc import Sized
+from concurrent.futures import CancelledError, Executor, Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import pydantic
 
+from .adaptive_chunker import AdaptiveChunker
+from .batch_run import BatchOutcome, BatchRun
+from .batch_run_summary import BatchRunSummary
+from .cancellation_token import CancellationToken
+from .distributed_coordinator import DistributedCoordinator
+from .elastic_thread_executor import ElasticThreadExecutor
+from .execution_mode import ExecutionMode
+from .priority_dispatcher import PriorityDispatcher
+from .progress_tracker import ProgressSnapshot, ProgressTracker
+from .process_batch_runner import initialize_worker_process, run_batch, run_timed_batch
+from .retry_policy import RetryPolicy
+from .scheduling_strategy import SchedulingStrategy
+from .shared_context import SharedContext
+from .task_priority import TaskPriority
+from .work_stealing_executor import WorkStealingExecutor
 from .worker import T, Worker, U
 from .worker_pool import WorkerPool
-from ..logging import HoornLogger
+from .worker_timing_statistics import PoolTimingStatistics
+from ..logging import HoornLogger, LogType
+
+
+def _len_or_none(collection: Iterable) -> Optional[int]:
+    return len(collection) if isinstance(collection, Sized) else None
 
 
 class ThreadManagerConfig(pydantic.BaseModel):
+    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
+
     num_threads: int
-    worker_template: Callable[[T, U], None]
+    worker_template: Callable[[T, U], Any]
     worker_name: str
 
+    max_threads: Optional[int] = None
+    """Lets the threads and the worker pool grow beyond `num_threads`, up to this many, while batches are waiting.
+    With work stealing, all `max_threads` threads are started up front; only the worker pool is elastic."""
+    worker_idle_timeout_seconds: Optional[float] = None
+    """Stops threads and retires workers idle for this long, down to `num_threads` of them."""
+
+    worker_initializer: Optional[Callable[[], Any]] = None
+    """Creates a resource once per thread (in thread mode) or worker process, such as a database connection.
+    It is passed to the worker template as a third argument: ``worker_template(batch, context, resource)``.
+    A resource is only ever used on the thread that created it, so thread-affine handles are safe."""
+    worker_finalizer: Optional[Callable[[Any], None]] = None
+    """Releases a resource on its own thread when the thread stops (idle, or at shutdown with `wait`),
+    otherwise on the thread calling :meth:`ThreadManager.shutdown`; in process mode, when the process exits."""
+
+    execution_mode: ExecutionMode = ExecutionMode.THREAD
+    """Use :attr:`ExecutionMode.PROCESS` for CPU-bound templates; `num_threads` then is the number of processes.
+    The processes are started on first use and kept for every run and submission with the same context object,
+    so many short runs pay the start-up once; passing another context restarts them, so runs with different contexts
+    should not overlap. :meth:`ThreadManager.shutdown` stops them."""
+    process_initializer: Optional[Callable[..., None]] = None
+    """Called once in every worker process before it works on any batch. Only used in process and distributed mode."""
+    initializer_args: Tuple = ()
+    distributed_coordinator: Optional[DistributedCoordinator] = None
+    """Sends the batches to the worker components in distributed mode, which requires it.
+    The worker template, context and initializers must be importable by the workers, and everything must be picklable.
+    Set `num_threads` to the combined capacity of the workers; it bounds the number of batches in flight."""
+
+    retry_policy: Optional[RetryPolicy] = None
+    """Retries batches failing with transient exceptions. By default, a failed batch is not retried."""
+    batch_timeout_seconds: Optional[float] = None
+    """Abandons batches running longer than this, failing them with a `TimeoutError` (retryable through the policy).
+    The thread or process cannot be interrupted, so the abandoned batch finishes in the background, in every mode.
+    Until then it keeps its thread or process: the run schedules fewer batches meanwhile,
+    and :meth:`ThreadManager.shutdown` with `wait` waits for it."""
+
+    scheduling_strategy: SchedulingStrategy = SchedulingStrategy.SHARED_QUEUE
+    """How batches are distributed over the threads in thread mode."""
+    priority_aging_seconds: float = 5.0
+    """Waiting work is promoted by one :class:`TaskPriority` class for every this many seconds, so it cannot starve."""
+
+    progress_interval_seconds: float = 1.0
+    """The minimum time between two progress reports."""
+    progress_interval_percent: Optional[float] = None
+    """Also report progress whenever this much more of the total was processed. Needs a known total."""
+    progress_callback: Optional[Callable[[ProgressSnapshot], None]] = None
+    """Receives every progress report, including throughput and ETA, for example to drive a UI."""
+
+    log_timing_statistics: bool = False
+    """Logs the queue-wait and run-time percentiles of the workers at the end of every run. Thread mode only;
+    they are available at any time through :meth:`ThreadManager.get_timing_statistics`."""
+
 
 class ThreadManager:
     """Used to divide work across multiple threads and in batches. Can severely increase performance/speed."""
     def __init__(self, logger: HoornLogger, config: ThreadManagerConfig):
         self._separator = "Common.ThreadManager"
-        self._num_processed_batches: int = 0
 
         self._config: ThreadManagerConfig = config
         self._logger: HoornLogger = logger
 
-        self._worker_pool: WorkerPool = WorkerPool(logger, self._config.num_threads, self._config.worker_template, self._config.worker_name)
+        if self._config.execution_mode == ExecutionMode.DISTRIBUTED and self._config.distributed_coordinator is None:
+            message: str = "Distributed mode requires a distributed coordinator."
+            self._logger.error(message, separator=self._separator)
+            raise ValueError(message)
+
+        self._max_threads: int = max(self._config.max_threads or 0, self._config.num_threads)
+        self._worker_pool: WorkerPool = WorkerPool(
+            logger,
+            self._config.num_threads,
+            self._config.worker_template,
+            self._config.worker_name,
+            grow_pool_automatically=self._max_threads > self._config.num_threads,
+            grow_by=1,
+            max_pool_size=self._max_threads,
+            idle_timeout_seconds=self._config.worker_idle_timeout_seconds,
+            worker_initializer=self._config.worker_initializer,
+            worker_finalizer=self._config.worker_finalizer,
+        )
 
-        self._progress_lock: threading.Lock = threading.Lock()
+        self._executor_lock: threading.Lock = threading.Lock()
+        self._thread_executor: Optional[Executor] = None
+        # Orders pending thread-mode work by priority and deadline; the executor only sees what can start right away.
+        # Not used with work stealing, whose threads need queued work to steal.
+        self._thread_dispatcher: Optional[PriorityDispatcher] = None
+        # A process pool, or in distributed mode a job on the worker components.
+        self._process_executor: Optional[Executor] = None
+        # The process pool is bound to the context it was started with, because the context is sent at start-up.
+        self._process_executor_context: Any = None
 
-        self._semaphore: Semaphore = Semaphore(self._config.num_threads)
         self._logger.trace("Successfully initialized.", separator=self._separator)
 
-    def __get_worker(self, seconds_to_retry: float = 1) -> Worker:
-        worker: Union[Worker, None] = self._worker_pool.get_worker()
-        if worker:
-            return worker
-        else:
-            self._logger.warning(f"No worker available, trying again in {seconds_to_retry} seconds...")
-            time.sleep(seconds_to_retry)
-            return self.__get_worker(seconds_to_retry * 1.5)
+    def __get_worker(self) -> Worker:
+        # Blocks until a worker is returned to the pool; waiting callers are woken in order.
+        return self._worker_pool.get_worker(block=True)
+
+    def _trace_batch(self, batch: T, truncation_threshold: int) -> None:
+        err = 'CANNOT PRINT, OBJECT HAS NO \'get_printed\' METHOD'
+        printed = batch.get_printed() if hasattr(batch, 'get_printed') else err
+
+        if isinstance(batch, list):
+            if (len(batch) > 0 and not hasattr(batch[0], 'get_printed')) or len(batch) == 0:
+                ...
+            else:
+                printed_items: List[str] = [item.get_printed() for item in batch[:truncation_threshold]]
+                printed = "\n".join(printed_items)
+
+        self._logger.trace(f"Working on batch: {printed}", separator=self._separator)
 
-    def _work_batch(self, batch: T, worker_context: U, total_to_process: int, truncation_threshold: int = 10):
+    def _work_batch(self, batch: T, worker_context: U, scheduled_at_ns: Optional[int] = None, truncation_threshold: int = 10) -> Any:
         """Work on a batch of tasks."""
+        if self._logger.is_enabled_for(LogType.TRACE):
+            self._trace_batch(batch, truncation_threshold)
+
+        worker: Worker = self.__get_worker()
+
+        return worker.work(batch, worker_context, scheduled_at_ns)
+
+    def _work_timed_batch(self, batch: T, worker_context: U, scheduled_at_ns: Optional[int] = None) -> Tuple[Any, float]:
+        start = time.perf_counter()
+        result = self._work_batch(batch, worker_context, scheduled_at_ns)
+        return result, time.perf_counter() - start
+
+    def _ensure_picklable(self, obj: object, description: str) -> None:
         try:
-            self._semaphore.acquire()
+            pickle.dumps(obj)
+        except Exception as e:
+            message: str = f"The {description} cannot be sent to worker processes because it is not picklable: {e}"
+            self._logger.error(message, separator=self._separator)
+            raise TypeError(message) from e
+
+    def _start_process_executor(self, worker_context: U) -> Executor:
+        distributed: bool = self._config.execution_mode == ExecutionMode.DISTRIBUTED
+
+        shipped_context = worker_context
+        if isinstance(worker_context, SharedContext):
+            # Only the segment names travel to the processes; the data itself is mapped.
+            # Other machines cannot map it, so they get a copy.
+            shipped_context = dict(worker_context) if distributed else worker_context.handle
+
+        self._ensure_picklable(self._config.worker_template, "worker template")
+        self._ensure_picklable((self._config.worker_initializer, self._config.worker_finalizer), "worker initializer or finalizer")
+        self._ensure_picklable(shipped_context, "worker context")
+
+        initargs: Tuple = (
+            self._config.worker_template,
+            shipped_context,
+            self._config.process_initializer,
+            self._config.initializer_args,
+            self._config.worker_initializer,
+            self._config.worker_finalizer,
+        )
+
+        if distributed:
+            self._logger.trace("Starting a distributed job...", separator=self._separator)
+            return self._config.distributed_coordinator.create_executor(initialize_worker_process, initargs)
+
+        self._logger.trace("Starting processes...", separator=self._separator)
+        return ProcessPoolExecutor(max_workers=self._config.num_threads, initializer=initialize_worker_process, initargs=initargs)
+
+    def _get_executor(self, worker_context: U) -> Executor:
+        with self._executor_lock:
+            if self._config.execution_mode == ExecutionMode.THREAD:
+                if self._thread_executor is None:
+                    self._logger.trace("Starting threads...", separator=self._separator)
+                    if self._config.scheduling_strategy == SchedulingStrategy.WORK_STEALING:
+                        self._thread_executor = WorkStealingExecutor(
+                            self._logger,
+                            self._separator,
+                            self._max_threads,
+                            thread_name_prefix=self._config.worker_name,
+                            thread_exit_callback=self._worker_pool.release_thread_resources,
+                        )
+                    else:
+                        # Threads are started as work arrives and stop again once idle, along with the worker pool.
+                        self._thread_executor = ElasticThreadExecutor(
+                            self._logger,
+                            self._separator,
+                            min_threads=self._config.num_threads,
+                            max_threads=self._max_threads,
+                            idle_timeout_seconds=self._config.worker_idle_timeout_seconds,
+                            thread_name_prefix=self._config.worker_name,
+                            thread_exit_callback=self._worker_pool.release_thread_resources,
+                        )
+                        self._thread_dispatcher = PriorityDispatcher(
+                            self._logger, self._separator, self._thread_executor, self._max_threads, self._config.priority_aging_seconds
+                        )
+                return self._thread_executor
+
+            if self._process_executor is not None and self._process_executor_context is not worker_context:
+                self._logger.debug("Worker context changed, restarting the worker processes.", separator=self._separator)
+                self._process_executor.shutdown(wait=True)
+                self._process_executor = None
+
+            if self._process_executor is None:
+                self._process_executor = self._start_process_executor(worker_context)
+                self._process_executor_context = worker_context
+            return self._process_executor
+
+    def _submit_to(self,
+                   executor: Executor,
+                   batch: T,
+                   worker_context: U,
+                   priority: TaskPriority = TaskPriority.NORMAL,
+                   deadline_seconds: Optional[float] = None) -> Future:
+        if self._config.execution_mode != ExecutionMode.THREAD:
+            return executor.submit(run_batch, batch)
+        if self._thread_dispatcher is None:
+            return executor.submit(self._work_batch, batch, worker_context, time.perf_counter_ns())
+        return self._thread_dispatcher.submit(
+            self._work_batch, batch, worker_context, time.perf_counter_ns(), priority=priority, deadline_seconds=deadline_seconds
+        )
 
-            err = 'CANNOT PRINT, OBJECT HAS NO \'get_printed\' METHOD'
-            printed = batch.get_printed() if hasattr(batch, 'get_printed') else err
+    def _submit_timed_to(self, executor: Executor, batch: T, worker_context: U, priority: TaskPriority = TaskPriority.NORMAL) -> Future:
+        if self._config.execution_mode != ExecutionMode.THREAD:
+            return executor.submit(run_timed_batch, batch)
+        if self._thread_dispatcher is None:
+            return executor.submit(self._work_timed_batch, batch, worker_context, time.perf_counter_ns())
+        return self._thread_dispatcher.submit(self._work_timed_batch, batch, worker_context, time.perf_counter_ns(), priority=priority)
 
-            if isinstance(batch, list):
-                if (len(batch) > 0 and not hasattr(batch[0], 'get_printed')) or len(batch) == 0:
-                    ...
-                else:
-                    printed_items: List[str] = [item.get_printed() for item in batch[:truncation_threshold]]
-                    printed = "\n".join(printed_items)
+    def submit(self,
+               batch: T,
+               worker_context: U,
+               priority: TaskPriority = TaskPriority.NORMAL,
+               deadline_seconds: Optional[float] = None) -> Future:
+        """
+        Schedules a single batch.
+
+        :param batch: The batch to work on.
+        :param worker_context: The context for the batch.
+        In process mode, the worker processes are kept alive for as long as the same context object is passed;
+        call :meth:`shutdown` to stop them.
+        A worker template may submit more batches itself; with work stealing, they are queued on its own thread.
+        :param priority: In thread mode, work of a higher priority class is started before any waiting lower-priority work.
+        :param deadline_seconds: In thread mode, within how many seconds the batch should start.
+        Within a priority class, the earliest deadline is started first.
+        :return: A future holding the return value of the worker template, or the exception it raised.
+        """
+        return self._submit_to(self._get_executor(worker_context), batch, worker_context, priority, deadline_seconds)
+
+    @contextmanager
+    def _batch_run(self,
+                   batches: Iterable[T],
+                   worker_context: U,
+                   max_in_flight: Optional[int] = None,
+                   cancellation_token: Optional[CancellationToken] = None,
+                   raise_on_failure: bool = True,
+                   priority: TaskPriority = TaskPriority.NORMAL) -> Iterator[BatchRun]:
+        max_in_flight = max_in_flight or 2 * self._max_threads
+        if self._config.batch_timeout_seconds is not None:
+            # Timeouts count from scheduling, so nothing may be scheduled without a worker to run it right away;
+            # the run keeps counting abandoned batches until their worker is free again.
+            max_in_flight = min(max_in_flight, self._max_threads)
+
+        # In process mode, the worker processes are kept alive between runs with the same context, like for submit().
+        executor: Executor = self._get_executor(worker_context)
+        yield BatchRun(
+            self._logger,
+            self._separator,
+            lambda batch: self._submit_timed_to(executor, batch, worker_context, priority),
+            batches,
+            max_in_flight,
+            retry_policy=self._config.retry_policy,
+            batch_timeout_seconds=self._config.batch_timeout_seconds,
+            cancellation_token=cancellation_token,
+            raise_on_failure=raise_on_failure,
+        )
+
+    def _track(self,
+               run: BatchRun,
+               total_units: Optional[int],
+               units_of: Callable[[T], int] = lambda batch: 1,
+               unit_name: str = "batches") -> Iterator[BatchOutcome]:
+        """Passes the outcomes of the run through, reporting progress along the way."""
+        tracker: ProgressTracker = ProgressTracker(
+            self._logger,
+            self._separator,
+            total_units,
+            unit_name,
+            interval_seconds=self._config.progress_interval_seconds,
+            interval_percent=self._config.progress_interval_percent,
+            callback=self._config.progress_callback,
+        )
+
+        for outcome in run:
+            tracker.advance(units_of(outcome.batch))
+            yield outcome
+
+        tracker.finish()
+
+        if self._config.log_timing_statistics and self._config.execution_mode == ExecutionMode.THREAD:
+            self._logger.info(f"Worker timings so far:\n{self.get_timing_statistics().format()}", separator=self._separator)
+
+    def get_timing_statistics(self) -> PoolTimingStatistics:
+        """
+        Returns where the batches of this manager spent their time since it was created: waiting for a thread and a worker,
+        and running the worker template. Percentiles are per worker and over the whole pool. Only covers thread mode.
+        """
+        return self._worker_pool.get_timing_statistics()
+
+    def map(self,
+            batches: Iterable[T],
+            worker_context: U,
+            max_in_flight: Optional[int] = None,
+            cancellation_token: Optional[CancellationToken] = None,
+            priority: TaskPriority = TaskPriority.NORMAL) -> List[Any]:
+        """
+        Works on a set of batches and collects their results.
 
-            self._logger.trace(f"Working on batch: {printed}", separator=self._separator)
-            worker: Worker = self.__get_worker()
+        :param batches: The batches to work on. Consumed lazily; may be a generator.
+        :param worker_context: The context for the batches. See :meth:`work_batches`.
+        :param max_in_flight: The maximum number of batches scheduled at once. Defaults to twice the (maximum) number of threads.
+        :param cancellation_token: Stops the scheduling of new batches once cancelled.
+        :param priority: The priority class of the batches, see :meth:`submit`.
+        :return: The return values of the worker template, in the order of the batches.
+        :raises: The first exception raised by the worker template after its retries; batches that did not start yet are cancelled.
+        :raises CancelledError: If the token was cancelled before all batches were worked on.
+        """
+        with self._batch_run(batches, worker_context, max_in_flight, cancellation_token, priority=priority) as run:
+            results: Dict[int, Any] = {outcome.index: outcome.result for outcome in self._track(run, _len_or_none(batches))}
+
+        if run.summary().cancelled:
+            raise CancelledError(f"Cancelled after {len(results)} batches.")
+        return [results[index] for index in range(len(results))]
+
+    def as_completed(self,
+                     batches: Iterable[T],
+                     worker_context: U,
+                     max_in_flight: Optional[int] = None,
+                     cancellation_token: Optional[CancellationToken] = None,
+                     priority: TaskPriority = TaskPriority.NORMAL) -> Iterator[Any]:
+        """
+        Works on a set of batches, yielding the results as soon as the batches finish.
+        Downstream processing can start before the whole set is done.
+
+        This is also the streaming mode: the batches may come from a generator of unknown (or unbounded) length.
+        They are pulled only as in-flight batches finish, so no more than `max_in_flight` are held in memory at once.
+
+        :param batches: The batches to work on. Consumed lazily; may be a generator.
+        :param worker_context: The context for the batches. See :meth:`work_batches`.
+        :param max_in_flight: The maximum number of batches scheduled at once. Defaults to twice the (maximum) number of threads.
+        :param cancellation_token: Stops the scheduling of new batches once cancelled; the iterator ends after the running ones.
+        :param priority: The priority class of the batches, see :meth:`submit`.
+        :return: An iterator over the return values of the worker template, in completion order.
+        :raises: The first exception raised by the worker template after its retries; batches that did not start yet are cancelled.
+        """
+        with self._batch_run(batches, worker_context, max_in_flight, cancellation_token, priority=priority) as run:
+            for outcome in self._track(run, _len_or_none(batches)):
+                yield outcome.result
 
-            worker.work(batch, worker_context)
+    def work_items(self,
+                   items: Iterable[Any],
+                   worker_context: U,
+                   target_batch_seconds: float = 0.1,
+                   max_batch_size: int = 10_000,
+                   priority: TaskPriority = TaskPriority.NORMAL) -> List[Any]:
+        """
+        Splits the items into batches by itself and works on them.
+        The worker template receives lists of items; their size is adjusted on the fly, based on the measured
+        per-item cost, so that a batch takes roughly `target_batch_seconds`.
+        If the number of items is known (the iterable supports `len`), batches get smaller towards the end to avoid stragglers.
+
+        :param items: The items to work on. Consumed lazily.
+        :param worker_context: The context for the batches. See :meth:`work_batches`.
+        :param target_batch_seconds: The desired duration of a single batch.
+        :param max_batch_size: The maximum number of items in a single batch.
+        :param priority: The priority class of the batches, see :meth:`submit`.
+        :return: The return values of the worker template for every batch, in input order.
+        :raises: The first exception raised by the worker template after its retries; batches that did not start yet are cancelled.
+        """
+        chunker: AdaptiveChunker = AdaptiveChunker(target_batch_seconds, max_chunk_size=max_batch_size)
+        total_items: Optional[int] = _len_or_none(items)
+
+        def chunks() -> Iterator[List[Any]]:
+            # Sized lazily: every chunk is cut only when it is about to be scheduled, using the latest measurements.
+            item_iterator: Iterator[Any] = iter(items)
+            remaining_items: Optional[int] = total_items
+            while True:
+                chunk: List[Any] = list(islice(item_iterator, chunker.next_chunk_size(remaining_items, self._max_threads)))
+                if len(chunk) == 0:
+                    return
+                if remaining_items is not None:
+                    remaining_items -= len(chunk)
+                yield chunk
 
-            with self._progress_lock:
-                self._num_processed_batches += 1
-                self._logger.info(
-                    f"Processed {self._num_processed_batches}/{total_to_process} ({round(self._num_processed_batches / total_to_process * 100, 4)}%) batches.",
-                    separator=self._separator
-                )
-        finally:
-            self._semaphore.release()
+        results: Dict[int, Any] = {}
+        with self._batch_run(chunks(), worker_context, priority=priority) as run:
+            for outcome in self._track(run, total_items, units_of=len, unit_name="items"):
+                chunker.record(len(outcome.batch), outcome.elapsed_seconds)
+                results[outcome.index] = outcome.result
 
+        return [results[index] for index in range(len(results))]
 
-    def work_batches(self, batches: List[T], worker_context: U) -> None:
+    def work_batches(self,
+                     batches: Iterable[T],
+                     worker_context: U,
+                     max_in_flight: Optional[int] = None,
+                     cancellation_token: Optional[CancellationToken] = None,
+                     priority: TaskPriority = TaskPriority.NORMAL) -> BatchRunSummary:
         """
         Works on a set of batches.
+        A batch that keeps failing (see :attr:`ThreadManagerConfig.retry_policy`) does not stop the others;
+        it is logged and listed in the returned summary.
 
-        :param batches: The batches to work on.
+        :param batches: The batches to work on. Consumed lazily; may be a generator, see :meth:`as_completed`.
         :param worker_context: The context for the batches.
         It is advised to make this context thread-safe.
-        :return: None.
+        In process mode, the context must be picklable; it is sent to every process once per context object and changes made to it
+        by the workers are not visible to the caller. Wrap large numpy arrays or byte buffers in a
+        :class:`SharedContext` to hand them to the processes without copying.
+        :param max_in_flight: The maximum number of batches scheduled at once. Defaults to twice the (maximum) number of threads.
+        :param cancellation_token: Stops the scheduling of new batches once cancelled.
+        :param priority: The priority class of the batches, see :meth:`submit`.
+        :return: A summary of the run, including the batches that failed.
+        Use :meth:`map` or :meth:`as_completed` to get the results of the worker template.
         """
+        with self._batch_run(batches, worker_context, max_in_flight, cancellation_token, raise_on_failure=False, priority=priority) as run:
+            for _ in self._track(run, _len_or_none(batches)):
+                pass
 
-        threads: List[Thread] = []
-        self._logger.trace("Starting threads...", separator=self._separator)
+        summary: BatchRunSummary = run.summary()
+        if not summary.succeeded:
+            self._logger.warning(
+                f"{summary.num_failed} batch(es) failed, {summary.num_not_started} were not started{' (cancelled)' if summary.cancelled else ''}.",
+                separator=self._separator
+            )
+        return summary
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stops the threads, and the processes started by :meth:`submit`, and retires the workers, releasing the resources.
+        The manager cannot be used afterward.
+        """
+        with self._executor_lock:
+            if self._thread_dispatcher is not None:
+                self._thread_dispatcher.cancel_pending()
 
-        self._num_processed_batches = 0  # Reset the number of processed batches.
-        total_to_process: int = len(batches)
+            for executor in (self._thread_executor, self._process_executor):
+                if executor is not None:
+                    executor.shutdown(wait=wait, cancel_futures=True)
 
-        for batch in batches:
-            thread = threading.Thread(target=self._work_batch, args=(batch, worker_context, total_to_process,))
-            threads.append(thread)
-            thread.start()
+            self._thread_executor = None
+            self._thread_dispatcher = None
+            self._process_executor = None
+            self._process_executor_context = None
 
-        # Wait for all threads to finish executing.
-        for thread in threads:
-            thread.join()
+        self._worker_pool.shutdown()
 
-        self._logger.info(f"Finished processing {total_to_process} batches.", separator=self._separator)
+        self._logger.trace("Shut down.", separator=self._separator)
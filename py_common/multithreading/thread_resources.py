@@ -0,0 +1,84 @@
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from ..logging import HoornLogger
+
+
+class ThreadResources:
+    """
+    Holds one resource per thread, such as a database connection, for resources that must stay on the thread that created them.
+
+    A thread creates its resource on first use and only ever gets its own. Threads release their resource through
+    :meth:`release_current_thread` when they stop, so it is finalized on the thread it belongs to; :meth:`release_all`
+    finalizes the rest, on the calling thread.
+    """
+
+    def __init__(self,
+                 logger: HoornLogger,
+                 separator: str,
+                 initializer: Callable[[], Any],
+                 finalizer: Optional[Callable[[Any], None]] = None):
+        """
+        :param initializer: Creates the resource of a thread.
+        :param finalizer: Releases the resource of a thread.
+        """
+        self._logger = logger
+        self._separator = separator
+        self._initializer = initializer
+        self._finalizer = finalizer
+
+        self._local: threading.local = threading.local()
+        self._lock: threading.Lock = threading.Lock()
+        # Every resource alive by thread id, so the ones of threads that did not release theirs can still be finalized.
+        self._resources: Dict[int, Any] = {}
+        # Resources of stopped threads whose id was reused before they were released.
+        self._orphaned: List[Any] = []
+
+    def get(self) -> Any:
+        """:return: The resource of the calling thread, created on its first call."""
+        try:
+            return self._local.resource
+        except AttributeError:
+            pass
+
+        self._logger.trace(f"Creating the resource of thread '{threading.current_thread().name}'.", separator=self._separator)
+        resource: Any = self._initializer()
+        self._local.resource = resource
+        with self._lock:
+            orphan: Any = self._resources.get(threading.get_ident(), self)
+            if orphan is not self:
+                self._orphaned.append(orphan)
+            self._resources[threading.get_ident()] = resource
+        return resource
+
+    def __finalize(self, resource: Any) -> None:
+        if self._finalizer is None:
+            return
+
+        try:
+            self._finalizer(resource)
+        except Exception as e:
+            self._logger.error(f"Failed to release a worker resource: {e!r}", separator=self._separator)
+
+    def release_current_thread(self) -> None:
+        """Finalizes the resource of the calling thread, if it has one. A later :meth:`get` creates a new one."""
+        with self._lock:
+            if threading.get_ident() not in self._resources:
+                return
+            resource: Any = self._resources.pop(threading.get_ident())
+        del self._local.resource
+
+        self.__finalize(resource)
+
+    def release_all(self) -> None:
+        """
+        Finalizes the resources of every thread that did not release its own, on the calling thread.
+        Threads still running must not use their resource afterward.
+        """
+        with self._lock:
+            remaining: List[Any] = list(self._resources.values()) + self._orphaned
+            self._resources.clear()
+            self._orphaned = []
+
+        for resource in remaining:
+            self.__finalize(resource)
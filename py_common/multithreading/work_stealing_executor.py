@@ -0,0 +1,155 @@
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Deque, List, Optional, Tuple
+
+from ..logging import HoornLogger
+
+_Task = Tuple[Future, Callable[..., Any], Tuple, dict]
+
+
+class WorkStealingExecutor(Executor):
+    """
+    An executor in which every thread has its own deque of tasks, instead of sharing one queue.
+
+    Tasks submitted from outside are spread over the deques round-robin; tasks submitted by a task running on one of
+    the threads go onto that thread's own deque. A thread takes its newest task first, keeping related work on the same
+    thread while it is warm, and when its deque is empty it steals the oldest task of another thread.
+    Appending to and popping from a deque are atomic, so neither submitting nor taking a task needs a shared lock.
+    """
+
+    def __init__(self,
+                 logger: HoornLogger,
+                 separator: str,
+                 num_threads: int,
+                 thread_name_prefix: str = "WorkStealingExecutor",
+                 thread_exit_callback: Optional[Callable[[], None]] = None):
+        """
+        :param num_threads: The number of threads, each with its own deque.
+        :param thread_exit_callback: Called on every thread of the executor just before it exits.
+        """
+        self._logger = logger
+        self._separator = separator
+        self._thread_exit_callback: Optional[Callable[[], None]] = thread_exit_callback
+
+        self._deques: List[Deque[_Task]] = [deque() for _ in range(num_threads)]
+        # Counts the tasks in the deques that no thread has claimed yet.
+        self._available: threading.Semaphore = threading.Semaphore(0)
+        self._next_deque = itertools.count()
+        # Tells a thread of this executor which deque is its own.
+        self._local: threading.local = threading.local()
+
+        # Per thread, so counting needs no lock.
+        self._steals: List[int] = [0] * num_threads
+        self._shutdown: bool = False
+        self._shutdown_lock: threading.Lock = threading.Lock()
+
+        self._threads: List[threading.Thread] = [
+            threading.Thread(target=self._run, args=(index,), name=f"{thread_name_prefix}_{index}", daemon=True)
+            for index in range(num_threads)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+        self._logger.trace(f"Started {num_threads} work-stealing threads.", separator=self._separator)
+
+    @property
+    def num_steals(self) -> int:
+        """The number of tasks run by another thread than the one they were queued on."""
+        return sum(self._steals)
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        if self._shutdown:
+            raise RuntimeError("Cannot schedule new tasks after shutdown.")
+
+        future: Future = Future()
+        index: Optional[int] = getattr(self._local, "index", None)
+        if index is None:
+            index = next(self._next_deque) % len(self._deques)
+
+        self._deques[index].append((future, fn, args, kwargs))
+        self._available.release()
+        return future
+
+    def _take(self, index: int) -> Optional[_Task]:
+        own: Deque[_Task] = self._deques[index]
+        num_deques: int = len(self._deques)
+
+        while True:
+            try:
+                return own.pop()
+            except IndexError:
+                pass
+
+            for offset in range(1, num_deques):
+                try:
+                    task: _Task = self._deques[(index + offset) % num_deques].popleft()
+                except IndexError:
+                    continue
+                self._steals[index] += 1
+                return task
+
+            # Nothing is added after shutdown, so empty deques mean the work is done.
+            # Before that, the task this thread claimed was just taken by a thread that had not claimed one yet; look again.
+            if self._shutdown:
+                return None
+
+    def _run(self, index: int) -> None:
+        try:
+            self.__run(index)
+        finally:
+            if self._thread_exit_callback is not None:
+                self._thread_exit_callback()
+
+    def __run(self, index: int) -> None:
+        self._local.index = index
+
+        while True:
+            self._available.acquire()
+            task: Optional[_Task] = self._take(index)
+            if task is None:
+                return
+
+            future, fn, args, kwargs = task
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        """
+        Stops accepting tasks. The threads finish the queued tasks and then stop.
+
+        :param wait: Whether to wait for the threads to stop.
+        :param cancel_futures: Whether to cancel the queued tasks instead of running them.
+        """
+        with self._shutdown_lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+
+        if cancel_futures:
+            for own in self._deques:
+                while True:
+                    try:
+                        future = own.popleft()[0]
+                    except IndexError:
+                        break
+                    future.cancel()
+
+        # Wakes every thread once more, so each sees the empty deques and stops.
+        for _ in self._threads:
+            self._available.release()
+
+        if wait:
+            for thread in self._threads:
+                if thread is not threading.current_thread():
+                    thread.join()
+
+        self._logger.trace(f"Shut down after {self.num_steals} steals.", separator=self._separator)
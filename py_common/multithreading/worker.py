@@ -1,9 +1,10 @@
 import time
-from typing import TypeVar, Callable
+from typing import Any, TypeVar, Callable, Optional, Tuple
 
+from .latency_histogram import LatencyHistogram
+from .thread_resources import ThreadResources
+from .worker_timing_statistics import WorkerTimingStatistics
 from ..logging import HoornLogger
-from ..time_handling import TimeUtils
-from ..time_handling.time_utils import time_operation
 
 T = TypeVar('T')
 U = TypeVar('U')
@@ -15,29 +16,64 @@ class Worker:
     def __init__(self,
                  logger: HoornLogger,
                  worker_id: str,
-                 work_to_perform: Callable[[T, U], None],
+                 work_to_perform: Callable[[T, U], Any],
                  return_to_pool_func: Callable[["Worker"], None],
-                 time_utils: TimeUtils):
+                 resources: Optional[ThreadResources] = None):
+        """
+        :param work_to_perform: Called as ``work_to_perform(data, context)``,
+        or ``work_to_perform(data, context, resource)`` if resources are given.
+        :param resources: The per-thread resources (a connection, a compiled pattern, ...). A worker runs on whichever
+        thread picked up the work, so it passes on the resource of that thread, never one created on another thread.
+        """
         self._worker_id = worker_id
         self._logger = logger
         self._work_func = work_to_perform
         self._return_to_pool = return_to_pool_func
-        self._time_utils = time_utils
+
+        self._resources: Optional[ThreadResources] = resources
+
+        # Only written by the thread the worker is working on, so recording needs no lock.
+        self._queue_wait_histogram: LatencyHistogram = LatencyHistogram()
+        self._run_histogram: LatencyHistogram = LatencyHistogram()
+
         self._logger.trace(f"Initialized successfully.", separator=self._worker_id)
 
     def get_worker_id(self) -> str:
         return self._worker_id
 
-    def __work(self, data: T, context: U):
-        @time_operation(logger=self._logger, time_utils=self._time_utils, separator=self._worker_id)
-        def worker_wrapper():
-            self._work_func(data, context)
+    def __work(self, data: T, context: U) -> Any:
+        start_ns: int = time.perf_counter_ns()
+        try:
+            if self._resources is not None:
+                return self._work_func(data, context, self._resources.get())
+            return self._work_func(data, context)
+        finally:
+            self._run_histogram.record(time.perf_counter_ns() - start_ns)
+
+    def work(self, data: T, context: U, scheduled_at_ns: Optional[int] = None) -> Any:
+        """
+        Performs an operation on the data, recording how long it took in the timing statistics of this worker.
+        The worker returns itself to the pool afterward, also when the operation raises.
+
+        :param scheduled_at_ns: When the data was scheduled, from :func:`time.perf_counter_ns`.
+        If given, the time until this worker started on it is recorded as queue wait.
+        :return: The return value of the operation.
+        """
+        if scheduled_at_ns is not None:
+            self._queue_wait_histogram.record(time.perf_counter_ns() - scheduled_at_ns)
 
-        worker_wrapper()
+        try:
+            return self.__work(data, context)
+        finally:
+            self._return_to_pool(self)
 
-    def work(self, data: T, context: U):
-        """Performs an operation on the data and logs the elapsed time to the debug logs."""
+    def get_timing_histograms(self) -> Tuple[LatencyHistogram, LatencyHistogram]:
+        """:return: The queue-wait and run-time histograms of this worker. They keep changing while it works."""
+        return self._queue_wait_histogram, self._run_histogram
 
-        self._logger.trace(f"Started working.", separator=self._worker_id)
-        self.__work(data, context)
-        self._return_to_pool(self)
+    def get_timing_statistics(self) -> WorkerTimingStatistics:
+        return WorkerTimingStatistics(
+            worker_id=self._worker_id,
+            queue_wait=self._queue_wait_histogram.summarize(),
+            run=self._run_histogram.summarize(),
+        )
@@ -1,37 +1,100 @@
 import threading
-from typing import Callable, List, Union
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Union
 
+from .latency_histogram import LatencyHistogram
+from .thread_resources import ThreadResources
 from .worker import Worker, T, U
+from .worker_pool_statistics import WorkerPoolStatistics
+from .worker_timing_statistics import PoolTimingStatistics
+from ..exceptions.invalid_operation_exception import InvalidOperationException
 from ..logging import HoornLogger
-from ..time_handling import TimeUtils
+
+
+class _Waiter:
+    """A caller blocked in :meth:`WorkerPool.get_worker`. Returned workers are handed to it directly."""
+    __slots__ = ("condition", "worker")
+
+    def __init__(self, lock: threading.Lock):
+        self.condition: threading.Condition = threading.Condition(lock)
+        self.worker: Optional[Worker] = None
 
 
 class WorkerPool:
-    """Used to manage a pool of workers."""
+    """
+    Used to manage a pool of workers.
+
+    The pool can be elastic: with `grow_pool_automatically`, workers are added while callers are waiting for one
+    (up to `max_pool_size`), and with `idle_timeout_seconds`, workers idle for that long are retired again
+    (down to `pool_size`). Both decisions are made by a background scaling thread, never while a caller holds the pool lock.
+    """
     def __init__(self,
                  logger: HoornLogger,
                  pool_size: int,
-                 work_template: Callable[[T, U], None],
+                 work_template: Callable[[T, U], Any],
                  worker_name: str,
                  grow_pool_automatically: bool=False,
-                 grow_by: int=5):
+                 grow_by: int=5,
+                 max_pool_size: Optional[int]=None,
+                 idle_timeout_seconds: Optional[float]=None,
+                 worker_initializer: Optional[Callable[[], Any]]=None,
+                 worker_finalizer: Optional[Callable[[Any], None]]=None):
+        """
+        :param pool_size: The initial number of workers, and the minimum an elastic pool shrinks to.
+        :param grow_pool_automatically: Whether to add workers while callers are waiting for one.
+        :param grow_by: The minimum number of workers added per growth step.
+        :param max_pool_size: The maximum number of workers when growing. None means unbounded.
+        :param idle_timeout_seconds: Retire workers that were idle this long. None keeps them forever.
+        :param worker_initializer: Creates a resource once per thread that works, on its first piece of work.
+        The resource is passed to the work template as a third argument: ``work_template(data, context, resource)``.
+        Resources belong to threads rather than workers, because a worker runs on whichever thread picked up the work.
+        :param worker_finalizer: Releases the resource of a thread, on that thread when it calls :meth:`release_thread_resources`
+        as it stops, or otherwise on the thread shutting the pool down.
+        """
         self._pool_lock = threading.Lock()
 
-        self._time_utils = TimeUtils()
-
         self._separator = "Common.WorkerPool"
         self._logger = logger
         self._initial_pool_size = pool_size
 
         self._grow_pool_automatically = grow_pool_automatically
         self._grow_by = grow_by
+        self._max_pool_size = max_pool_size
+        self._idle_timeout_seconds = idle_timeout_seconds
 
         self._worker_template = work_template
         self._worker_name = worker_name
+        self._resources: Optional[ThreadResources] = None
+        if worker_initializer is not None:
+            self._resources = ThreadResources(logger, self._separator, worker_initializer, worker_finalizer)
+        self._closed: bool = False
 
         self._last_worker_id: int = -1
+        # Every worker alive, idle or busy.
+        self._num_workers: int = 0
+        # The same workers by id, for their timing statistics.
+        self._workers: Dict[str, Worker] = {}
+        # The samples of retired workers, so the pool totals survive scaling down.
+        self._retired_queue_wait: LatencyHistogram = LatencyHistogram()
+        self._retired_run: LatencyHistogram = LatencyHistogram()
+
+        # Idle workers with the time they became idle, most recently returned last.
+        # Taking from the back keeps the busiest workers warm and lets the others age out.
+        self._pool: Deque[Tuple[Worker, float]] = deque()
+        # Callers blocked on an empty pool, oldest first. Returned workers go to the oldest waiter.
+        self._waiters: Deque[_Waiter] = deque()
+
+        self._acquisitions: int = 0
+        self._waited_acquisitions: int = 0
+        self._timeouts: int = 0
+        self._total_wait_seconds: float = 0.0
+        self._max_wait_seconds: float = 0.0
+
+        self._scaling_signal: threading.Event = threading.Event()
+        self._scaling_shutdown: threading.Event = threading.Event()
+        self._scaling_thread: Optional[threading.Thread] = None
 
-        self._pool: List[Worker] = []
         self._initialize_pool()
 
         self._logger.trace("Successfully initialized.", separator=self._separator)
@@ -39,50 +102,244 @@ class WorkerPool:
     def _initialize_pool(self):
         self._increase_num_workers(self._initial_pool_size)
 
+        if self._idle_timeout_seconds is not None:
+            self.__ensure_scaling_thread()
+
     def _increase_num_workers(self, n: int):
         for _ in range(n):
             self._logger.debug(f"Creating worker '{self._worker_name}-{self._last_worker_id+1}'", separator=self._separator)
-            self.__append_to_pool(self._generate_worker())
+            worker: Worker = self._generate_worker()
+            with self._pool_lock:
+                self._num_workers += 1
+            self.__append_to_pool(worker)
 
     def _return_to_pool(self, worker: Worker):
         self.__append_to_pool(worker)
-        self._logger.debug(f"Returning worker '{worker.get_worker_id()}' to pool", separator=self._separator)
 
     def _generate_worker(self) -> Worker:
         self._last_worker_id += 1
-        return Worker(self._logger, f"{self._worker_name}-{self._last_worker_id}", self._worker_template, self._return_to_pool, self._time_utils)
+        worker: Worker = Worker(
+            self._logger,
+            f"{self._worker_name}-{self._last_worker_id}",
+            self._worker_template,
+            self._return_to_pool,
+            resources=self._resources,
+        )
+        with self._pool_lock:
+            self._workers[worker.get_worker_id()] = worker
+        return worker
+
+    def __retire(self, worker: Worker) -> None:
+        with self._pool_lock:
+            self._workers.pop(worker.get_worker_id(), None)
+            queue_wait, run = worker.get_timing_histograms()
+            self._retired_queue_wait.merge(queue_wait)
+            self._retired_run.merge(run)
+
+    def release_thread_resources(self) -> None:
+        """Releases the resource of the calling thread. To be called by the threads running the workers as they stop."""
+        if self._resources is not None:
+            self._resources.release_current_thread()
 
     def __append_to_pool(self, worker: Worker):
-        self._pool_lock.acquire()
-        self._pool.append(worker)
-        self._pool_lock.release()
+        with self._pool_lock:
+            if self._closed:
+                # Busy while the pool shut down; release it as soon as it is done.
+                self._num_workers -= 1
+                retire_now: bool = True
+            elif self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.worker = worker
+                waiter.condition.notify()
+                retire_now = False
+            else:
+                self._pool.append((worker, time.monotonic()))
+                retire_now = False
+
+        if retire_now:
+            self.__retire(worker)
+
+    def __record_acquisition(self, waited_seconds: float, waited: bool) -> None:
+        self._acquisitions += 1
+        if waited:
+            self._waited_acquisitions += 1
+        self._total_wait_seconds += waited_seconds
+        self._max_wait_seconds = max(self._max_wait_seconds, waited_seconds)
+
+    def __request_growth(self) -> None:
+        if not self._grow_pool_automatically:
+            return
+        if self._max_pool_size is not None and self._num_workers >= self._max_pool_size:
+            return
+
+        self.__ensure_scaling_thread()
+        self._scaling_signal.set()
+
+    def __wait_for_worker(self, timeout: Optional[float]) -> Union[Worker, None]:
+        waiter = _Waiter(self._pool_lock)
+        self._waiters.append(waiter)
+        self.__request_growth()
+
+        start = time.perf_counter()
+        deadline: Optional[float] = None if timeout is None else start + timeout
+
+        while waiter.worker is None:
+            if self._closed:
+                self._waiters.remove(waiter)
+                raise InvalidOperationException("The worker pool was shut down while waiting for a worker.")
+
+            remaining: Optional[float] = None if deadline is None else deadline - time.perf_counter()
+            if remaining is not None and remaining <= 0:
+                self._waiters.remove(waiter)
+                self._timeouts += 1
+                return None
+            waiter.condition.wait(remaining)
+
+        self.__record_acquisition(time.perf_counter() - start, waited=True)
+        return waiter.worker
+
+    def get_worker(self, block: bool = False, timeout: Optional[float] = None) -> Union[Worker, None]:
+        """
+        Takes a worker from the pool.
+
+        :param block: Whether to wait for a worker to be returned if the pool is empty.
+        Waiting callers are served in the order they started waiting and wake as soon as a worker is returned
+        (or, if the pool grows automatically, created).
+        :param timeout: The maximum number of seconds to wait when blocking. None waits indefinitely.
+        :return: A worker, or None if none became available (immediately when not blocking, or within the timeout).
+        When not blocking, an empty pool that grows automatically starts growing in the background.
+        """
+        with self._pool_lock:
+            if self._closed:
+                raise InvalidOperationException("The worker pool has been shut down.")
+
+            if self._pool:
+                self.__record_acquisition(0.0, waited=False)
+                return self._pool.pop()[0]
 
-    def __handle_empty_pool(self) -> Union[Worker, None]:
-        if len(self._pool) <= 0:
-            if not self._grow_pool_automatically:
+            if not block:
+                self.__request_growth()
                 self._logger.warning("All workers are busy, try again later.", separator=self._separator)
                 return None
-            else:
-                self._logger.debug("All workers are busy, but we can grow the pool.", separator=self._separator)
-                self._increase_num_workers(self._grow_by)
-                if len(self._pool) <=0:
-                    return None
-        worker = self._pool.pop(0)
-        return worker
 
-    def get_worker(self) -> Union[Worker, None]:
-        # Uses double checks to reduce lock contention and improve performance.
-
-        if len(self._pool) <= 0:
-            self._pool_lock.acquire()
-            try:
-                return self.__handle_empty_pool()
-            finally:
-                self._pool_lock.release()
-        else:
-            self._pool_lock.acquire()
-            try:
-                worker = self._pool.pop(0)
-                return worker
-            finally:
-                self._pool_lock.release()
+            return self.__wait_for_worker(timeout)
+
+    def __ensure_scaling_thread(self) -> None:
+        if self._scaling_thread is not None and self._scaling_thread.is_alive():
+            return
+
+        self._scaling_shutdown.clear()
+        self._scaling_thread = threading.Thread(target=self.__scaling_loop, name=f"{self._worker_name}-scaler", daemon=True)
+        self._scaling_thread.start()
+
+    def __scaling_loop(self) -> None:
+        check_interval: Optional[float] = self._idle_timeout_seconds / 2 if self._idle_timeout_seconds is not None else None
+
+        while not self._scaling_shutdown.is_set():
+            self._scaling_signal.wait(check_interval)
+            self._scaling_signal.clear()
+            if self._scaling_shutdown.is_set():
+                return
+
+            self.__grow_for_waiters()
+            self.__retire_idle_workers()
+
+    def __grow_for_waiters(self) -> None:
+        with self._pool_lock:
+            num_waiting: int = len(self._waiters)
+            if num_waiting == 0 or not self._grow_pool_automatically:
+                return
+
+            room: float = float("inf") if self._max_pool_size is None else self._max_pool_size - self._num_workers
+            num_to_create: int = int(min(max(self._grow_by, num_waiting), room))
+            # Reserve the capacity now, so concurrent decisions do not overshoot the maximum.
+            self._num_workers += max(num_to_create, 0)
+
+        if num_to_create <= 0:
+            return
+
+        self._logger.debug(f"{num_waiting} caller(s) waiting, growing the pool by {num_to_create}.", separator=self._separator)
+        for _ in range(num_to_create):
+            self.__append_to_pool(self._generate_worker())
+
+    def __retire_idle_workers(self) -> None:
+        if self._idle_timeout_seconds is None:
+            return
+
+        retired: List[Worker] = []
+        cutoff: float = time.monotonic() - self._idle_timeout_seconds
+
+        with self._pool_lock:
+            while self._pool and self._num_workers > self._initial_pool_size and self._pool[0][1] <= cutoff:
+                retired.append(self._pool.popleft()[0])
+                self._num_workers -= 1
+
+        for worker in retired:
+            self._logger.debug(f"Retiring worker '{worker.get_worker_id()}' after being idle for {self._idle_timeout_seconds} seconds.", separator=self._separator)
+            self.__retire(worker)
+
+    def shutdown(self) -> None:
+        """
+        Stops the background scaling thread, retires every worker and releases the thread resources still held.
+        Idle workers are retired right away, busy ones as soon as they are returned. The pool cannot be used afterward.
+        """
+        self._scaling_shutdown.set()
+        self._scaling_signal.set()
+
+        if self._scaling_thread is not None:
+            self._scaling_thread.join()
+            self._scaling_thread = None
+
+        with self._pool_lock:
+            self._closed = True
+            idle: List[Worker] = [worker for worker, _ in self._pool]
+            self._pool.clear()
+            self._num_workers -= len(idle)
+
+            # Nothing will be returned to callers still waiting.
+            for waiter in self._waiters:
+                waiter.condition.notify()
+
+        for worker in idle:
+            self.__retire(worker)
+
+        # The resources of threads that did not release their own.
+        if self._resources is not None:
+            self._resources.release_all()
+
+        self._logger.trace("Shut down.", separator=self._separator)
+
+    def get_statistics(self) -> WorkerPoolStatistics:
+        """Returns a snapshot of the acquisition and wait-time metrics of this pool."""
+        with self._pool_lock:
+            return WorkerPoolStatistics(
+                acquisitions=self._acquisitions,
+                waited_acquisitions=self._waited_acquisitions,
+                timeouts=self._timeouts,
+                total_wait_seconds=self._total_wait_seconds,
+                max_wait_seconds=self._max_wait_seconds,
+                currently_waiting=len(self._waiters),
+                available_workers=len(self._pool),
+                total_workers=self._num_workers,
+            )
+
+    def get_timing_statistics(self) -> PoolTimingStatistics:
+        """
+        Returns where the batches handled by this pool spent their time: waiting to be started, and running.
+        The samples are only aggregated here, not while recording.
+        """
+        with self._pool_lock:
+            # Under the lock, so a worker retiring meanwhile is counted exactly once.
+            workers: List[Worker] = list(self._workers.values())
+            queue_wait: LatencyHistogram = LatencyHistogram.combined([self._retired_queue_wait])
+            run: LatencyHistogram = LatencyHistogram.combined([self._retired_run])
+            for worker in workers:
+                worker_queue_wait, worker_run = worker.get_timing_histograms()
+                queue_wait.merge(worker_queue_wait)
+                run.merge(worker_run)
+
+        return PoolTimingStatistics(
+            workers=tuple(worker.get_timing_statistics() for worker in workers),
+            queue_wait=queue_wait.summarize(),
+            run=run.summarize(),
+        )
@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class WorkerPoolStatistics:
+    """A snapshot of how workers have been acquired from a :class:`WorkerPool`."""
+    acquisitions: int
+    """Number of successful acquisitions."""
+    waited_acquisitions: int
+    """Number of successful acquisitions that had to wait for a worker to be returned."""
+    timeouts: int
+    """Number of blocking acquisitions that gave up before a worker became available."""
+    total_wait_seconds: float
+    max_wait_seconds: float
+    currently_waiting: int
+    available_workers: int
+    total_workers: int
+    """Every worker alive, idle or busy."""
+
+    @property
+    def average_wait_seconds(self) -> float:
+        """The mean wait over all successful acquisitions, including those that did not wait."""
+        return self.total_wait_seconds / self.acquisitions if self.acquisitions > 0 else 0.0
@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+from typing import Tuple
+
+from .latency_histogram import LatencySummary
+
+
+def _format_summary(summary: LatencySummary) -> str:
+    return (f"n={summary.count}, mean={summary.mean_seconds * 1e3:.3f}ms, p50={summary.p50_seconds * 1e3:.3f}ms, "
+            f"p90={summary.p90_seconds * 1e3:.3f}ms, p99={summary.p99_seconds * 1e3:.3f}ms, max={summary.max_seconds * 1e3:.3f}ms")
+
+
+@dataclass(frozen=True)
+class WorkerTimingStatistics:
+    """Where the batches handled by a single worker spent their time."""
+    worker_id: str
+    queue_wait: LatencySummary
+    """From scheduling the batch until the worker started on it. Only recorded when the scheduling time is known."""
+    run: LatencySummary
+    """Running the work template."""
+
+
+@dataclass(frozen=True)
+class PoolTimingStatistics:
+    """Where the batches handled by a :class:`WorkerPool` spent their time, per worker and in total."""
+    workers: Tuple[WorkerTimingStatistics, ...]
+    """The workers currently alive."""
+    queue_wait: LatencySummary
+    """Over every worker, including retired ones."""
+    run: LatencySummary
+    """Over every worker, including retired ones."""
+
+    def format(self) -> str:
+        """A compact, multi-line description, for logging."""
+        lines = [f"queue wait: {_format_summary(self.queue_wait)}", f"run:        {_format_summary(self.run)}"]
+        for worker in self.workers:
+            lines.append(f"  {worker.worker_id}: run {_format_summary(worker.run)}")
+        return "\n".join(lines)
@@ -0,0 +1,287 @@
+import asyncio
+import inspect
+from concurrent.futures import Future
+from typing import Awaitable, Callable, List, Optional, Union
+
+from .connection_statistics import ConnectionStatistics
+from .framing_mode import FramingMode
+from .heartbeat_tracker import HeartbeatTracker
+from .message_codec import MessageCodec, resolve_codec
+from .message_model import MessageModel
+from .util import build_unregister_message, create_framer, frame_message
+from ..logging import HoornLogger
+
+
+class AsyncConnector:
+	"""
+	The asyncio counterpart of the :class:`Connector`, using the same message model and framing.
+
+	A connection costs two tasks (reading and keep-alive) instead of three threads, so a single event loop can hold
+	hundreds of them. Thread-based code can use it through an :class:`EventLoopThread` and the `*_threadsafe` methods.
+	"""
+	def __init__(self,
+				 logger: HoornLogger,
+				 message_received_listener: Callable[[MessageModel], Union[None, Awaitable[None]]],
+				 module_separator: str = "Common.AsyncConnector",
+				 end_of_message_token: str = "<eom>",
+				 component_id: str = "ea1973db-31e7-4fe4-bd57-e217f246f6a1",
+				 receive_buffer_size: int = 65536,
+				 framing_mode: FramingMode = FramingMode.END_OF_MESSAGE_TOKEN,
+				 codec: Optional[MessageCodec] = None,
+				 keep_alive_interval_seconds: float = 30.0,
+				 coalesce_window_seconds: float = 0.0005,
+				 max_batch_bytes: int = 262144,
+				 connection_lost_listener: Optional[Callable[[], None]] = None,
+				 measure_heartbeat_rtt: bool = False):
+		"""
+		Args:
+			message_received_listener: Called with every received message, on the event loop.
+				It may be a coroutine function; it is awaited before the next message of the connection is handled.
+			coalesce_window_seconds: How long an outgoing message waits for others to be written together with it.
+				Messages sent with `urgent` never wait.
+			max_batch_bytes: Writes right away once this much is waiting, without waiting out the window.
+			connection_lost_listener: Called once on the event loop when the connection ends, unless it ended through :meth:`shutdown`;
+				pass :meth:`AsyncMessageProcessor.process_connection_lost` to fail the requests still waiting for a response.
+			measure_heartbeat_rtt: Whether to measure the round-trip time of the heartbeats the middleman answers.
+				Gives every heartbeat its own `unique_id` and `time_sent`; off by default, which sends them unchanged.
+		"""
+		self._logger = logger
+		self._message_received_listener = message_received_listener
+		self._connection_lost_listener: Optional[Callable[[], None]] = connection_lost_listener
+		self._module_separator = module_separator
+
+		self._component_id = component_id
+		self._end_of_message_token = end_of_message_token
+		self._receive_buffer_size: int = receive_buffer_size
+		# Must match the framing mode the middleman uses for this connection.
+		self._framing_mode: FramingMode = framing_mode
+		# Must match the codec of the other end as well; JSON by default.
+		self._codec: MessageCodec = resolve_codec(logger, module_separator, codec, framing_mode)
+		self._keep_alive_interval_seconds: float = keep_alive_interval_seconds
+		self._coalesce_window_seconds: float = coalesce_window_seconds
+		self._max_batch_bytes: int = max_batch_bytes
+
+		self._loop: Optional[asyncio.AbstractEventLoop] = None
+		self._reader: Optional[asyncio.StreamReader] = None
+		self._writer: Optional[asyncio.StreamWriter] = None
+		self._read_task: Optional[asyncio.Task] = None
+		self._keep_alive_task: Optional[asyncio.Task] = None
+
+		self._pending: List[bytes] = []
+		self._pending_bytes: int = 0
+		self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+		self._heartbeats: HeartbeatTracker = HeartbeatTracker(measure_heartbeat_rtt)
+		self._num_sent_bytes: int = 0
+		self._num_sent_messages: int = 0
+		self._num_received_bytes: int = 0
+		self._num_received_messages: int = 0
+		self._num_decode_errors: int = 0
+
+	@property
+	def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+		"""The event loop the connection runs on, once connected."""
+		return self._loop
+
+	@property
+	def is_connected(self) -> bool:
+		return self._writer is not None and not self._writer.is_closing()
+
+	async def connect_to_remote(self, host: str, port: int, component_port: Optional[int] = None) -> bool:
+		"""Connects to a remote host and port using TCP and listens for data in the background.
+
+		Args:
+			host: The hostname or IP address of the remote host.
+			port: The port number on the remote host.
+			component_port: The local port to bind to. Defaults to any free port.
+
+		Returns:
+			Whether the connection was made. Logs error messages on failure.
+		"""
+		local_address = (host, component_port) if component_port is not None else None
+		try:
+			self._reader, self._writer = await asyncio.open_connection(host, port, local_addr=local_address)
+		except OSError as e:
+			self._logger.error(f"Could not connect to {host}:{port}: {e}", separator=self._module_separator)
+			return False
+		self._logger.info(f"Connected to {host}:{port}", separator=self._module_separator)
+
+		self._loop = asyncio.get_running_loop()
+		self._read_task = asyncio.create_task(self._read_loop(host, port))
+		self._keep_alive_task = asyncio.create_task(self._keep_alive_loop())
+		return True
+
+	async def _read_loop(self, host: str, port: int) -> None:
+		try:
+			await self._read_messages(host, port)
+		except asyncio.CancelledError:
+			# Cancelled by shutdown, which closes the connection itself.
+			raise
+		except Exception as e:
+			self._logger.error(f"Stopped receiving from {host}:{port}: {e!r}", separator=self._module_separator)
+		self._on_connection_lost()
+
+	async def _read_messages(self, host: str, port: int) -> None:
+		framer = create_framer(self._framing_mode, self._end_of_message_token)
+
+		while True:
+			try:
+				data: bytes = await self._reader.read(self._receive_buffer_size)
+			except OSError as e:
+				self._logger.error(f"Error receiving data from {host}:{port}: {e}", separator=self._module_separator)
+				return
+
+			if not data:
+				self._logger.info(f"Connection closed by {host}:{port}", separator=self._module_separator)
+				return
+			self._num_received_bytes += len(data)
+
+			try:
+				messages = framer.feed(data)
+			except ValueError as e:
+				self._num_decode_errors += 1
+				self._logger.error(f"Corrupt data from {host}:{port}, closing the connection: {e}", separator=self._module_separator)
+				return
+
+			self._num_received_messages += len(messages)
+			for message in messages:
+				await self._handle(message)
+
+	def _on_connection_lost(self) -> None:
+		# Stops the keep-alive and fails later sends, instead of writing to a dead connection.
+		if self._keep_alive_task is not None:
+			self._keep_alive_task.cancel()
+		if self._flush_handle is not None:
+			self._flush_handle.cancel()
+			self._flush_handle = None
+		self._pending = []
+		self._pending_bytes = 0
+
+		# Closed but kept, for its statistics; sending on it fails from now on.
+		self._writer.close()
+
+		if self._connection_lost_listener is not None:
+			try:
+				self._connection_lost_listener()
+			except Exception as e:
+				self._logger.error(f"Connection lost listener failed: {e!r}", separator=self._module_separator)
+
+	async def _handle(self, data: Union[bytes, memoryview]) -> None:
+		try:
+			message: MessageModel = self._codec.decode(data)
+		except Exception as e:
+			self._num_decode_errors += 1
+			self._logger.error(f"Dropping a message that could not be decoded: {e!r}", separator=self._module_separator)
+			return
+
+		if self._heartbeats.acknowledge(message.target_uuid):
+			return
+
+		try:
+			result = self._message_received_listener(message)
+			if inspect.isawaitable(result):
+				await result
+		except Exception as e:
+			# One bad message must not end the connection.
+			self._logger.error(f"Failed to handle a received message: {e!r}", separator=self._module_separator)
+
+	async def _keep_alive_loop(self) -> None:
+		while True:
+			await asyncio.sleep(self._keep_alive_interval_seconds)
+			try:
+				# Urgent, so the measured round trip does not include the coalescing window.
+				await self._send_bytes(self._encode(self._heartbeats.create()), urgent=True)
+			except OSError as e:
+				self._logger.warning(f"Failed to send keep-alive: {e}", separator=self._module_separator)
+				return
+
+	async def _send_bytes(self, data: bytes, urgent: bool = False) -> None:
+		if self._writer is None or self._writer.is_closing():
+			raise ConnectionError("The connection is closed.")
+
+		self._pending.append(data)
+		self._pending_bytes += len(data)
+
+		if urgent or self._pending_bytes >= self._max_batch_bytes:
+			self._flush()
+		elif self._flush_handle is None:
+			self._flush_handle = self._loop.call_later(self._coalesce_window_seconds, self._flush)
+
+		# Only waits when the transport buffer is full, so fast senders cannot outrun the socket.
+		await self._writer.drain()
+
+	def _flush(self) -> None:
+		if self._flush_handle is not None:
+			self._flush_handle.cancel()
+			self._flush_handle = None
+		if not self._pending or self._writer is None or self._writer.is_closing():
+			return
+
+		# One write for every frame that waited; writelines uses a vectored write where the event loop supports it.
+		self._writer.writelines(self._pending)
+		self._num_sent_messages += len(self._pending)
+		self._num_sent_bytes += self._pending_bytes
+		self._pending = []
+		self._pending_bytes = 0
+
+	async def send_request(self, message: MessageModel, urgent: bool = False) -> None:
+		"""Queues a message for sending.
+
+		Args:
+			message: The message to send.
+			urgent: Whether to write it right away instead of coalescing it with the messages that follow.
+		"""
+		await self._send_bytes(self._encode(message), urgent)
+
+	def send_request_threadsafe(self, message: MessageModel, urgent: bool = False) -> Future:
+		"""Sends a message from another thread than the event loop's.
+
+		Returns:
+			A future that is done once the message was queued for sending.
+		"""
+		return asyncio.run_coroutine_threadsafe(self.send_request(message, urgent), self._loop)
+
+	def get_statistics(self) -> ConnectionStatistics:
+		"""Counts messages as sent once they are written to the transport, which may still buffer them."""
+		return ConnectionStatistics(
+			connected=self.is_connected,
+			bytes_sent=self._num_sent_bytes,
+			bytes_received=self._num_received_bytes,
+			messages_sent=self._num_sent_messages,
+			messages_received=self._num_received_messages,
+			outbound_queue_depth=len(self._pending),
+			# Received messages are handled as they are read.
+			inbound_queue_depth=0,
+			decode_errors=self._num_decode_errors,
+			**self._heartbeats.snapshot(),
+		)
+
+	def _encode(self, message: Union[MessageModel, dict]) -> bytes:
+		return frame_message(self._codec.encode(message), self._end_of_message_token, self._framing_mode)
+
+	async def shutdown(self) -> None:
+		"""Unregisters the component from the middleman and closes the connection."""
+		for task in (self._keep_alive_task, self._read_task):
+			if task is not None:
+				task.cancel()
+		await asyncio.gather(*(task for task in (self._keep_alive_task, self._read_task) if task is not None), return_exceptions=True)
+		self._keep_alive_task = self._read_task = None
+
+		if self._writer is None:
+			return
+
+		# A lost connection has nothing left to unregister from.
+		if not self._writer.is_closing():
+			try:
+				self._logger.debug("Unregistering Component from Middleman", separator=self._module_separator)
+				await self._send_bytes(self._encode(build_unregister_message(self._component_id)), urgent=True)
+			except OSError as e:
+				self._logger.warning(f"Failed to unregister: {e}", separator=self._module_separator)
+
+			self._flush()
+		self._writer.close()
+		try:
+			await self._writer.wait_closed()
+		except OSError:
+			pass
+		self._reader = self._writer = None
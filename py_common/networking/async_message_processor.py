@@ -0,0 +1,86 @@
+import asyncio
+import pprint
+from concurrent.futures import Future
+from typing import Dict, Optional
+
+from .async_connector import AsyncConnector
+from .message_model import MessageModel
+from ..logging import HoornLogger
+
+
+class AsyncMessageProcessor:
+	"""
+	The asyncio counterpart of the :class:`MessageProcessor`: requests are awaited until their response arrives.
+	Pass :meth:`process_message` as the message listener of the :class:`AsyncConnector`,
+	and :meth:`process_connection_lost` as its connection lost listener.
+	"""
+	def __init__(self, logger: HoornLogger, connector: AsyncConnector, module_separator: str = "Common.AsyncMessageProcessor"):
+		self._module_separator: str = module_separator
+		self._logger: HoornLogger = logger
+		self._connector: AsyncConnector = connector
+
+		# Only used on the event loop, so it needs no lock.
+		self._pending: Dict[str, asyncio.Future] = {}
+
+	@property
+	def num_pending(self) -> int:
+		return len(self._pending)
+
+	async def request(self, message: MessageModel, timeout: Optional[float] = None) -> MessageModel:
+		"""Sends a request and waits for its response.
+
+		Args:
+			message: The request.
+			timeout: The maximum number of seconds to wait for the response. None waits indefinitely.
+
+		Returns:
+			The response.
+
+		Raises:
+			TimeoutError: If no response arrived within the timeout.
+			ConnectionError: If the connection is closed, or is lost before the response arrives.
+			ValueError: If a request with the same `unique_id` is still waiting for its response.
+		"""
+		if message.unique_id in self._pending:
+			# Its response could not be told apart from the earlier request's.
+			error: str = f"A request with id {message.unique_id} is already waiting for its response."
+			self._logger.error(error, separator=self._module_separator)
+			raise ValueError(error)
+
+		response: asyncio.Future = asyncio.get_running_loop().create_future()
+		self._pending[message.unique_id] = response
+		try:
+			await self._connector.send_request(message)
+			return await asyncio.wait_for(response, timeout)
+		finally:
+			# Only its own entry: once this request was failed, another one may have taken the id.
+			if self._pending.get(message.unique_id) is response:
+				del self._pending[message.unique_id]
+
+	def request_threadsafe(self, message: MessageModel, timeout: Optional[float] = None) -> Future:
+		"""Like :meth:`request`, from another thread than the event loop's.
+
+		Returns:
+			A future for the response.
+		"""
+		return asyncio.run_coroutine_threadsafe(self.request(message, timeout), self._connector.loop)
+
+	def process_message(self, msg: MessageModel) -> None:
+		self._logger.trace(f"Processing message: {msg.unique_id}", separator=self._module_separator)
+
+		response: Optional[asyncio.Future] = self._pending.pop(msg.target_uuid, None)
+		if response is None:
+			self._logger.warning(f"Received message from server with no associated request:\n{pprint.pformat(msg.model_dump())}", separator=self._module_separator)
+			return
+
+		if not response.done():
+			response.set_result(msg)
+
+	def process_connection_lost(self) -> None:
+		"""Fails the requests still waiting for a response; none of them can get one anymore."""
+		pending = list(self._pending.values())
+		self._pending.clear()
+
+		for response in pending:
+			if not response.done():
+				response.set_exception(ConnectionError("The connection was lost before the response arrived."))
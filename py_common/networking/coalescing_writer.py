@@ -0,0 +1,171 @@
+import socket
+import threading
+import time
+from typing import List, Optional
+
+from ..logging import HoornLogger
+
+# The most buffers a single sendmsg call accepts on common platforms (IOV_MAX).
+_MAX_BUFFERS_PER_SEND: int = 1024
+
+
+class CoalescingWriter:
+	"""
+	Sends the frames of a connection from a single writer thread. Frames queued within a short latency window go out together
+	in one vectored write (`sendmsg`), instead of one `sendall` and one small TCP segment each.
+
+	Senders do not wait for the socket: :meth:`send` only queues the frame, and only blocks while `max_pending_bytes`
+	are already queued, so a sender that outpaces the socket cannot grow the queue without limit.
+	Urgent frames are flushed right away, together with everything queued before them, so the order of the frames is always kept.
+	"""
+	def __init__(self,
+				 logger: HoornLogger,
+				 sock: socket.socket,
+				 module_separator: str = "Common.CoalescingWriter",
+				 coalesce_window_seconds: float = 0.0005,
+				 max_batch_bytes: int = 262144,
+				 name: str = "CoalescingWriter",
+				 max_pending_bytes: int = 16 * 1024 * 1024):
+		"""
+		Args:
+			coalesce_window_seconds: How long the first queued frame waits for others to join it.
+				With 0, only the frames that queue up while a write is in progress are coalesced.
+			max_batch_bytes: Flushes as soon as this much is queued, without waiting out the window.
+			max_pending_bytes: Senders block while this much is queued and not yet handed to the socket.
+				A single larger frame is still accepted once the queue is empty.
+		"""
+		self._logger = logger
+		self._socket: socket.socket = sock
+		self._module_separator = module_separator
+		self._coalesce_window_seconds: float = coalesce_window_seconds
+		self._max_batch_bytes: int = max_batch_bytes
+		self._max_pending_bytes: int = max_pending_bytes
+
+		self._lock: threading.Lock = threading.Lock()
+		# Wakes the writer thread.
+		self._condition: threading.Condition = threading.Condition(self._lock)
+		# Wakes the senders waiting for the queue to drain.
+		self._space_available: threading.Condition = threading.Condition(self._lock)
+		self._pending: List[bytes] = []
+		self._pending_bytes: int = 0
+		self._urgent: bool = False
+		self._closing: bool = False
+		self._error: Optional[OSError] = None
+		# Only updated by the writer thread.
+		self._num_sent_messages: int = 0
+		self._num_sent_bytes: int = 0
+
+		self._thread: threading.Thread = threading.Thread(target=self._run, name=name, daemon=True)
+		self._thread.start()
+
+	@property
+	def num_pending(self) -> int:
+		"""The number of frames queued but not yet handed to the socket."""
+		with self._condition:
+			return len(self._pending)
+
+	@property
+	def num_sent_messages(self) -> int:
+		return self._num_sent_messages
+
+	@property
+	def num_sent_bytes(self) -> int:
+		return self._num_sent_bytes
+
+	def send(self, frame: bytes, urgent: bool = False) -> None:
+		"""Queues a frame for sending. Blocks while `max_pending_bytes` are queued.
+
+		Args:
+			frame: The framed message.
+			urgent: Whether to flush right away instead of waiting out the coalescing window; for latency-critical messages.
+
+		Raises:
+			ConnectionError: If the writer was closed, or an earlier write failed, also while waiting for room.
+		"""
+		with self._condition:
+			while True:
+				if self._closing or self._error is not None:
+					message: str = f"Cannot send: {'the writer is closed' if self._error is None else f'an earlier write failed: {self._error}'}."
+					self._logger.error(message, separator=self._module_separator)
+					raise ConnectionError(message)
+				if not self._pending or self._pending_bytes + len(frame) <= self._max_pending_bytes:
+					break
+				self._space_available.wait()
+
+			self._pending.append(frame)
+			self._pending_bytes += len(frame)
+			if urgent:
+				self._urgent = True
+
+			# The writer only waits for the first frame, or for the window to end early.
+			if len(self._pending) == 1 or urgent or self._pending_bytes >= self._max_batch_bytes:
+				self._condition.notify()
+
+	def _take_batch(self) -> Optional[List[bytes]]:
+		with self._condition:
+			while not self._pending and not self._closing:
+				self._condition.wait()
+			if not self._pending:
+				return None
+
+			deadline: float = time.monotonic() + self._coalesce_window_seconds
+			while not self._urgent and not self._closing and self._pending_bytes < self._max_batch_bytes:
+				remaining: float = deadline - time.monotonic()
+				if remaining <= 0:
+					break
+				self._condition.wait(remaining)
+
+			batch: List[bytes] = self._pending
+			self._pending = []
+			self._pending_bytes = 0
+			self._urgent = False
+			self._space_available.notify_all()
+			return batch
+
+	def _run(self) -> None:
+		while True:
+			batch: Optional[List[bytes]] = self._take_batch()
+			if batch is None:
+				return
+
+			try:
+				self._write(batch)
+				self._num_sent_messages += len(batch)
+				self._num_sent_bytes += sum(len(frame) for frame in batch)
+			except OSError as e:
+				self._logger.error(f"Failed to send {len(batch)} message(s): {e}", separator=self._module_separator)
+				with self._condition:
+					self._error = e
+					self._pending.clear()
+					self._pending_bytes = 0
+					self._space_available.notify_all()
+				return
+
+	def _write(self, frames: List[bytes]) -> None:
+		if len(frames) == 1 or not hasattr(self._socket, "sendmsg"):
+			# Windows has no sendmsg; a single joined write is the next best thing.
+			self._socket.sendall(frames[0] if len(frames) == 1 else b"".join(frames))
+			return
+
+		buffers: List[memoryview] = [memoryview(frame) for frame in frames]
+		first: int = 0
+		while first < len(buffers):
+			num_sent: int = self._socket.sendmsg(buffers[first:first + _MAX_BUFFERS_PER_SEND])
+
+			# Skips what was sent; a partial send leaves the rest of a buffer for the next call.
+			while num_sent > 0:
+				size: int = buffers[first].nbytes
+				if num_sent >= size:
+					num_sent -= size
+					first += 1
+				else:
+					buffers[first] = buffers[first][num_sent:]
+					num_sent = 0
+
+	def close(self, timeout: Optional[float] = None) -> None:
+		"""Sends the frames still queued, then stops the writer thread. Does not close the socket."""
+		with self._condition:
+			self._closing = True
+			self._condition.notify()
+			self._space_available.notify_all()
+		self._thread.join(timeout)
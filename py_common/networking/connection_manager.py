@@ -0,0 +1,193 @@
+import dataclasses
+import random
+import threading
+import time
+from typing import Callable, List, Optional
+
+from .connection_statistics import ConnectionStatistics
+from .connector import Connector
+from .message_model import MessageModel
+from ..logging import HoornLogger
+
+
+class ConnectionManager:
+	"""
+	Keeps a small pool of connections to the middleman open. Every connection that drops is reconnected in the background,
+	with jittered exponential backoff so a restarting middleman is not hit by every component at once.
+
+	Offers the `send_request` and `shutdown` of a :class:`Connector`, so a :class:`MessageProcessor` can use it instead:
+	requests are spread over the open connections, and the responses of every connection go to the same listener.
+	"""
+	def __init__(self,
+				 logger: HoornLogger,
+				 message_received_listener: Callable[[MessageModel], None],
+				 host: str,
+				 port: int,
+				 pool_size: int = 2,
+				 module_separator: str = "Common.ConnectionManager",
+				 connector_factory: Optional[Callable[..., Connector]] = None,
+				 connected_listener: Optional[Callable[[Connector], None]] = None,
+				 component_port: Optional[int] = None,
+				 initial_backoff_seconds: float = 0.5,
+				 max_backoff_seconds: float = 30.0,
+				 statistics_log_interval_seconds: Optional[float] = None):
+		"""
+		Args:
+			pool_size: The number of connections to keep open.
+			connector_factory: Creates the connector of every connection attempt from `logger`,
+				`message_received_listener` and `connection_lost_listener` keyword arguments;
+				pass a partial of :class:`Connector` to configure its framing or codec. Defaults to a plain :class:`Connector`.
+			connected_listener: Called with the connector after every (re)connection, before it takes requests;
+				this is where the component registers itself with the middleman.
+			component_port: The local port of the first connection; the others use the ports after it.
+				Defaults to any free port.
+			initial_backoff_seconds: The longest wait before the first retry; it doubles with every failed attempt.
+			max_backoff_seconds: The limit of the backoff.
+			statistics_log_interval_seconds: Logs the statistics of every connection this often. None disables it.
+		"""
+		self._logger = logger
+		self._message_received_listener: Callable[[MessageModel], None] = message_received_listener
+		self._host: str = host
+		self._port: int = port
+		self._pool_size: int = pool_size
+		self._module_separator = module_separator
+		self._connector_factory: Callable[..., Connector] = connector_factory or Connector
+		self._connected_listener: Optional[Callable[[Connector], None]] = connected_listener
+		self._component_port: Optional[int] = component_port
+		self._initial_backoff_seconds: float = initial_backoff_seconds
+		self._max_backoff_seconds: float = max_backoff_seconds
+		self._statistics_log_interval_seconds: Optional[float] = statistics_log_interval_seconds
+
+		self._lock: threading.Lock = threading.Lock()
+		self._connectors: List[Optional[Connector]] = [None] * pool_size
+		# The last connector of every slot, connected or not, for its statistics.
+		self._latest_connectors: List[Optional[Connector]] = [None] * pool_size
+		self._reconnects: List[int] = [0] * pool_size
+		self._next_slot: int = 0
+		self._connected: threading.Event = threading.Event()
+
+		self._shutdown_signal: threading.Event = threading.Event()
+		self._threads: List[threading.Thread] = []
+
+	@property
+	def num_connected(self) -> int:
+		with self._lock:
+			return sum(1 for connector in self._connectors if connector is not None)
+
+	@property
+	def num_reconnects(self) -> int:
+		"""The number of connections made again after one was lost."""
+		with self._lock:
+			return sum(self._reconnects)
+
+	def get_statistics(self) -> List[ConnectionStatistics]:
+		"""The statistics of every connection that was made, by slot. The counters start over with every reconnect."""
+		with self._lock:
+			slots = [(connector, reconnects) for connector, reconnects in zip(self._latest_connectors, self._reconnects) if connector is not None]
+		return [dataclasses.replace(connector.get_statistics(), reconnects=reconnects) for connector, reconnects in slots]
+
+	def start(self, timeout_seconds: Optional[float] = 10.0) -> bool:
+		"""Starts connecting every connection of the pool, and keeps them connected until :meth:`shutdown`.
+
+		Args:
+			timeout_seconds: How long to wait for the first connection.
+
+		Returns:
+			Whether a connection was made in time. Connecting goes on in the background either way.
+		"""
+		for slot in range(self._pool_size):
+			thread = threading.Thread(target=self._maintain, args=(slot,), name=f"{self._module_separator}-{slot}", daemon=True)
+			thread.start()
+			self._threads.append(thread)
+
+		return self._connected.wait(timeout_seconds)
+
+	def _backoff(self, attempt: int) -> float:
+		# Full jitter: anywhere between no wait and the exponential limit.
+		return random.uniform(0, min(self._max_backoff_seconds, self._initial_backoff_seconds * 2 ** attempt))
+
+	def _maintain(self, slot: int) -> None:
+		component_port: Optional[int] = self._component_port + slot if self._component_port is not None else None
+		failed_attempts: int = 0
+		has_connected: bool = False
+
+		while not self._shutdown_signal.is_set():
+			lost: threading.Event = threading.Event()
+			connector: Connector = self._connector_factory(
+				logger=self._logger,
+				message_received_listener=self._message_received_listener,
+				connection_lost_listener=lost.set,
+			)
+
+			if connector.connect_to_remote(self._host, self._port, component_port) is None:
+				delay: float = self._backoff(failed_attempts)
+				failed_attempts += 1
+				self._logger.warning(f"Connection {slot} failed {failed_attempts} time(s); retrying in {delay:.2f} seconds.", separator=self._module_separator)
+				self._shutdown_signal.wait(delay)
+				continue
+
+			failed_attempts = 0
+			if self._connected_listener is not None:
+				try:
+					self._connected_listener(connector)
+				except Exception as e:
+					self._logger.error(f"Failed to set up connection {slot}: {e!r}", separator=self._module_separator)
+
+			with self._lock:
+				self._connectors[slot] = connector
+				self._latest_connectors[slot] = connector
+				if has_connected:
+					self._reconnects[slot] += 1
+			has_connected = True
+			self._connected.set()
+
+			next_log: float = time.monotonic() + (self._statistics_log_interval_seconds or 0)
+			while not lost.wait(0.5):
+				if self._shutdown_signal.is_set():
+					return
+				if self._statistics_log_interval_seconds is not None and time.monotonic() >= next_log:
+					next_log += self._statistics_log_interval_seconds
+					statistics: ConnectionStatistics = dataclasses.replace(connector.get_statistics(), reconnects=self._reconnects[slot])
+					self._logger.info(f"Connection {slot}: {statistics.format()}", separator=self._module_separator)
+
+			with self._lock:
+				self._connectors[slot] = None
+			self._logger.warning(f"Connection {slot} was lost; reconnecting.", separator=self._module_separator)
+
+	def _pick(self) -> Connector:
+		with self._lock:
+			candidates: List[Connector] = [connector for connector in self._connectors if connector is not None and connector.is_connected]
+			if not candidates:
+				self._logger.error("Cannot send a message: no connection is open.", separator=self._module_separator)
+				raise ConnectionError("Cannot send a message: no connection is open.")
+
+			# Round-robin, but skipping to the connection with the shortest outbound queue.
+			self._next_slot = (self._next_slot + 1) % len(candidates)
+			start: Connector = candidates[self._next_slot]
+			return min(candidates, key=lambda connector: (connector.num_pending_messages, connector is not start))
+
+	def send_request(self, message: MessageModel, urgent: bool = False) -> None:
+		"""Sends a message over one of the open connections.
+
+		Raises:
+			ConnectionError: If no connection is open, for example while reconnecting.
+		"""
+		self._pick().send_request(message, urgent)
+
+	def shutdown(self) -> None:
+		"""Stops reconnecting, and shuts every connection down."""
+		self._shutdown_signal.set()
+		for thread in self._threads:
+			thread.join()
+		self._threads.clear()
+
+		with self._lock:
+			connectors: List[Connector] = [connector for connector in self._connectors if connector is not None]
+			self._connectors = [None] * self._pool_size
+
+		# In parallel: every connector takes a moment to unregister.
+		threads: List[threading.Thread] = [threading.Thread(target=connector.shutdown) for connector in connectors]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
@@ -0,0 +1,38 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class ConnectionStatistics:
+	"""A snapshot of the traffic and health of one connection."""
+	connected: bool
+	bytes_sent: int
+	bytes_received: int
+	messages_sent: int
+	messages_received: int
+	outbound_queue_depth: int
+	"""Messages queued for sending but not yet handed to the socket."""
+	inbound_queue_depth: int
+	"""Received messages waiting to be handled."""
+	decode_errors: int
+	"""Received data that could not be framed or decoded, and was dropped."""
+	heartbeats_sent: int
+	heartbeats_answered: int
+	last_rtt_seconds: Optional[float]
+	"""The round-trip time of the last answered heartbeat; None until one is answered, or when not measured."""
+	smoothed_rtt_seconds: Optional[float]
+	"""A moving average of the round-trip time, weighted like TCP's: 1/8 for every new sample."""
+	max_rtt_seconds: Optional[float]
+	reconnects: int = 0
+	"""Times the connection was made again after it was lost; counted by a :class:`ConnectionManager`."""
+
+	def format(self) -> str:
+		def milliseconds(seconds: Optional[float]) -> str:
+			return "n/a" if seconds is None else f"{seconds * 1000:.2f} ms"
+
+		return (f"{'connected' if self.connected else 'disconnected'}, "
+				f"sent {self.messages_sent} message(s) / {self.bytes_sent} B, received {self.messages_received} message(s) / {self.bytes_received} B, "
+				f"queued out {self.outbound_queue_depth} / in {self.inbound_queue_depth}, {self.decode_errors} decode error(s), "
+				f"heartbeats {self.heartbeats_answered}/{self.heartbeats_sent} answered, "
+				f"RTT last {milliseconds(self.last_rtt_seconds)}, smoothed {milliseconds(self.smoothed_rtt_seconds)}, max {milliseconds(self.max_rtt_seconds)}, "
+				f"{self.reconnects} reconnect(s)")
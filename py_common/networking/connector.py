@@ -1,17 +1,18 @@
-import json
 import queue
 import socket
 import threading
 import time
-from datetime import datetime
-from pathlib import Path
-from typing import List, Callable
-from uuid import uuid4
-
-from .argument_model import ArgumentModel
+from typing import Callable, Optional, Union
+
+from .coalescing_writer import CoalescingWriter
+from .connection_statistics import ConnectionStatistics
+from .framing_mode import FramingMode
+from .heartbeat_tracker import HeartbeatTracker
+from .length_prefixed_framer import LengthPrefixedFramer
+from .message_framer import MessageFramer
+from .message_codec import MessageCodec, resolve_codec
 from .message_model import MessageModel
-from .message_payload import MessagePayload
-from .util import encode_message_to_bytes
+from .util import build_unregister_message, create_framer, frame_message
 from ..logging import HoornLogger
 
 
@@ -24,7 +25,26 @@ class Connector:
 				 message_received_listener: Callable[[MessageModel], None],
 				 module_separator: str = "Common.Connector",
 				 end_of_message_token: str = "<eom>",
-				 component_id: str = "ea1973db-31e7-4fe4-bd57-e217f246f6a1"):
+				 component_id: str = "ea1973db-31e7-4fe4-bd57-e217f246f6a1",
+				 receive_buffer_size: int = 65536,
+				 framing_mode: FramingMode = FramingMode.END_OF_MESSAGE_TOKEN,
+				 codec: Optional[MessageCodec] = None,
+				 coalesce_window_seconds: float = 0.0005,
+				 connection_lost_listener: Optional[Callable[[], None]] = None,
+				 keep_alive_interval_seconds: float = 30.0,
+				 measure_heartbeat_rtt: bool = False,
+				 max_pending_bytes: int = 16 * 1024 * 1024):
+		"""
+		Args:
+			coalesce_window_seconds: How long an outgoing message waits for others to be sent together with it.
+				Messages sent with `urgent` never wait.
+			connection_lost_listener: Called once when the connection ends, unless it ended through :meth:`shutdown`.
+				A connector holds a single connection: create a new one to reconnect, or use a :class:`ConnectionManager`.
+			keep_alive_interval_seconds: The time between two heartbeats.
+			measure_heartbeat_rtt: Whether to measure the round-trip time of the heartbeats the middleman answers.
+				Gives every heartbeat its own `unique_id` and `time_sent`; off by default, which sends them unchanged.
+			max_pending_bytes: How much may be queued for sending before :meth:`send_request` blocks.
+		"""
 		self._logger = logger
 		self._message_received_listener: Callable[[MessageModel], None] = message_received_listener
 
@@ -32,7 +52,34 @@ class Connector:
 		self._module_separator = module_separator
 		self._shutdown_signal: threading.Event = threading.Event()
 		self._end_of_message_token = end_of_message_token
+		self._receive_buffer_size: int = receive_buffer_size
+		# Must match the framing mode the middleman uses for this connection.
+		self._framing_mode: FramingMode = framing_mode
+		# Must match the codec of the other end as well; JSON by default.
+		self._codec: MessageCodec = resolve_codec(logger, module_separator, codec, framing_mode)
+		self._coalesce_window_seconds: float = coalesce_window_seconds
+		self._max_pending_bytes: int = max_pending_bytes
 		self._socket: socket = None
+		self._writer: Optional[CoalescingWriter] = None
+		self._connection_lost_listener: Optional[Callable[[], None]] = connection_lost_listener
+		self._keep_alive_interval_seconds: float = keep_alive_interval_seconds
+		self._heartbeats: HeartbeatTracker = HeartbeatTracker(measure_heartbeat_rtt)
+
+		# Each counter is only updated by one thread: the reading thread, or the processing thread for decode errors.
+		self._message_queue: Optional[queue.Queue] = None
+		self._num_received_bytes: int = 0
+		self._num_received_messages: int = 0
+		self._num_decode_errors: int = 0
+
+	@property
+	def is_connected(self) -> bool:
+		return self._socket is not None and not self._shutdown_signal.is_set()
+
+	@property
+	def num_pending_messages(self) -> int:
+		"""The number of messages queued for sending but not yet handed to the socket."""
+		writer: Optional[CoalescingWriter] = self._writer
+		return writer.num_pending if writer is not None else 0
 
 	def shutdown(self):
 		self._logger.debug("Stopping listening loop because of shutdown signal.", separator=self._module_separator)
@@ -40,53 +87,65 @@ class Connector:
 
 		time.sleep(1)
 		if self._socket is not None:
-			script_path: Path = Path(__file__).parent.parent.joinpath('unregister.json')
-
-			with open(script_path, 'r') as f:
-				unregister_json = json.load(f)
-				unregister_json["sender_id"] = self._component_id
-				unregister_json["unique_id"] = str(uuid4())
-				unregister_json["time_sent"] = str(datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%fZ")[:-3] + "Z" )
-				message: bytes = encode_message_to_bytes(unregister_json)
-				self._logger.debug("Unregistering Component from Middleman", separator=self._module_separator)
-				self._socket.sendall(message)
-				time.sleep(1)
+			message: bytes = self._encode(build_unregister_message(self._component_id))
+			self._logger.debug("Unregistering Component from Middleman", separator=self._module_separator)
+			try:
+				self._writer.send(message, urgent=True)
+			except ConnectionError:
+				pass  # Already logged; the connection is gone, so there is nothing to unregister from.
+			self._writer.close()
+			time.sleep(1)
 
+			try:
+				# Wakes the reading thread, which close() alone leaves blocked in recv.
+				self._socket.shutdown(socket.SHUT_RDWR)
+			except OSError:
+				pass
 			self._socket.close()
 			self._socket = None
 
-	def connect_to_remote(self, host: str, port: int, component_port: int = 5555) -> socket:
+	def connect_to_remote(self, host: str, port: int, component_port: Optional[int] = None) -> socket:
 		"""Connects to a remote host and port using TCP and continuously listens for data.
 
 		Args:
 		   host: The hostname or IP address of the remote host.
 		   port: The port number on the remote host.
-		   component_port: The port number to bind the socket to. Defaults to 5555.
+		   component_port: The local port number to bind the socket to. Defaults to any free port.
 
 		Returns:
-		   None. Logs error messages on failure.
+		   The socket, or None on failure. Logs error messages on failure.
 		"""
 		s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-		s.bind((host, component_port))
 		try:
+			if component_port is not None:
+				# Lets a reconnect bind the port again while the previous connection is still in TIME_WAIT.
+				s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+				s.bind((host, component_port))
 			s.connect((host, port))
-		except ConnectionRefusedError:
-			self._logger.error(f"Connection refused by {host}:{port}", separator=self._module_separator)
+		except OSError as e:
+			s.close()
+			self._logger.error(f"Could not connect to {host}:{port}: {e}", separator=self._module_separator)
 			return None
 		self._logger.info(f"Connected to {host}:{port}", separator=self._module_separator)
 
+		self._socket = s
+		self._writer = CoalescingWriter(self._logger, s, f"{self._module_separator}.Writer", self._coalesce_window_seconds, max_pending_bytes=self._max_pending_bytes)
+
 		reading_thread = threading.Thread(target=self.read_data_loop, args=(s, host, port, self._shutdown_signal))
 		reading_thread.start()
 
 		keep_alive_thread = threading.Thread(target=self._keep_alive_loop, args=[self._shutdown_signal])
 		keep_alive_thread.start()
 
-		self._socket = s
 		return s
 
 	def read_data_loop(self, s: socket, host: str, port: int, shutdown_signal: threading.Event):
-		buffer = b""
+		framer: Union[MessageFramer, LengthPrefixedFramer] = self._create_framer()
+		# Received into the same memory every time, instead of a new bytes object per read.
+		receive_buffer: bytearray = bytearray(self._receive_buffer_size)
+		receive_view: memoryview = memoryview(receive_buffer)
 		message_queue = queue.Queue()  # Create a queue for messages
+		self._message_queue = message_queue
 
 		# Start a separate thread for processing messages
 		processing_thread = threading.Thread(target=self._process_messages, args=(message_queue, shutdown_signal))
@@ -95,18 +154,20 @@ class Connector:
 
 		while not shutdown_signal.is_set():
 			try:
-				data = s.recv(4096)
-				if not data:
+				num_received: int = s.recv_into(receive_buffer)
+				if num_received == 0:
 					self._logger.info(f"Connection closed by {host}:{port}", separator=self._module_separator)
 					break
 
-				buffer += data
+				self._num_received_bytes += num_received
 
-				if self._end_of_message_token.encode() in buffer:
-					message, remaining = buffer.split(self._end_of_message_token.encode(), 1)
-					message = message.decode()
-					message_queue.put((message, host, port))  # Put message in the queue
-					buffer = remaining
+				# A single read can complete several messages; all of them are handed on right away.
+				for data in framer.feed(receive_view[:num_received]):
+					self._num_received_messages += 1
+					# Decoded here, while length-prefixed messages are still valid views of the receive buffer, so they are never copied.
+					message: Optional[MessageModel] = self._decode(data)
+					if message is not None:
+						message_queue.put((message, host, port))  # Put message in the queue
 
 			except socket.timeout:
 				self._logger.warning(f"Timeout while receiving data from {host}:{port}", separator=self._module_separator)
@@ -116,23 +177,43 @@ class Connector:
 
 				self._logger.error(f"Error receiving data from {host}:{port}: {e}", separator=self._module_separator)
 				break
+			except ValueError as e:
+				self._num_decode_errors += 1
+				self._logger.error(f"Corrupt data from {host}:{port}, closing the connection: {e}", separator=self._module_separator)
+				break
 
 		# Signal the processing thread to stop
 		message_queue.put(None)
 		processing_thread.join()
 
-	def _keep_alive_loop(self, shutdown_signal: threading.Event) -> None:
-		script_path: Path = Path(__file__).parent.parent.joinpath('keep_alive.json')
+		if not shutdown_signal.is_set():
+			self._on_connection_lost()
 
-		with open(script_path, 'r') as f:
-			keep_alive_json = json.load(f)
-			message: bytes = encode_message_to_bytes(keep_alive_json)
+	def _on_connection_lost(self) -> None:
+		# Stops the keep-alive and fails later sends, instead of writing to a dead socket.
+		self._shutdown_signal.set()
 
-		time.sleep(30) # No need to send a keep-alive message for the first 5 seconds
+		# Closed but kept, for its statistics; sending on it fails from now on.
+		if self._writer is not None:
+			self._writer.close(timeout=1)
 
-		while not shutdown_signal.is_set():
-				self._socket.sendall(message)
-				time.sleep(30)
+		s: Optional[socket.socket] = self._socket
+		self._socket = None
+		if s is not None:
+			s.close()
+
+		if self._connection_lost_listener is not None:
+			self._connection_lost_listener()
+
+	def _keep_alive_loop(self, shutdown_signal: threading.Event) -> None:
+		# Waits on the signal instead of sleeping, so the thread ends as soon as the connection does.
+		while not shutdown_signal.wait(self._keep_alive_interval_seconds):
+			try:
+				# Urgent, so the measured round trip does not include the coalescing window.
+				self._writer.send(self._encode(self._heartbeats.create()), urgent=True)
+			except ConnectionError:
+				self._logger.warning("Stopping keep-alive: the connection is lost.", separator=self._module_separator)
+				return
 
 	def _process_messages(self, message_queue: queue.Queue, shutdown_signal: threading.Event):
 		while not shutdown_signal.is_set():
@@ -147,30 +228,59 @@ class Connector:
 			except queue.Empty:
 				pass  # Handle empty queue (timeout)
 
-	def _process_message(self, data: str) -> None:
-		# self._logger.debug(f"Received from {host}:{port}: {data}", separator=self._module_separator)
-		json_data = json.loads(data)
+	def _decode(self, data: Union[bytes, memoryview]) -> Optional[MessageModel]:
+		"""Decodes a received message on the reading thread. Returns None for messages not meant for the listener."""
+		try:
+			message: MessageModel = self._codec.decode(data)
+		except Exception as e:
+			self._num_decode_errors += 1
+			self._logger.error(f"Dropping a message that could not be decoded: {e!r}", separator=self._module_separator)
+			return None
+
+		if self._heartbeats.acknowledge(message.target_uuid):
+			return None
+		return message
+
+	def _process_message(self, message: MessageModel) -> None:
+		# self._logger.debug(f"Received from {host}:{port}: {message}", separator=self._module_separator)
+		self._message_received_listener(message)
+
+	def get_statistics(self) -> ConnectionStatistics:
+		writer: Optional[CoalescingWriter] = self._writer
+		message_queue: Optional[queue.Queue] = self._message_queue
+		return ConnectionStatistics(
+			connected=self.is_connected,
+			bytes_sent=writer.num_sent_bytes if writer is not None else 0,
+			bytes_received=self._num_received_bytes,
+			messages_sent=writer.num_sent_messages if writer is not None else 0,
+			messages_received=self._num_received_messages,
+			outbound_queue_depth=writer.num_pending if writer is not None else 0,
+			inbound_queue_depth=message_queue.qsize() if message_queue is not None else 0,
+			decode_errors=self._num_decode_errors,
+			**self._heartbeats.snapshot(),
+		)
 
-		message_payload = json_data["payload"]
-		args: List[ArgumentModel] = []
+	def send_request(self, message: MessageModel, urgent: bool = False):
+		"""Queues a message for sending, and returns without waiting for it to be written.
 
-		for arg_data in message_payload["args"]:
-			args.append(ArgumentModel(
-				type=arg_data["type"],
-				value=arg_data["value"]
-			))
+		Sending is fire-and-forget: a write that fails is logged by the writer thread instead of raised here,
+		and fails every later send, while the reading thread reports the connection lost.
+		Blocks while `max_pending_bytes` are queued, until the writer thread catches up.
 
-		processed_message_payload: MessagePayload = MessagePayload(
-			action=message_payload["action"],
-			args=args
-		)
+		Args:
+			message: The message to send.
+			urgent: Whether to send it right away instead of coalescing it with the messages that follow.
 
-		processed_message: MessageModel = MessageModel(
-			target_uuid=json_data["target_id"],
-            payload=processed_message_payload
-        )
+		Raises:
+			ConnectionError: If the connection is not open, or an earlier write failed.
+		"""
+		if self._writer is None:
+			self._logger.error("Cannot send a message without a connection.", separator=self._module_separator)
+			raise ConnectionError("Cannot send a message without a connection.")
+		self._writer.send(self._encode(message), urgent)
 
-		self._message_received_listener(processed_message)
+	def _encode(self, message: Union[MessageModel, dict]) -> bytes:
+		return frame_message(self._codec.encode(message), self._end_of_message_token, self._framing_mode)
 
-	def send_request(self, message: MessageModel):
-		self._socket.sendall(encode_message_to_bytes(message.model_dump()))
+	def _create_framer(self) -> Union[MessageFramer, LengthPrefixedFramer]:
+		return create_framer(self._framing_mode, self._end_of_message_token)
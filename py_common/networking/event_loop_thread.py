@@ -0,0 +1,66 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional
+
+
+class EventLoopThread:
+	"""
+	Runs an asyncio event loop on a background thread, so thread-based code can use the asyncio networking classes.
+	"""
+	def __init__(self, name: str = "EventLoopThread"):
+		self._name: str = name
+		self._loop: Optional[asyncio.AbstractEventLoop] = None
+		self._thread: Optional[threading.Thread] = None
+
+	@property
+	def loop(self) -> asyncio.AbstractEventLoop:
+		return self._loop
+
+	def start(self) -> None:
+		"""Starts the loop and returns once it is running."""
+		running: threading.Event = threading.Event()
+		self._loop = asyncio.new_event_loop()
+		self._thread = threading.Thread(target=self._run_loop, args=(running,), name=self._name, daemon=True)
+		self._thread.start()
+		running.wait()
+
+	def _run_loop(self, running: threading.Event) -> None:
+		asyncio.set_event_loop(self._loop)
+		self._loop.call_soon(running.set)
+		self._loop.run_forever()
+
+	def submit(self, coroutine: Coroutine[Any, Any, Any]) -> Future:
+		"""Schedules a coroutine on the loop.
+
+		Returns:
+			A future for its result, which can be waited on from any thread.
+		"""
+		return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+	def run(self, coroutine: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+		"""Runs a coroutine on the loop and blocks until it is done.
+
+		Returns:
+			The result of the coroutine. Its exception is raised here.
+		"""
+		return self.submit(coroutine).result(timeout)
+
+	def stop(self) -> None:
+		"""Cancels whatever still runs on the loop, then stops and closes it."""
+		if self._loop is None:
+			return
+
+		self.run(self._cancel_remaining_tasks())
+		self._loop.call_soon_threadsafe(self._loop.stop)
+		self._thread.join()
+		self._loop.close()
+		self._loop = None
+		self._thread = None
+
+	@staticmethod
+	async def _cancel_remaining_tasks() -> None:
+		tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+		for task in tasks:
+			task.cancel()
+		await asyncio.gather(*tasks, return_exceptions=True)
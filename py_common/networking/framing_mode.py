@@ -0,0 +1,10 @@
+from enum import Enum
+
+
+class FramingMode(Enum):
+	"""Determines how messages are delimited on a connection. Both ends of a connection must use the same mode."""
+	END_OF_MESSAGE_TOKEN = "end_of_message_token"
+	"""Every message ends in a token, `<eom>` by default. The payload must never contain the token."""
+	LENGTH_PREFIXED = "length_prefixed"
+	"""Every message starts with its length as a 4-byte, big-endian unsigned integer.
+	Any payload is allowed, and the receiver never scans the message itself."""
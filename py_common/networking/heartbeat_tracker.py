@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional
+from uuid import uuid4
+
+from .util import load_keep_alive_message
+
+
+class HeartbeatTracker:
+	"""
+	Builds the heartbeats of a connection and, optionally, measures their round-trip time.
+
+	By default every heartbeat is the keep-alive message as it always was. When measuring, every heartbeat also gets
+	its own `unique_id` and the time it was sent, in the fields every message has; the payload stays the same. When the middleman
+	answers it, with a message whose target is that id, the round-trip time is measured against a monotonic clock.
+	Middlemen that do not answer heartbeats leave the round-trip time unknown, and the heartbeats still keep the connection alive.
+	"""
+	def __init__(self, measure_rtt: bool = False, max_outstanding: int = 16):
+		"""
+		Args:
+			measure_rtt: Whether to give every heartbeat its own id, to match the answers of the middleman against.
+			max_outstanding: The number of unanswered heartbeats remembered; older ones are considered lost.
+		"""
+		self._measure_rtt: bool = measure_rtt
+		self._max_outstanding: int = max_outstanding
+		# Read once, and never changed: measured heartbeats are shallow copies with their own id and time.
+		self._template: dict = load_keep_alive_message()
+
+		self._lock: threading.Lock = threading.Lock()
+		self._outstanding: OrderedDict[str, int] = OrderedDict()
+		self._num_sent: int = 0
+		self._num_answered: int = 0
+		self._last_rtt_seconds: Optional[float] = None
+		self._smoothed_rtt_seconds: Optional[float] = None
+		self._max_rtt_seconds: Optional[float] = None
+
+	def create(self) -> dict:
+		"""Returns the next heartbeat, in dictionary form, and starts timing it when measuring."""
+		if not self._measure_rtt:
+			with self._lock:
+				self._num_sent += 1
+			return self._template
+
+		unique_id: str = str(uuid4())
+		message: dict = dict(self._template)
+		message["unique_id"] = unique_id
+		message["time_sent"] = datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+		with self._lock:
+			self._outstanding[unique_id] = time.monotonic_ns()
+			if len(self._outstanding) > self._max_outstanding:
+				self._outstanding.popitem(last=False)
+			self._num_sent += 1
+		return message
+
+	def acknowledge(self, target_id: Optional[str]) -> bool:
+		"""Records the answer to a heartbeat.
+
+		Returns:
+			Whether the message answers a heartbeat, and so is not meant for anyone else.
+		"""
+		with self._lock:
+			sent_at_ns: Optional[int] = self._outstanding.pop(target_id, None)
+			if sent_at_ns is None:
+				return False
+
+			rtt: float = (time.monotonic_ns() - sent_at_ns) / 1e9
+			self._num_answered += 1
+			self._last_rtt_seconds = rtt
+			self._smoothed_rtt_seconds = rtt if self._smoothed_rtt_seconds is None else self._smoothed_rtt_seconds + (rtt - self._smoothed_rtt_seconds) / 8
+			self._max_rtt_seconds = rtt if self._max_rtt_seconds is None else max(self._max_rtt_seconds, rtt)
+			return True
+
+	def snapshot(self) -> Dict[str, Optional[float]]:
+		"""The heartbeat fields of :class:`ConnectionStatistics`."""
+		with self._lock:
+			return {
+				"heartbeats_sent": self._num_sent,
+				"heartbeats_answered": self._num_answered,
+				"last_rtt_seconds": self._last_rtt_seconds,
+				"smoothed_rtt_seconds": self._smoothed_rtt_seconds,
+				"max_rtt_seconds": self._max_rtt_seconds,
+			}
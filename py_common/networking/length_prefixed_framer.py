@@ -0,0 +1,93 @@
+import struct
+from typing import List, Optional, Tuple, Union
+
+LENGTH_HEADER: struct.Struct = struct.Struct(">I")
+
+
+class LengthPrefixedFramer:
+	"""
+	Splits a stream of bytes into messages that start with their length (see :class:`FramingMode`).
+
+	Only the 4-byte headers are parsed; the messages themselves are never scanned. A message received in one piece
+	is returned as a slice of the received bytes, without copying, so it is only valid until the receive buffer is reused.
+	"""
+	def __init__(self, max_message_size: int = 64 * 1024 * 1024):
+		"""
+		Args:
+			max_message_size: Larger lengths are treated as a corrupt stream rather than allocated.
+		"""
+		self._max_message_size: int = max_message_size
+		self._header: bytearray = bytearray()
+		# The message being received over several reads, and how much of it has arrived.
+		self._message: Optional[bytearray] = None
+		self._num_filled: int = 0
+
+	@property
+	def num_buffered_bytes(self) -> int:
+		"""The bytes of the incomplete message received so far."""
+		return len(self._header) + self._num_filled
+
+	def _read_length(self, view: memoryview, position: int) -> Tuple[Optional[int], int]:
+		"""Returns the length of the next message, or None if its header is incomplete, and the position after the header."""
+		if not self._header and len(view) - position >= LENGTH_HEADER.size:
+			return LENGTH_HEADER.unpack_from(view, position)[0], position + LENGTH_HEADER.size
+
+		# The header is split over two reads.
+		missing: int = LENGTH_HEADER.size - len(self._header)
+		self._header += view[position:position + missing]
+		position = min(position + missing, len(view))
+		if len(self._header) < LENGTH_HEADER.size:
+			return None, position
+
+		length: int = LENGTH_HEADER.unpack(self._header)[0]
+		self._header.clear()
+		return length, position
+
+	def feed(self, data: Union[bytes, bytearray, memoryview]) -> List[memoryview]:
+		"""Adds received bytes.
+
+		Args:
+			data: The bytes, in the order they were received.
+
+		Returns:
+			Every message completed by them, without the header, oldest first.
+			Decode or copy them before feeding more data or reusing `data`.
+		"""
+		view: memoryview = memoryview(data)
+		position: int = 0
+		messages: List[memoryview] = []
+
+		while position < len(view):
+			if self._message is None:
+				length: Optional[int]
+				length, position = self._read_length(view, position)
+				if length is None:
+					break
+				if length > self._max_message_size:
+					raise ValueError(f"Message of {length} bytes exceeds the maximum of {self._max_message_size}; the stream is corrupt.")
+
+				if len(view) - position >= length:
+					messages.append(view[position:position + length])
+					position += length
+					continue
+
+				self._message = bytearray(length)
+				self._num_filled = 0
+
+			num_taken: int = min(len(self._message) - self._num_filled, len(view) - position)
+			self._message[self._num_filled:self._num_filled + num_taken] = view[position:position + num_taken]
+			self._num_filled += num_taken
+			position += num_taken
+
+			if self._num_filled == len(self._message):
+				messages.append(memoryview(self._message))
+				self._message = None
+				self._num_filled = 0
+
+		return messages
+
+	def reset(self) -> None:
+		"""Discards the incomplete message, for example after reconnecting."""
+		self._header.clear()
+		self._message = None
+		self._num_filled = 0
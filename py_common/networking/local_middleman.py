@@ -0,0 +1,104 @@
+import queue
+import threading
+from typing import Callable, Dict, Optional
+
+from .message_model import MessageModel
+from ..logging import HoornLogger
+
+
+class LocalConnection:
+	"""
+	A component's connection to a :class:`LocalMiddleman`. Offers the same `send_request` as the :class:`Connector`.
+	"""
+	def __init__(self, middleman: "LocalMiddleman", component_id: str):
+		self._middleman: LocalMiddleman = middleman
+		self.component_id: str = component_id
+
+	def send_request(self, message: MessageModel) -> None:
+		self._middleman.route(message)
+
+	def close(self) -> None:
+		"""Disconnects the component. Messages sent to it afterward are dropped, as if it crashed."""
+		self._middleman.disconnect(self.component_id)
+
+
+class _Inbox:
+	"""Delivers the messages of one component on its own thread, in the order they were sent."""
+	def __init__(self, component_id: str, message_received_listener: Callable[[MessageModel], None]):
+		self.queue: queue.Queue = queue.Queue()
+		self.thread: threading.Thread = threading.Thread(
+			target=self._deliver_loop,
+			args=(message_received_listener,),
+			name=f"LocalMiddleman-{component_id}",
+			daemon=True,
+		)
+		self.thread.start()
+
+	def _deliver_loop(self, message_received_listener: Callable[[MessageModel], None]) -> None:
+		while True:
+			message: Optional[MessageModel] = self.queue.get()
+			if message is None:
+				return
+			message_received_listener(message)
+
+
+class LocalMiddleman:
+	"""
+	An in-process stand-in for the middleman, to run several components on one machine without sockets.
+
+	A message is delivered to the component whose id is its `target_uuid`. Like over the network,
+	the receiver gets a copy, on another thread than the sender's.
+	"""
+	def __init__(self, logger: HoornLogger, module_separator: str = "Common.LocalMiddleman"):
+		self._logger = logger
+		self._module_separator = module_separator
+
+		self._lock: threading.Lock = threading.Lock()
+		self._inboxes: Dict[str, _Inbox] = {}
+
+	def connect(self, component_id: str, message_received_listener: Callable[[MessageModel], None]) -> LocalConnection:
+		"""Connects a component.
+
+		Args:
+			component_id: The id other components address the component by.
+			message_received_listener: Receives every message sent to the component.
+
+		Returns:
+			The connection to send messages through.
+		"""
+		with self._lock:
+			if component_id in self._inboxes:
+				message: str = f"A component with id '{component_id}' is already connected."
+				self._logger.error(message, separator=self._module_separator)
+				raise ValueError(message)
+
+			self._inboxes[component_id] = _Inbox(component_id, message_received_listener)
+
+		self._logger.debug(f"Connected component '{component_id}'.", separator=self._module_separator)
+		return LocalConnection(self, component_id)
+
+	def disconnect(self, component_id: str) -> None:
+		with self._lock:
+			inbox: Optional[_Inbox] = self._inboxes.pop(component_id, None)
+
+		if inbox is not None:
+			inbox.queue.put(None)
+			self._logger.debug(f"Disconnected component '{component_id}'.", separator=self._module_separator)
+
+	def route(self, message: MessageModel) -> None:
+		with self._lock:
+			inbox: Optional[_Inbox] = self._inboxes.get(message.target_uuid)
+
+		if inbox is None:
+			self._logger.warning(f"Dropping '{message.payload.action}' for unknown component '{message.target_uuid}'.", separator=self._module_separator)
+			return
+
+		inbox.queue.put(message.model_copy(deep=True))
+
+	def shutdown(self) -> None:
+		"""Disconnects every component."""
+		with self._lock:
+			component_ids = list(self._inboxes)
+
+		for component_id in component_ids:
+			self.disconnect(component_id)
@@ -0,0 +1,111 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Union
+
+from .argument_model import ArgumentModel
+from .framing_mode import FramingMode
+from .message_model import MessageModel
+from .message_payload import MessagePayload
+from ..logging import HoornLogger
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+def _import_msgpack():
+	try:
+		import msgpack
+	except ImportError as e:
+		raise ImportError("msgpack is required for the MessagePack codec: pip install msgpack") from e
+	return msgpack
+
+
+class MessageCodec(ABC):
+	"""
+	Turns messages into bytes and back. Framing is applied separately, so any codec works with any framing mode,
+	except that binary codecs need :attr:`FramingMode.LENGTH_PREFIXED`: their output may contain the end-of-message token.
+
+	Both ends of a connection must use the same codec.
+	"""
+	is_binary: bool = False
+
+	def __init__(self, trusted: bool = False):
+		"""
+		Args:
+			trusted: Whether to skip validating received messages. Only for peers known to send well-formed messages;
+				it saves building and checking a model for every argument.
+		"""
+		self._trusted: bool = trusted
+
+	@abstractmethod
+	def encode(self, message: Union[MessageModel, Dict[str, Any]]) -> bytes:
+		"""Encodes a message, or a message in dictionary form such as the keep-alive template."""
+
+	@abstractmethod
+	def _load(self, data: BytesLike) -> Dict[str, Any]:
+		"""Parses received bytes into the dictionary form of a message."""
+
+	def decode(self, data: BytesLike) -> MessageModel:
+		"""Decodes a message received from the middleman, which names the target `target_id`."""
+		json_data = self._load(data)
+		message_payload = json_data["payload"]
+
+		if self._trusted:
+			return MessageModel.model_construct(
+				target_uuid=json_data["target_id"],
+				payload=MessagePayload.model_construct(
+					action=message_payload["action"],
+					args=[ArgumentModel.model_construct(type=arg["type"], value=arg["value"]) for arg in message_payload["args"]],
+				),
+			)
+
+		return MessageModel(
+			target_uuid=json_data["target_id"],
+			payload=MessagePayload(
+				action=message_payload["action"],
+				args=[ArgumentModel(type=arg["type"], value=arg["value"]) for arg in message_payload["args"]],
+			),
+		)
+
+
+class JsonMessageCodec(MessageCodec):
+	"""UTF-8 encoded JSON, the format the middleman has always used."""
+
+	def encode(self, message: Union[MessageModel, Dict[str, Any]]) -> bytes:
+		if isinstance(message, MessageModel):
+			# Serialized by pydantic directly, without building an intermediate dictionary.
+			return message.model_dump_json().encode('utf-8')
+		return json.dumps(message).encode('utf-8')
+
+	def _load(self, data: BytesLike) -> Dict[str, Any]:
+		if isinstance(data, memoryview):
+			data = str(data, 'utf-8')
+		return json.loads(data)
+
+
+class MsgPackMessageCodec(MessageCodec):
+	"""MessagePack: the same structure as the JSON codec, but binary and more compact. Requires the `msgpack` package."""
+	is_binary: bool = True
+
+	def __init__(self, trusted: bool = False):
+		super().__init__(trusted)
+		self._msgpack = _import_msgpack()
+
+	def encode(self, message: Union[MessageModel, Dict[str, Any]]) -> bytes:
+		if isinstance(message, MessageModel):
+			message = message.model_dump()
+		return self._msgpack.packb(message)
+
+	def _load(self, data: BytesLike) -> Dict[str, Any]:
+		return self._msgpack.unpackb(data)
+
+
+def resolve_codec(logger: HoornLogger, module_separator: str, codec: Optional[MessageCodec], framing_mode: FramingMode) -> MessageCodec:
+	"""Returns the codec for a connection, JSON by default, after checking it works with the framing mode."""
+	if codec is None:
+		return JsonMessageCodec()
+
+	if codec.is_binary and framing_mode != FramingMode.LENGTH_PREFIXED:
+		message: str = f"{type(codec).__name__} produces binary data, which requires length-prefixed framing."
+		logger.error(message, separator=module_separator)
+		raise ValueError(message)
+	return codec
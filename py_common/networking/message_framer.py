@@ -0,0 +1,54 @@
+from typing import List, Union
+
+
+class MessageFramer:
+	"""
+	Splits a stream of bytes into messages ending in an end-of-message token.
+
+	Received bytes are appended to a single buffer, and the token is only searched in bytes not scanned before,
+	so every byte is copied and scanned about once, however many reads a message spans.
+	"""
+	def __init__(self, end_of_message_token: str = "<eom>"):
+		self._token: bytes = end_of_message_token.encode()
+		self._buffer: bytearray = bytearray()
+		# Where the next search starts; the token cannot end before it.
+		self._scan_from: int = 0
+
+	@property
+	def num_buffered_bytes(self) -> int:
+		"""The bytes of the incomplete message received so far."""
+		return len(self._buffer)
+
+	def feed(self, data: Union[bytes, bytearray, memoryview]) -> List[bytes]:
+		"""Adds received bytes.
+
+		Args:
+			data: The bytes, in the order they were received.
+
+		Returns:
+			Every message completed by them, without the token, oldest first.
+		"""
+		self._buffer += data
+
+		messages: List[bytes] = []
+		start: int = 0
+		while True:
+			end: int = self._buffer.find(self._token, self._scan_from)
+			if end == -1:
+				break
+
+			messages.append(bytes(self._buffer[start:end]))
+			start = end + len(self._token)
+			self._scan_from = start
+
+		if start > 0:
+			del self._buffer[:start]
+
+		# A token may be split over two reads; only its last len(token) - 1 bytes can be the start of one.
+		self._scan_from = max(0, len(self._buffer) - len(self._token) + 1)
+		return messages
+
+	def reset(self) -> None:
+		"""Discards the incomplete message, for example after reconnecting."""
+		self._buffer.clear()
+		self._scan_from = 0
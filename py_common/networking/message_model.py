@@ -11,5 +11,5 @@ class MessageModel(pydantic.BaseModel):
 	payload: MessagePayload
 	sender_id: Optional[str] = Field("")
 	target_uuid: Optional[str] = Field("")
-	unique_id: Optional[str] = Field(str(uuid4()))
-	time_sent: Optional[str] = Field(str(datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%fZ")[:-3] + "Z" ))
+	unique_id: Optional[str] = Field(default_factory=lambda: str(uuid4()))
+	time_sent: Optional[str] = Field(default_factory=lambda: str(datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%fZ")[:-3] + "Z" ))
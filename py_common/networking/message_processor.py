@@ -1,33 +1,158 @@
 import pprint
-from typing import Callable
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Union
 
+from .connection_manager import ConnectionManager
 from .connector import Connector
 from .message_model import MessageModel
+from .message_processor_statistics import MessageProcessorStatistics
+from .timer_wheel import TimerHandle, TimerWheel
 from ..logging import HoornLogger
 
+
+class _PendingRequest:
+	__slots__ = ("future", "callback", "timer")
+
+	def __init__(self, future: Future, callback: Optional[Callable[[MessageModel], None]]):
+		self.future: Future = future
+		self.callback: Optional[Callable[[MessageModel], None]] = callback
+		self.timer: Optional[TimerHandle] = None
+
+
 class MessageProcessor:
 	"""
 	Processes server requests.
+
+	Pending requests are looked up by id in constant time, from whichever thread the responses arrive on.
+	Requests that get no response within their timeout fail with a `TimeoutError` and are forgotten.
 	"""
-	def __init__(self, logger: HoornLogger, connector: Connector, module_separator = "Common.MessageProcessor"):
+	def __init__(self,
+				 logger: HoornLogger,
+				 connector: Union[Connector, ConnectionManager],
+				 module_separator = "Common.MessageProcessor",
+				 default_timeout_seconds: Optional[float] = None):
+		"""
+		Args:
+			default_timeout_seconds: How long requests wait for their response, unless given per request.
+				None waits indefinitely, like requests always did.
+		"""
 		self._module_separator: str = module_separator
 		self._logger: HoornLogger = logger
-		self._connector: Connector = connector
+		self._connector: Union[Connector, ConnectionManager] = connector
+		self._default_timeout_seconds: Optional[float] = default_timeout_seconds
+
+		self._lock: threading.Lock = threading.Lock()
+		self._pending: Dict[str, _PendingRequest] = {}
+		# Started by the first request with a timeout, so processors without timeouts run no timer thread.
+		self._timer_wheel: Optional[TimerWheel] = None
+
+		self._num_completed: int = 0
+		self._num_expired: int = 0
+		self._num_unmatched: int = 0
+
+	def send_request(self,
+					 message: MessageModel,
+					 on_response_callback: Optional[Callable[[MessageModel], None]] = None,
+					 timeout_seconds: Optional[float] = None,
+					 connector: Optional[Connector] = None) -> Future:
+		"""Sends a request.
+
+		Args:
+			message: The request; responses refer to its `unique_id`.
+			on_response_callback: Optionally called with the response, on the connector's processing thread.
+			timeout_seconds: How long to wait for the response. Defaults to the processor's default timeout.
+			connector: Sends the request over this connector instead of the processor's own,
+				for requests that belong to one connection of a :class:`ConnectionManager`, such as registrations.
+
+		Returns:
+			A future for the response. It fails with a `TimeoutError` if the response does not arrive in time.
+
+		Raises:
+			ValueError: If a request with the same `unique_id` is still waiting for its response.
+		"""
+		request = _PendingRequest(Future(), on_response_callback)
+		request.future.set_running_or_notify_cancel()
+		timeout: Optional[float] = timeout_seconds if timeout_seconds is not None else self._default_timeout_seconds
 
-		self._message_handlers = {}
+		with self._lock:
+			if message.unique_id in self._pending:
+				# Its response could not be told apart from the earlier request's.
+				error: str = f"A request with id {message.unique_id} is already waiting for its response."
+				self._logger.error(error, separator=self._module_separator)
+				raise ValueError(error)
+			self._pending[message.unique_id] = request
+			if timeout is not None:
+				if self._timer_wheel is None:
+					self._timer_wheel = TimerWheel(name=f"{self._module_separator}-timeouts")
+				request.timer = self._timer_wheel.schedule(timeout, lambda: self._expire(message.unique_id, timeout))
 
-	def send_request(self, message: MessageModel, on_response_callback: Callable[[MessageModel], None]):
-		self._message_handlers[message.unique_id] = on_response_callback
-		self._connector.send_request(message)
+		try:
+			(connector or self._connector).send_request(message)
+		except BaseException:
+			self._forget(message.unique_id)
+			raise
+
+		return request.future
+
+	def _forget(self, unique_id: str) -> Optional[_PendingRequest]:
+		with self._lock:
+			request: Optional[_PendingRequest] = self._pending.pop(unique_id, None)
+			timer_wheel: Optional[TimerWheel] = self._timer_wheel
+		if request is not None and request.timer is not None and timer_wheel is not None:
+			timer_wheel.cancel(request.timer)
+		return request
+
+	def _expire(self, unique_id: str, timeout: float) -> None:
+		with self._lock:
+			request: Optional[_PendingRequest] = self._pending.pop(unique_id, None)
+			if request is None:
+				return
+			self._num_expired += 1
+
+		self._logger.warning(f"No response to request {unique_id} within {timeout} seconds.", separator=self._module_separator)
+		request.future.set_exception(TimeoutError(f"No response to request {unique_id} within {timeout} seconds."))
 
 	def process_message(self, msg: MessageModel) -> None:
 		self._logger.trace(f"Processing message: {msg.unique_id}", separator=self._module_separator)
 
-		for unique_id, message_handler in self._message_handlers.items():
-			if unique_id == msg.target_uuid:
-				self._logger.trace(f"Found response handler for message: {message_handler}", separator=self._module_separator)
-				message_handler(msg)
-				del self._message_handlers[unique_id]
-				return
+		request: Optional[_PendingRequest] = self._forget(msg.target_uuid)
+		if request is None:
+			with self._lock:
+				self._num_unmatched += 1
+			self._logger.warning(f"Received message from server with no associated request:\n{pprint.pformat(msg.model_dump())}", separator=self._module_separator)
+			return
+
+		with self._lock:
+			self._num_completed += 1
+
+		if request.callback is not None:
+			self._logger.trace(f"Found response handler for message: {request.callback}", separator=self._module_separator)
+			try:
+				request.callback(msg)
+			except Exception as e:
+				self._logger.error(f"Response handler for {msg.target_uuid} failed: {e!r}", separator=self._module_separator)
+		request.future.set_result(msg)
+
+	def get_statistics(self) -> MessageProcessorStatistics:
+		with self._lock:
+			return MessageProcessorStatistics(
+				in_flight=len(self._pending),
+				completed=self._num_completed,
+				expired=self._num_expired,
+				unmatched=self._num_unmatched,
+			)
+
+	def shutdown(self) -> None:
+		"""Stops the timeout timers and fails the requests still waiting for a response."""
+		with self._lock:
+			timer_wheel: Optional[TimerWheel] = self._timer_wheel
+			self._timer_wheel = None
+			pending = list(self._pending.values())
+			self._pending.clear()
+
+		if timer_wheel is not None:
+			timer_wheel.shutdown()
 
-		self._logger.warning(f"Received message from server with no associated request:\n{pprint.pformat(msg.model_dump())}", separator=self._module_separator)
+		for request in pending:
+			request.future.set_exception(ConnectionError("The message processor was shut down before the response arrived."))
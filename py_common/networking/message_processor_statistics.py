@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class MessageProcessorStatistics:
+	"""A snapshot of the requests of a :class:`MessageProcessor`."""
+	in_flight: int
+	"""Requests waiting for their response."""
+	completed: int
+	"""Requests that received their response."""
+	expired: int
+	"""Requests whose response did not arrive within their timeout."""
+	unmatched: int
+	"""Received messages that answered no pending request, including late responses to expired ones."""
@@ -0,0 +1,89 @@
+import itertools
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+
+class TimerHandle:
+	"""Identifies a scheduled timer, to cancel it."""
+	__slots__ = ("timer_id", "slot")
+
+	def __init__(self, timer_id: int, slot: int):
+		self.timer_id: int = timer_id
+		self.slot: int = slot
+
+
+class TimerWheel:
+	"""
+	Fires callbacks after a delay, with scheduling and cancelling in constant time however many timers are pending.
+
+	Timers are hashed into `num_slots` slots by their expiry tick; a background thread advances one slot per tick and fires
+	the timers that are due. Timers fire up to one tick late, which suits timeouts rather than precise scheduling.
+	"""
+	def __init__(self, tick_seconds: float = 0.1, num_slots: int = 512, name: str = "TimerWheel"):
+		"""
+		Args:
+			tick_seconds: The resolution of the timers.
+			num_slots: The number of slots; timers further away than one revolution wait extra rounds.
+		"""
+		self._tick_seconds: float = tick_seconds
+		self._num_slots: int = num_slots
+
+		self._lock: threading.Lock = threading.Lock()
+		# Per slot: timer id -> (remaining rounds, callback).
+		self._slots: List[Dict[int, Tuple[int, Callable[[], None]]]] = [{} for _ in range(num_slots)]
+		self._current_slot: int = 0
+		self._timer_ids = itertools.count()
+
+		self._shutdown_signal: threading.Event = threading.Event()
+		self._thread: threading.Thread = threading.Thread(target=self._run, name=name, daemon=True)
+		self._thread.start()
+
+	def schedule(self, delay_seconds: float, callback: Callable[[], None]) -> TimerHandle:
+		"""Calls `callback` on the wheel's thread once `delay_seconds` have passed, unless cancelled first."""
+		ticks: int = max(1, int(delay_seconds / self._tick_seconds + 0.999999))
+
+		with self._lock:
+			slot: int = (self._current_slot + ticks) % self._num_slots
+			timer_id: int = next(self._timer_ids)
+			self._slots[slot][timer_id] = ((ticks - 1) // self._num_slots, callback)
+
+		return TimerHandle(timer_id, slot)
+
+	def cancel(self, handle: TimerHandle) -> bool:
+		"""Returns: Whether the timer was still pending."""
+		with self._lock:
+			return self._slots[handle.slot].pop(handle.timer_id, None) is not None
+
+	def _advance(self) -> List[Callable[[], None]]:
+		with self._lock:
+			self._current_slot = (self._current_slot + 1) % self._num_slots
+			slot: Dict[int, Tuple[int, Callable[[], None]]] = self._slots[self._current_slot]
+
+			due: List[Callable[[], None]] = []
+			for timer_id, (rounds, callback) in list(slot.items()):
+				if rounds == 0:
+					due.append(callback)
+					del slot[timer_id]
+				else:
+					slot[timer_id] = (rounds - 1, callback)
+			return due
+
+	def _run(self) -> None:
+		next_tick: float = time.monotonic() + self._tick_seconds
+
+		while not self._shutdown_signal.wait(max(0.0, next_tick - time.monotonic())):
+			next_tick += self._tick_seconds
+			for callback in self._advance():
+				callback()
+
+	def shutdown(self) -> None:
+		"""Stops the wheel. Pending timers never fire."""
+		self._shutdown_signal.set()
+		if self._thread is not threading.current_thread():
+			self._thread.join()
+
+	@property
+	def num_pending(self) -> int:
+		with self._lock:
+			return sum(len(slot) for slot in self._slots)
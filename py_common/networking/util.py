@@ -1,9 +1,49 @@
 import json
+from datetime import datetime
+from pathlib import Path
+from typing import Union
+from uuid import uuid4
 
+from .framing_mode import FramingMode
+from .length_prefixed_framer import LENGTH_HEADER, LengthPrefixedFramer
+from .message_framer import MessageFramer
 
-def encode_message_to_bytes(message_json: dict, end_of_message_token: str = "<eom>") -> bytes:
-    message = message_json.copy()
-    message = json.dumps(message)
-    message += end_of_message_token
-    byte_buffer = bytes(message, encoding='utf-8')
-    return byte_buffer
+
+def frame_message(encoded_message: bytes,
+                  end_of_message_token: str = "<eom>",
+                  framing_mode: FramingMode = FramingMode.END_OF_MESSAGE_TOKEN) -> bytes:
+    """Delimits an encoded message for sending, according to the framing mode."""
+    if framing_mode == FramingMode.LENGTH_PREFIXED:
+        return LENGTH_HEADER.pack(len(encoded_message)) + encoded_message
+    return encoded_message + end_of_message_token.encode('utf-8')
+
+
+def encode_message_to_bytes(message_json: dict,
+                            end_of_message_token: str = "<eom>",
+                            framing_mode: FramingMode = FramingMode.END_OF_MESSAGE_TOKEN) -> bytes:
+    return frame_message(json.dumps(message_json).encode('utf-8'), end_of_message_token, framing_mode)
+
+
+def create_framer(framing_mode: FramingMode, end_of_message_token: str = "<eom>") -> Union[MessageFramer, LengthPrefixedFramer]:
+    if framing_mode == FramingMode.LENGTH_PREFIXED:
+        return LengthPrefixedFramer()
+    return MessageFramer(end_of_message_token)
+
+
+def load_keep_alive_message() -> dict:
+    script_path: Path = Path(__file__).parent.parent.joinpath('keep_alive.json')
+
+    with open(script_path, 'r') as f:
+        return json.load(f)
+
+
+def build_unregister_message(component_id: str) -> dict:
+    script_path: Path = Path(__file__).parent.parent.joinpath('unregister.json')
+
+    with open(script_path, 'r') as f:
+        unregister_json = json.load(f)
+
+    unregister_json["sender_id"] = component_id
+    unregister_json["unique_id"] = str(uuid4())
+    unregister_json["time_sent"] = str(datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%fZ")[:-3] + "Z" )
+    return unregister_json
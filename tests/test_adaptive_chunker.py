@@ -0,0 +1,45 @@
+import pytest
+
+from py_common.multithreading.adaptive_chunker import AdaptiveChunker
+
+
+def _run(chunker: AdaptiveChunker, seconds_per_item: float, num_chunks: int, remaining_items=None, num_workers: int = 4):
+    sizes = []
+    for _ in range(num_chunks):
+        size = chunker.next_chunk_size(remaining_items, num_workers)
+        chunker.record(size, size * seconds_per_item)
+        sizes.append(size)
+    return sizes
+
+
+def test_converges_on_the_target_duration_growing_at_most_by_the_growth_factor():
+    chunker = AdaptiveChunker(target_batch_seconds=0.1, max_growth_factor=4.0)
+    sizes = _run(chunker, seconds_per_item=0.0001, num_chunks=8)
+
+    assert sizes[:6] == [1, 4, 16, 64, 256, 1000]
+    assert sizes[-1] == 1000
+    assert all(later <= 4 * earlier for earlier, later in zip(sizes, sizes[1:]))
+
+
+def test_shrinks_when_items_get_more_expensive():
+    chunker = AdaptiveChunker(target_batch_seconds=0.1)
+    _run(chunker, seconds_per_item=0.0001, num_chunks=8)
+    assert _run(chunker, seconds_per_item=0.01, num_chunks=20)[-1] == 10
+
+
+def test_chunks_shrink_towards_the_end_of_a_known_input():
+    chunker = AdaptiveChunker(target_batch_seconds=0.1, initial_chunk_size=1000)
+    assert chunker.next_chunk_size(remaining_items=80, num_workers=4) == 10
+    assert chunker.next_chunk_size(remaining_items=3, num_workers=4) == 1
+
+
+def test_sizes_stay_within_the_bounds():
+    chunker = AdaptiveChunker(target_batch_seconds=1.0, min_chunk_size=5, max_chunk_size=50)
+    assert _run(chunker, seconds_per_item=0.0, num_chunks=5)[-1] == 50
+    assert _run(chunker, seconds_per_item=10.0, num_chunks=5)[-1] == 5
+
+
+@pytest.mark.parametrize("kwargs", [{"target_batch_seconds": 0}, {"target_batch_seconds": 1, "min_chunk_size": 0}, {"target_batch_seconds": 1, "min_chunk_size": 10, "max_chunk_size": 5}])
+def test_rejects_invalid_settings(kwargs):
+    with pytest.raises(ValueError):
+        AdaptiveChunker(**kwargs)
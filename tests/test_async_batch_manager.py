@@ -0,0 +1,24 @@
+import asyncio
+
+from py_common.logging import HoornLogger, LogType
+from py_common.logging.output.default_hoorn_log_output import DefaultHoornLogOutput
+from py_common.multithreading.async_batch_manager import AsyncBatchManager, AsyncBatchManagerConfig
+from py_common.multithreading.cancellation_token import CancellationToken
+
+
+def test_cancelled_run_counts_the_batches_it_did_not_start():
+    token = CancellationToken()
+
+    async def work(batch, context):
+        token.cancel()
+        await asyncio.sleep(0.01)
+        return batch
+
+    logger = HoornLogger([DefaultHoornLogOutput()], min_level=LogType.CRITICAL)
+    manager = AsyncBatchManager(logger, AsyncBatchManagerConfig(max_concurrency=1, worker_template=work, worker_name="Test"))
+
+    summary = asyncio.run(manager.work_batches(range(10), None, cancellation_token=token))
+    assert summary.cancelled
+    assert summary.num_succeeded == 1
+    # The second batch was already waiting for the first; the others were never read.
+    assert summary.num_not_started == 1
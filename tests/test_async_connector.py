@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from py_common.logging import HoornLogger, LogType
+from py_common.logging.output.default_hoorn_log_output import DefaultHoornLogOutput
+from py_common.networking.async_connector import AsyncConnector
+from py_common.networking.async_message_processor import AsyncMessageProcessor
+from py_common.networking.message_model import MessageModel
+from py_common.networking.message_payload import MessagePayload
+
+
+def test_lost_connection_fails_pending_requests():
+    async def scenario():
+        received = asyncio.Event()
+        server_writers = []
+
+        async def serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            server_writers.append(writer)
+            await reader.read(1)
+            received.set()
+
+        server = await asyncio.start_server(serve, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+
+        logger = HoornLogger([DefaultHoornLogOutput()], min_level=LogType.CRITICAL)
+        lost = []
+        processor = None
+        connector = AsyncConnector(logger, lambda message: processor.process_message(message),
+                                   connection_lost_listener=lambda: (lost.append(True), processor.process_connection_lost()))
+        processor = AsyncMessageProcessor(logger, connector)
+        try:
+            assert await connector.connect_to_remote("127.0.0.1", port)
+
+            request = asyncio.create_task(processor.request(MessageModel(payload=MessagePayload(action="request", args=[])), timeout=5))
+            await asyncio.wait_for(received.wait(), 1)
+            server_writers[0].close()
+
+            with pytest.raises(ConnectionError):
+                await request
+            assert lost == [True]
+            assert not connector.is_connected
+            assert processor.num_pending == 0
+            await asyncio.sleep(0)
+            assert connector._keep_alive_task.done()
+
+            with pytest.raises(ConnectionError):
+                await connector.send_request(MessageModel(payload=MessagePayload(action="request", args=[])))
+        finally:
+            await connector.shutdown()
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(scenario())
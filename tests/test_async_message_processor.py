@@ -0,0 +1,40 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from py_common.logging import HoornLogger, LogType
+from py_common.logging.output.default_hoorn_log_output import DefaultHoornLogOutput
+from py_common.networking.async_message_processor import AsyncMessageProcessor
+from py_common.networking.message_model import MessageModel
+from py_common.networking.message_payload import MessagePayload
+
+
+class _RecordingConnector:
+    def __init__(self):
+        self.sent: List[MessageModel] = []
+
+    async def send_request(self, message: MessageModel) -> None:
+        self.sent.append(message)
+
+
+def test_duplicate_in_flight_id_is_rejected():
+    async def scenario():
+        logger = HoornLogger([DefaultHoornLogOutput()], min_level=LogType.CRITICAL)
+        connector = _RecordingConnector()
+        processor = AsyncMessageProcessor(logger, connector)
+
+        first = MessageModel(payload=MessagePayload(action="request", args=[]))
+        request = asyncio.create_task(processor.request(first, timeout=5))
+        await asyncio.sleep(0)
+
+        with pytest.raises(ValueError):
+            await processor.request(first.model_copy(), timeout=5)
+        assert connector.sent == [first]
+        assert processor.num_pending == 1
+
+        processor.process_message(MessageModel(payload=MessagePayload(action="response", args=[]), target_uuid=first.unique_id))
+        assert (await request).payload.action == "response"
+        assert processor.num_pending == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,72 @@
+import socket
+import threading
+
+import pytest
+
+from py_common.logging import HoornLogger, LogType
+from py_common.logging.output.default_hoorn_log_output import DefaultHoornLogOutput
+from py_common.networking.coalescing_writer import CoalescingWriter
+
+
+def _logger() -> HoornLogger:
+    return HoornLogger([DefaultHoornLogOutput()], min_level=LogType.CRITICAL)
+
+
+def test_senders_block_while_the_queue_is_full():
+    local, remote = socket.socketpair()
+    # A receiver that does not read: the socket buffers fill up and the queue with them.
+    local.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+    writer = CoalescingWriter(_logger(), local, coalesce_window_seconds=0, max_pending_bytes=64 * 1024)
+    sent = threading.Event()
+
+    def flood() -> None:
+        try:
+            for _ in range(1000):
+                writer.send(b"x" * 4096)
+        except ConnectionError:
+            pass
+        sent.set()
+
+    thread = threading.Thread(target=flood, daemon=True)
+    thread.start()
+    assert not sent.wait(0.5)
+    assert writer.num_pending * 4096 <= 64 * 1024
+
+    # Draining the socket lets the sender finish.
+    total = 0
+    while total < 1000 * 4096:
+        total += len(remote.recv(1 << 20))
+    assert sent.wait(5)
+    writer.close(timeout=5)
+    local.close()
+    remote.close()
+
+
+def test_a_blocked_sender_fails_once_the_writer_closes():
+    local, remote = socket.socketpair()
+    local.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+    writer = CoalescingWriter(_logger(), local, coalesce_window_seconds=0, max_pending_bytes=8192)
+    errors = []
+
+    def flood() -> None:
+        try:
+            while True:
+                writer.send(b"x" * 4096)
+        except ConnectionError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=flood, daemon=True)
+    thread.start()
+    thread.join(0.3)
+    assert thread.is_alive()
+
+    # Unblocks the writer thread as well, whose write fails.
+    local.shutdown(socket.SHUT_RDWR)
+    writer.close(timeout=5)
+    thread.join(5)
+    assert not thread.is_alive()
+    assert len(errors) == 1
+    with pytest.raises(ConnectionError):
+        writer.send(b"x")
+    local.close()
+    remote.close()
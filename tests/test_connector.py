@@ -0,0 +1,38 @@
+import socket
+import threading
+import time
+
+from py_common.logging import HoornLogger, LogType
+from py_common.logging.output.default_hoorn_log_output import DefaultHoornLogOutput
+from py_common.networking.connector import Connector
+from py_common.networking.framing_mode import FramingMode
+from py_common.networking.util import encode_message_to_bytes
+
+
+def test_length_prefixed_messages_survive_receive_buffer_reuse():
+    logger = HoornLogger([DefaultHoornLogOutput()], min_level=LogType.CRITICAL)
+    received = []
+
+    def slow_listener(message) -> None:
+        # Lags behind the reading thread, which keeps reusing its small receive buffer meanwhile.
+        time.sleep(0.005)
+        received.append(message.payload.action)
+
+    connector = Connector(logger, slow_listener, framing_mode=FramingMode.LENGTH_PREFIXED, receive_buffer_size=256)
+    remote, local = socket.socketpair()
+    shutdown_signal = threading.Event()
+    reading_thread = threading.Thread(target=connector.read_data_loop, args=(local, "test", 0, shutdown_signal))
+    reading_thread.start()
+    try:
+        actions = [f"action-{i}" for i in range(50)]
+        remote.sendall(b"".join(encode_message_to_bytes({"payload": {"action": action, "args": []}, "target_id": ""}, framing_mode=FramingMode.LENGTH_PREFIXED) for action in actions))
+
+        deadline = time.monotonic() + 5
+        while len(received) < len(actions) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert received == actions
+        assert connector.get_statistics().decode_errors == 0
+    finally:
+        remote.close()
+        reading_thread.join(5)
+        local.close()
@@ -0,0 +1,48 @@
+import threading
+import time
+
+from py_common.logging import HoornLogger, LogType
+from py_common.logging.output.default_hoorn_log_output import DefaultHoornLogOutput
+from py_common.multithreading.distributed_coordinator import DistributedCoordinator
+from py_common.multithreading.distributed_worker import DistributedWorker
+from py_common.multithreading.execution_mode import ExecutionMode
+from py_common.multithreading.thread_manager import ThreadManager, ThreadManagerConfig
+from py_common.networking.local_middleman import LocalMiddleman
+
+
+def _slow_work(batch: int, context: int) -> int:
+    time.sleep(0.2)
+    return batch + context
+
+
+def test_shutdown_cancels_queued_distributed_submissions():
+    logger = HoornLogger([DefaultHoornLogOutput()], min_level=LogType.ERROR)
+    middleman = LocalMiddleman(logger)
+    coordinator = DistributedCoordinator(logger, "coordinator")
+    coordinator.attach(middleman.connect("coordinator", coordinator.handle_message))
+
+    worker = DistributedWorker(logger, "coordinator", worker_id="worker", capacity=1, heartbeat_interval_seconds=0.1, use_processes=False)
+    worker.start(middleman.connect(worker.worker_id, worker.handle_message))
+    assert coordinator.wait_for_workers(1, timeout=5)
+
+    manager = ThreadManager(logger, ThreadManagerConfig(
+        num_threads=1,
+        worker_template=_slow_work,
+        worker_name="Distributed",
+        execution_mode=ExecutionMode.DISTRIBUTED,
+        distributed_coordinator=coordinator,
+    ))
+    futures = [manager.submit(i, 0) for i in range(5)]
+
+    # With a single slot, all but the first submission are still queued on the coordinator.
+    shutdown = threading.Thread(target=manager.shutdown, daemon=True)
+    shutdown.start()
+    shutdown.join(timeout=10)
+    try:
+        assert not shutdown.is_alive(), "ThreadManager.shutdown deadlocked"
+        assert any(future.cancelled() for future in futures)
+        assert all(future.done() for future in futures)
+    finally:
+        worker.stop()
+        coordinator.shutdown()
+        middleman.shutdown()
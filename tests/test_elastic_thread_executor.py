@@ -0,0 +1,44 @@
+import threading
+import time
+
+from py_common.logging import HoornLogger, LogType
+from py_common.logging.output.default_hoorn_log_output import DefaultHoornLogOutput
+from py_common.multithreading.elastic_thread_executor import ElasticThreadExecutor
+
+
+def _executor(**kwargs) -> ElasticThreadExecutor:
+    logger = HoornLogger([DefaultHoornLogOutput()], min_level=LogType.ERROR)
+    return ElasticThreadExecutor(logger, "Test", **kwargs)
+
+
+def test_threads_grow_under_load_and_stop_when_idle():
+    exited = []
+    executor = _executor(min_threads=1, max_threads=8, idle_timeout_seconds=0.2, thread_exit_callback=lambda: exited.append(threading.current_thread().name))
+    try:
+        release = threading.Event()
+        futures = [executor.submit(release.wait) for _ in range(8)]
+        time.sleep(0.1)
+        assert executor.num_threads == 8
+
+        release.set()
+        assert all(future.result(timeout=1) for future in futures)
+        time.sleep(0.8)
+        assert executor.num_threads == 1
+        assert len(exited) == 7
+    finally:
+        executor.shutdown()
+    assert len(exited) == 8
+
+
+def test_shutdown_cancels_queued_tasks():
+    executor = _executor(min_threads=1, max_threads=1)
+    started = threading.Event()
+    release = threading.Event()
+    running = executor.submit(lambda: started.set() or release.wait())
+    queued = [executor.submit(time.sleep, 0) for _ in range(3)]
+    assert started.wait(timeout=1)
+
+    threading.Timer(0.1, release.set).start()
+    executor.shutdown(cancel_futures=True)
+    assert running.result()
+    assert all(future.cancelled() for future in queued)
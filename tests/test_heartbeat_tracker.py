@@ -0,0 +1,24 @@
+from py_common.networking.heartbeat_tracker import HeartbeatTracker
+from py_common.networking.util import load_keep_alive_message
+
+
+def test_heartbeats_are_the_keep_alive_message_by_default():
+    tracker = HeartbeatTracker()
+    assert tracker.create() == load_keep_alive_message()
+    assert tracker.create() == load_keep_alive_message()
+    assert tracker.snapshot()["heartbeats_sent"] == 2
+
+
+def test_measured_heartbeats_only_add_an_id_and_send_time():
+    tracker = HeartbeatTracker(measure_rtt=True)
+    first, second = tracker.create(), tracker.create()
+
+    template = load_keep_alive_message()
+    for heartbeat in (first, second):
+        assert {key: value for key, value in heartbeat.items() if key not in ("unique_id", "time_sent")} == template
+    assert first["unique_id"] != second["unique_id"]
+
+    assert tracker.acknowledge(first["unique_id"])
+    assert not tracker.acknowledge(first["unique_id"])
+    assert tracker.snapshot()["heartbeats_answered"] == 1
+    assert tracker.snapshot()["last_rtt_seconds"] is not None
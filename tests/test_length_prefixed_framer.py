@@ -0,0 +1,38 @@
+import pytest
+
+from py_common.networking.length_prefixed_framer import LENGTH_HEADER, LengthPrefixedFramer
+
+_MESSAGES = [b"first", b"", b"<eom>", b"x" * 1000, b"last"]
+_STREAM = b"".join(LENGTH_HEADER.pack(len(message)) + message for message in _MESSAGES)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 5, 7, 64, len(_STREAM)])
+def test_headers_and_messages_split_over_reads(chunk_size):
+    framer = LengthPrefixedFramer()
+    messages = []
+    for start in range(0, len(_STREAM), chunk_size):
+        # Copied right away, as the views are only valid until the next feed.
+        messages += [bytes(message) for message in framer.feed(_STREAM[start:start + chunk_size])]
+    assert messages == _MESSAGES
+    assert framer.num_buffered_bytes == 0
+
+
+def test_a_message_received_in_one_piece_is_not_copied():
+    data = bytearray(LENGTH_HEADER.pack(3) + b"abc")
+    message, = LengthPrefixedFramer().feed(data)
+    data[LENGTH_HEADER.size] = ord("z")
+    assert bytes(message) == b"zbc"
+
+
+def test_an_oversized_length_is_a_corrupt_stream():
+    framer = LengthPrefixedFramer(max_message_size=16)
+    assert framer.feed(LENGTH_HEADER.pack(16) + b"y" * 16) == [b"y" * 16]
+    with pytest.raises(ValueError):
+        framer.feed(LENGTH_HEADER.pack(17))
+
+
+def test_reset_discards_the_incomplete_message():
+    framer = LengthPrefixedFramer()
+    framer.feed(LENGTH_HEADER.pack(10) + b"stale")
+    framer.reset()
+    assert [bytes(message) for message in framer.feed(LENGTH_HEADER.pack(5) + b"fresh")] == [b"fresh"]
@@ -0,0 +1,34 @@
+import pytest
+
+from py_common.networking.message_framer import MessageFramer
+
+_MESSAGES = [b"first", b"", b"<eo", b"x" * 1000, b"last"]
+_STREAM = b"".join(message + b"<eom>" for message in _MESSAGES)
+
+
+def _feed_in_chunks(framer: MessageFramer, stream: bytes, chunk_size: int):
+    messages = []
+    for start in range(0, len(stream), chunk_size):
+        messages += framer.feed(stream[start:start + chunk_size])
+    return messages
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 5, 7, 64, len(_STREAM)])
+def test_messages_and_tokens_split_over_reads(chunk_size):
+    framer = MessageFramer()
+    assert _feed_in_chunks(framer, _STREAM, chunk_size) == _MESSAGES
+    assert framer.num_buffered_bytes == 0
+
+
+def test_one_read_delivers_every_complete_message_and_keeps_the_rest():
+    framer = MessageFramer()
+    assert framer.feed(b"a<eom>b<eom>c<e") == [b"a", b"b"]
+    assert framer.num_buffered_bytes == 3
+    assert framer.feed(memoryview(b"om>")) == [b"c"]
+
+
+def test_reset_discards_the_incomplete_message():
+    framer = MessageFramer()
+    framer.feed(b"stale<eo")
+    framer.reset()
+    assert framer.feed(b"m>fresh<eom>") == [b"m>fresh"]
@@ -0,0 +1,60 @@
+from typing import List
+
+import pytest
+
+from py_common.logging import HoornLogger, LogType
+from py_common.logging.output.default_hoorn_log_output import DefaultHoornLogOutput
+from py_common.networking.message_model import MessageModel
+from py_common.networking.message_payload import MessagePayload
+from py_common.networking.message_processor import MessageProcessor
+
+
+class _RecordingConnector:
+    def __init__(self):
+        self.sent: List[MessageModel] = []
+
+    def send_request(self, message: MessageModel) -> None:
+        self.sent.append(message)
+
+
+def _request() -> MessageModel:
+    return MessageModel(payload=MessagePayload(action="request", args=[]))
+
+
+def test_messages_get_distinct_ids():
+    assert _request().unique_id != _request().unique_id
+
+
+def test_duplicate_in_flight_id_is_rejected():
+    logger = HoornLogger([DefaultHoornLogOutput()], min_level=LogType.CRITICAL)
+    connector = _RecordingConnector()
+    processor = MessageProcessor(logger, connector, default_timeout_seconds=5)
+    try:
+        first = _request()
+        future = processor.send_request(first)
+
+        with pytest.raises(ValueError):
+            processor.send_request(first.model_copy())
+        assert connector.sent == [first]
+
+        processor.process_message(MessageModel(payload=MessagePayload(action="response", args=[]), target_uuid=first.unique_id))
+        assert future.result(timeout=1).payload.action == "response"
+        assert processor.get_statistics().in_flight == 0
+    finally:
+        processor.shutdown()
+
+
+def test_timer_thread_only_starts_with_the_first_timeout():
+    logger = HoornLogger([DefaultHoornLogOutput()], min_level=LogType.CRITICAL)
+    processor = MessageProcessor(logger, _RecordingConnector())
+    try:
+        waiting = processor.send_request(_request())
+        assert processor._timer_wheel is None
+
+        expiring = processor.send_request(_request(), timeout_seconds=0.1)
+        assert processor._timer_wheel is not None
+        assert isinstance(expiring.exception(timeout=2), TimeoutError)
+        assert not waiting.done()
+    finally:
+        processor.shutdown()
+    assert isinstance(waiting.exception(timeout=1), ConnectionError)
@@ -0,0 +1,62 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from py_common.logging import HoornLogger, LogType
+from py_common.logging.output.default_hoorn_log_output import DefaultHoornLogOutput
+from py_common.multithreading.priority_dispatcher import PriorityDispatcher
+from py_common.multithreading.task_priority import TaskPriority
+
+
+def _run_behind_a_blocker(submit_waiting, aging_seconds: float = 5.0):
+    """Occupies the only slot, lets `submit_waiting` queue work, and returns the order in which that work started."""
+    logger = HoornLogger([DefaultHoornLogOutput()], min_level=LogType.CRITICAL)
+    started = []
+    release = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        dispatcher = PriorityDispatcher(logger, "Test", executor, capacity=1, aging_seconds=aging_seconds)
+        blocker = dispatcher.submit(release.wait)
+
+        futures = submit_waiting(dispatcher, started.append)
+        release.set()
+        blocker.result(timeout=5)
+        for future in futures:
+            future.result(timeout=5)
+    return started
+
+
+def test_orders_by_class_then_deadline_then_submission():
+    def submit_waiting(dispatcher, record):
+        return [
+            dispatcher.submit(record, "bulk", priority=TaskPriority.BULK),
+            dispatcher.submit(record, "normal", priority=TaskPriority.NORMAL),
+            dispatcher.submit(record, "normal, later deadline", priority=TaskPriority.NORMAL, deadline_seconds=10),
+            dispatcher.submit(record, "normal, deadline", priority=TaskPriority.NORMAL, deadline_seconds=1),
+            dispatcher.submit(record, "interactive", priority=TaskPriority.INTERACTIVE),
+            dispatcher.submit(record, "normal, second", priority=TaskPriority.NORMAL),
+        ]
+
+    assert _run_behind_a_blocker(submit_waiting) == [
+        "interactive", "normal, deadline", "normal, later deadline", "normal", "normal, second", "bulk",
+    ]
+
+
+def test_waiting_work_is_promoted_so_it_cannot_starve():
+    def submit_waiting(dispatcher, record):
+        bulk = dispatcher.submit(record, "bulk", priority=TaskPriority.BULK)
+        # Three classes of aging: the bulk work now ranks above newly submitted interactive work.
+        time.sleep(0.35)
+        return [bulk, dispatcher.submit(record, "interactive", priority=TaskPriority.INTERACTIVE)]
+
+    assert _run_behind_a_blocker(submit_waiting, aging_seconds=0.1) == ["bulk", "interactive"]
+
+
+def test_cancel_pending_only_cancels_work_that_did_not_start():
+    def submit_waiting(dispatcher, record):
+        waiting = dispatcher.submit(record, "waiting")
+        dispatcher.cancel_pending()
+        assert waiting.cancelled()
+        assert dispatcher.num_pending == 0
+        return []
+
+    assert _run_behind_a_blocker(submit_waiting) == []
@@ -0,0 +1,88 @@
+import time
+from graphlib import CycleError
+
+import pytest
+
+from py_common.logging import HoornLogger, LogType
+from py_common.logging.output.default_hoorn_log_output import DefaultHoornLogOutput
+from py_common.multithreading.task_graph import TaskGraph
+from py_common.multithreading.task_graph_report import TaskStatus
+
+
+def _graph(num_threads: int = 4) -> TaskGraph:
+    return TaskGraph(HoornLogger([DefaultHoornLogOutput()], min_level=LogType.CRITICAL), num_threads)
+
+
+def _fail(inputs):
+    raise RuntimeError("broken")
+
+
+def test_dependencies_receive_the_results_they_need():
+    graph = _graph()
+    graph.add_task("load", lambda inputs: [1, 2, 3])
+    graph.add_task("double", lambda inputs: [2 * value for value in inputs["load"]], depends_on=["load"])
+    graph.add_task("total", lambda inputs: sum(inputs["load"]) + sum(inputs["double"]), depends_on=["load", "double"])
+
+    report = graph.run()
+    assert report.succeeded
+    assert report.results["total"] == 18
+
+
+def test_a_failure_skips_everything_downstream_but_not_independent_branches():
+    graph = _graph()
+    graph.add_task("root", lambda inputs: 1)
+    graph.add_task("broken", _fail, depends_on=["root"])
+    graph.add_task("child", lambda inputs: 2, depends_on=["broken"])
+    graph.add_task("grandchild", lambda inputs: 3, depends_on=["child", "root"])
+    graph.add_task("sibling", lambda inputs: inputs["root"] + 1, depends_on=["root"])
+
+    report = graph.run()
+    statuses = {name: outcome.status for name, outcome in report.outcomes.items()}
+    assert statuses == {
+        "root": TaskStatus.SUCCEEDED,
+        "broken": TaskStatus.FAILED,
+        "child": TaskStatus.SKIPPED,
+        "grandchild": TaskStatus.SKIPPED,
+        "sibling": TaskStatus.SUCCEEDED,
+    }
+    assert isinstance(report.outcomes["broken"].exception, RuntimeError)
+    assert report.results == {"root": 1, "sibling": 2}
+
+
+def test_tasks_start_as_soon_as_their_own_dependencies_finish():
+    graph = _graph()
+    graph.add_task("fast", lambda inputs: time.sleep(0.01))
+    graph.add_task("slow", lambda inputs: time.sleep(0.4))
+    graph.add_task("after_fast", lambda inputs: time.sleep(0.01), depends_on=["fast"])
+
+    report = graph.run()
+    assert report.outcomes["after_fast"].finished_at < report.outcomes["slow"].finished_at
+    assert report.critical_path == ["slow"]
+
+
+def test_critical_path_follows_the_longest_chain():
+    graph = _graph()
+    graph.add_task("a", lambda inputs: time.sleep(0.1))
+    graph.add_task("b", lambda inputs: time.sleep(0.1), depends_on=["a"])
+    graph.add_task("c", lambda inputs: time.sleep(0.05))
+
+    report = graph.run()
+    assert report.critical_path == ["a", "b"]
+    assert report.critical_path_seconds >= 0.2
+
+
+def test_invalid_graphs_are_rejected_before_running():
+    graph = _graph()
+    graph.add_task("a", lambda inputs: 1)
+    with pytest.raises(ValueError):
+        graph.add_task("a", lambda inputs: 2)
+
+    graph.add_task("b", lambda inputs: 1, depends_on=["missing"])
+    with pytest.raises(ValueError):
+        graph.run()
+
+    cyclic = _graph()
+    cyclic.add_task("x", lambda inputs: 1, depends_on=["y"])
+    cyclic.add_task("y", lambda inputs: 1, depends_on=["x"])
+    with pytest.raises(CycleError):
+        cyclic.run()
@@ -0,0 +1,63 @@
+import os
+import time
+
+from py_common.logging import HoornLogger, LogType
+from py_common.logging.output.default_hoorn_log_output import DefaultHoornLogOutput
+from py_common.multithreading.execution_mode import ExecutionMode
+from py_common.multithreading.thread_manager import ThreadManager, ThreadManagerConfig
+
+
+def _process_id(batch, context) -> int:
+    time.sleep(0.01)
+    return os.getpid()
+
+
+def _first_hangs(batch, context) -> int:
+    time.sleep(1 if batch == 0 else 0.05)
+    return batch
+
+
+def _sleep(seconds, context) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def _manager(**kwargs) -> ThreadManager:
+    logger = HoornLogger([DefaultHoornLogOutput()], min_level=LogType.CRITICAL)
+    return ThreadManager(logger, ThreadManagerConfig(worker_name="Test", **kwargs))
+
+
+def test_process_mode_keeps_its_processes_between_runs():
+    manager = _manager(num_threads=2, worker_template=_process_id, execution_mode=ExecutionMode.PROCESS)
+    try:
+        context = object()
+        first = set(manager.map(range(8), context))
+        second = set(manager.map(range(8), context))
+        assert os.getpid() not in first
+        assert second <= first
+    finally:
+        manager.shutdown()
+
+
+def test_batches_behind_a_timed_out_batch_get_their_full_timeout():
+    manager = _manager(num_threads=1, worker_template=_first_hangs, batch_timeout_seconds=0.3)
+    try:
+        summary = manager.work_batches(range(5), None)
+        assert [failure.index for failure in summary.failures] == [0]
+        assert isinstance(summary.failures[0].exception, TimeoutError)
+        assert summary.num_succeeded == 4
+    finally:
+        manager.shutdown()
+
+
+def test_process_mode_run_does_not_wait_for_an_abandoned_batch():
+    manager = _manager(num_threads=1, worker_template=_sleep, batch_timeout_seconds=0.3, execution_mode=ExecutionMode.PROCESS)
+    try:
+        manager.map([0], None)
+
+        start = time.perf_counter()
+        summary = manager.work_batches([1.5], None)
+        assert time.perf_counter() - start < 1.0
+        assert summary.num_failed == 1
+    finally:
+        manager.shutdown()
@@ -0,0 +1,69 @@
+import threading
+import time
+
+from py_common.networking.timer_wheel import TimerWheel
+
+
+def test_timers_fire_once_and_in_order_of_expiry():
+    wheel = TimerWheel(tick_seconds=0.01, num_slots=8)
+    fired = []
+    done = threading.Event()
+    try:
+        wheel.schedule(0.05, lambda: fired.append("second"))
+        wheel.schedule(0.01, lambda: fired.append("first"))
+        wheel.schedule(0.1, lambda: (fired.append("third"), done.set()))
+
+        assert done.wait(2)
+        time.sleep(0.05)
+        assert fired == ["first", "second", "third"]
+        assert wheel.num_pending == 0
+    finally:
+        wheel.shutdown()
+
+
+def test_timers_beyond_one_revolution_wait_their_extra_rounds():
+    # Eight slots of 10 ms: a 250 ms timer shares its slot with a 10 ms one, but fires three rounds later.
+    wheel = TimerWheel(tick_seconds=0.01, num_slots=8)
+    fired = {}
+    start = time.monotonic()
+    try:
+        wheel.schedule(0.01, lambda: fired.setdefault("near", time.monotonic() - start))
+        wheel.schedule(0.25, lambda: fired.setdefault("far", time.monotonic() - start))
+
+        deadline = time.monotonic() + 2
+        while len(fired) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert fired["near"] < 0.2
+        assert fired["far"] >= 0.24
+    finally:
+        wheel.shutdown()
+
+
+def test_cancelled_timers_never_fire_even_across_rounds():
+    wheel = TimerWheel(tick_seconds=0.01, num_slots=4)
+    fired = []
+    try:
+        near = wheel.schedule(0.02, lambda: fired.append("near"))
+        far = wheel.schedule(0.15, lambda: fired.append("far"))
+        kept = wheel.schedule(0.15, lambda: fired.append("kept"))
+
+        assert wheel.cancel(near)
+        time.sleep(0.08)
+        # Already past a full revolution: the far timer is still pending in its slot.
+        assert wheel.cancel(far)
+        assert not wheel.cancel(far)
+
+        time.sleep(0.2)
+        assert fired == ["kept"]
+        assert not wheel.cancel(kept)
+    finally:
+        wheel.shutdown()
+
+
+def test_shutdown_stops_pending_timers():
+    wheel = TimerWheel(tick_seconds=0.01)
+    fired = []
+    wheel.schedule(0.1, lambda: fired.append(True))
+    wheel.shutdown()
+    time.sleep(0.15)
+    assert fired == []
@@ -0,0 +1,58 @@
+import sqlite3
+import threading
+import time
+from typing import List
+
+from py_common.logging import HoornLogger, LogType
+from py_common.logging.output.default_hoorn_log_output import DefaultHoornLogOutput
+from py_common.multithreading.scheduling_strategy import SchedulingStrategy
+from py_common.multithreading.thread_manager import ThreadManager, ThreadManagerConfig
+
+
+def _query(batch: int, context: None, connection: sqlite3.Connection) -> int:
+    # sqlite3 raises ProgrammingError when a connection is used on another thread than the one that created it.
+    time.sleep(0.001)
+    return connection.execute("SELECT ?", (batch,)).fetchone()[0]
+
+
+def _run(strategy: SchedulingStrategy) -> None:
+    closed_on_own_thread: List[bool] = []
+    owners = {}
+    lock = threading.Lock()
+
+    def connect() -> sqlite3.Connection:
+        connection = sqlite3.connect(":memory:")
+        with lock:
+            owners[id(connection)] = threading.get_ident()
+        return connection
+
+    def close(connection: sqlite3.Connection) -> None:
+        closed_on_own_thread.append(owners[id(connection)] == threading.get_ident())
+        connection.close()
+
+    logger = HoornLogger([DefaultHoornLogOutput()], min_level=LogType.ERROR)
+    manager = ThreadManager(logger, ThreadManagerConfig(
+        num_threads=2,
+        max_threads=6,
+        worker_idle_timeout_seconds=0.2,
+        worker_template=_query,
+        worker_name="Sqlite",
+        worker_initializer=connect,
+        worker_finalizer=close,
+        scheduling_strategy=strategy,
+    ))
+    try:
+        assert manager.map(list(range(300)), None) == list(range(300))
+    finally:
+        manager.shutdown()
+
+    assert len(closed_on_own_thread) == len(owners)
+    assert all(closed_on_own_thread)
+
+
+def test_resources_stay_on_their_thread_with_a_shared_queue():
+    _run(SchedulingStrategy.SHARED_QUEUE)
+
+
+def test_resources_stay_on_their_thread_with_work_stealing():
+    _run(SchedulingStrategy.WORK_STEALING)